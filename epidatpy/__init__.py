@@ -1,10 +1,55 @@
 """Fetch data from Delphi's API."""
 
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, Dict, List
+
+from ._constants import __version__
+
 # Make the linter happy about the unused variables
-__all__ = ["__version__", "available_endpoints", "EpiDataContext", "CovidcastEpidata", "EpiRange"]
+__all__ = [
+    "__version__",
+    "available_endpoints",
+    "EpiDataContext",
+    "CovidcastEpidata",
+    "EpiRange",
+    "ParsePool",
+    "RateLimiter",
+    "ResponseCache",
+    "RetryPolicy",
+    "set_json_decoder",
+]
 __author__ = "Delphi Research Group"
 
+# the modules of the exported names, imported on first access so that `import epidatpy`
+# does not load pandas, requests and the other heavy dependencies up front
+_LAZY_EXPORTS: Dict[str, str] = {
+    "available_endpoints": ".request",
+    "EpiDataContext": ".request",
+    "CovidcastEpidata": ".request",
+    "EpiRange": "._model",
+    "ParsePool": ".request",
+    "RateLimiter": "._throttling",
+    "ResponseCache": "._cache",
+    "RetryPolicy": "._throttling",
+    "set_json_decoder": "._json",
+}
 
-from ._constants import __version__
-from ._model import EpiRange
-from .request import CovidcastEpidata, EpiDataContext, available_endpoints
+if TYPE_CHECKING:
+    from ._cache import ResponseCache
+    from ._json import set_json_decoder
+    from ._model import EpiRange
+    from ._throttling import RateLimiter, RetryPolicy
+    from .request import CovidcastEpidata, EpiDataContext, ParsePool, available_endpoints
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted({*globals(), *__all__})
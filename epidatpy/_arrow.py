@@ -0,0 +1,103 @@
+from typing import Any, List, Mapping, Optional, Sequence
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError as e:  # pragma: no cover
+    raise ImportError("Arrow output requires pyarrow, install it with `pip install epidatpy[arrow]`") from e
+
+from ._model import EpidataFieldInfo, EpidataFieldType
+from ._parse import fields_to_predicate, is_integral
+from ._time import as_ints, detect_time_format, parse_time_column
+
+ColumnValues = Sequence[Any]
+
+
+def _string_array(values: ColumnValues) -> pa.Array:
+    try:
+        return pa.array(values, type=pa.string())
+    except pa.ArrowTypeError:
+        return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+
+
+def build_dictionary_column(values: ColumnValues, categories: Optional[Sequence[str]] = None) -> pa.DictionaryArray:
+    """Dictionary-encoded strings, indexing into the given categories (if any) in their order"""
+    strings = _string_array(values)
+    if not categories:
+        return strings.dictionary_encode()
+    dictionary = pa.array(list(categories), type=pa.string())
+    # values outside of the categories become nulls, as in a pandas categorical
+    indices = pc.index_in(strings, value_set=dictionary).cast(pa.int32())
+    return pa.DictionaryArray.from_arrays(indices, dictionary, ordered=True)
+
+
+def build_epiweek_column(values: ColumnValues) -> pa.Array:
+    """``YYYYWW`` epiweeks as 32-bit integers"""
+    ints, mask = as_ints(values)
+    return pa.array(ints.astype("int32"), mask=mask)
+
+
+def build_time_column(values: ColumnValues, field_type: EpidataFieldType, parse_epiweeks: bool = False) -> pa.Array:
+    """Dates as ``date32``, and epiweeks as integers (or the ``date32`` of their first days),
+    falling back to strings when the values do not share one format."""
+    time_format = "epiweek" if field_type == EpidataFieldType.epiweek else detect_time_format(values)
+    try:
+        if time_format == "epiweek" and not parse_epiweeks:
+            return build_epiweek_column(values)
+        return pa.array(parse_time_column(values, time_format), type=pa.date32(), from_pandas=True)
+    except ValueError:
+        return _string_array(values)
+
+
+def build_arrow_column(
+    info: EpidataFieldInfo,
+    values: ColumnValues,
+    disable_date_parsing: Optional[bool] = False,
+    parse_epiweeks: bool = False,
+) -> pa.Array:
+    """Build the Arrow array of a field straight from its values, with the integers that
+    are not all integral as ``float64``."""
+    if info.type == EpidataFieldType.int and is_integral(values):
+        return pa.array(values, type=pa.int64())
+    if info.type in (EpidataFieldType.int, EpidataFieldType.float):
+        return pa.array(values, type=pa.float64())
+    if info.type == EpidataFieldType.bool:
+        return pa.array([None if v is None else bool(v) for v in values], type=pa.bool_())
+    if info.type == EpidataFieldType.categorical:
+        return build_dictionary_column(values, info.categories)
+    if info.type == EpidataFieldType.text:
+        return build_dictionary_column(values)
+    if disable_date_parsing:
+        return _string_array(values)
+    return build_time_column(values, info.type, parse_epiweeks)
+
+
+def build_table(
+    meta: Sequence[EpidataFieldInfo],
+    columns: Mapping[str, ColumnValues],
+    fields: Optional[Sequence[str]] = None,
+    disable_date_parsing: Optional[bool] = False,
+    parse_epiweeks: bool = False,
+) -> pa.Table:
+    """Build an Arrow table from buffers of (unparsed) column values
+
+    Text and categorical fields are dictionary-encoded, dates are ``date32`` and epiweeks
+    ``int32`` (``YYYYWW``) unless ``parse_epiweeks`` is set. Without ``meta`` the column
+    types are inferred.
+    """
+    if not meta:
+        return pa.table(dict(columns))
+    pred = fields_to_predicate(fields)
+    n = max((len(values) for values in columns.values()), default=0)
+    names: List[str] = []
+    arrays: List[pa.Array] = []
+    for info in meta:
+        if pred(info.name):
+            values = columns.get(info.name)
+            names.append(info.name)
+            arrays.append(
+                build_arrow_column(
+                    info, values if values is not None else [None] * n, disable_date_parsing, parse_epiweeks
+                )
+            )
+    return pa.Table.from_arrays(arrays, names=names)
@@ -0,0 +1,599 @@
+import pickle
+from asyncio import Future, ensure_future
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from math import inf, isinf
+from os import environ
+from threading import Lock, RLock
+from time import monotonic
+from time import time as wall_time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Final,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+from epiweeks import Week
+
+from ._parse import fields_to_predicate, parse_user_date_or_week
+
+if TYPE_CHECKING:
+    from diskcache import Cache
+
+# results worth keeping: complete responses, with or without rows
+CACHEABLE_RESULTS = (1, -2)
+DAY_SECONDS: Final = 24 * 60 * 60
+DEFAULT_CACHE_MEMORY_BYTES: Final = 128 * 1024 * 1024
+
+TimeLike = Union[date, Week]
+# inclusive range of days or of weeks
+Interval = Tuple[TimeLike, TimeLike]
+
+
+def seconds_to_release(weekday: int, now: Optional[datetime] = None) -> float:
+    """Seconds until the next midnight (UTC) starting the given weekday (0 for Monday)"""
+    now = now or datetime.now(timezone.utc)
+    days = (weekday - now.weekday()) % 7 or 7
+    release = datetime.combine(now.date() + timedelta(days=days), time(), tzinfo=timezone.utc)
+    return (release - now).total_seconds()
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """how long the cached responses of the calls to an endpoint stay fresh
+
+    Historical calls, of past issues or as of past dates, are immutable and kept
+    ``historical_max_age_days`` (forever by default). Calls of the latest data are kept
+    ``max_age_days`` (the ``cache_max_age_days`` of the call if ``None``), and at most
+    until the next weekly release, at the start of ``release_weekday`` (UTC), if set.
+    """
+
+    max_age_days: Optional[float] = None
+    historical_max_age_days: float = inf
+    release_weekday: Optional[int] = None
+
+    def expire(self, historical: bool, max_age_days: float, now: Optional[datetime] = None) -> Optional[float]:
+        """Seconds a response stays cached, ``None`` for ever"""
+        if historical:
+            seconds = self.historical_max_age_days * DAY_SECONDS
+        else:
+            seconds = (self.max_age_days if self.max_age_days is not None else max_age_days) * DAY_SECONDS
+            if self.release_weekday is not None:
+                seconds = min(seconds, seconds_to_release(self.release_weekday, now))
+        return None if isinf(seconds) else seconds
+
+
+DEFAULT_CACHE_POLICY: Final = CachePolicy()
+# the weekly data published by the CDC on Fridays are in the API the day after
+WEEKLY_RELEASE_POLICY: Final = CachePolicy(release_weekday=5)
+CACHE_POLICIES: Final[Mapping[str, CachePolicy]] = {
+    "fluview": WEEKLY_RELEASE_POLICY,
+    "fluview_clinical": WEEKLY_RELEASE_POLICY,
+    "flusurv": WEEKLY_RELEASE_POLICY,
+    # discontinued in 2015, its data no longer change
+    "gft": CachePolicy(max_age_days=inf),
+}
+
+
+# data_source, signal, time_type and geo_type of a covidcast signal
+SignalKey = Tuple[str, str, str, str]
+# last_update, max_issue, max_time and max_lag of a covidcast signal
+SignalVersion = Tuple[Any, Any, Any, Any]
+SIGNAL_VERSION_FIELDS: Final = [
+    "data_source",
+    "signal",
+    "time_type",
+    "geo_type",
+    "last_update",
+    "max_issue",
+    "max_time",
+    "max_lag",
+]
+
+
+def meta_max_age() -> float:
+    """Seconds the versions reported by covidcast_meta are trusted, ``EPIDATPY_CACHE_META_MAX_AGE_MINUTES``"""
+    minutes = environ.get("EPIDATPY_CACHE_META_MAX_AGE_MINUTES", "60")
+    return int(minutes) * 60 if minutes.isdigit() else 60 * 60
+
+
+class SignalVersions:
+    """versions of the covidcast signals reported by covidcast_meta, shared by all calls
+
+    The meta data of a server are fetched at most once every ``max_age`` seconds
+    (``meta_max_age()`` if ``None``).
+    """
+
+    def __init__(self, max_age: Optional[float] = None) -> None:
+        self.max_age = max_age
+        self._versions: Dict[str, Tuple[float, Dict[SignalKey, SignalVersion]]] = {}
+        self._lock = Lock()
+        self._pending: Dict[str, Future[Sequence[Mapping[str, Any]]]] = {}
+
+    def _fresh(self, base_url: str) -> Optional[Dict[SignalKey, SignalVersion]]:
+        fetched = self._versions.get(base_url)
+        max_age = self.max_age if self.max_age is not None else meta_max_age()
+        if fetched is None or monotonic() - fetched[0] >= max_age:
+            return None
+        return fetched[1]
+
+    def _update(self, base_url: str, rows: Sequence[Mapping[str, Any]]) -> Dict[SignalKey, SignalVersion]:
+        versions = {
+            (row["data_source"], row["signal"], row["time_type"], row["geo_type"]): (
+                row.get("last_update"),
+                row.get("max_issue"),
+                row.get("max_time"),
+                row.get("max_lag"),
+            )
+            for row in rows
+        }
+        self._versions[base_url] = (monotonic(), versions)
+        return versions
+
+    def get(self, base_url: str, fetch: Callable[[], Sequence[Mapping[str, Any]]]) -> Mapping[SignalKey, SignalVersion]:
+        """The versions of the signals of a server, calling ``fetch`` for its meta data if they are too old"""
+        with self._lock:
+            versions = self._fresh(base_url)
+            if versions is not None:
+                return versions
+            try:
+                return self._update(base_url, fetch())
+            except Exception:
+                # not to be tried again before max_age either
+                self._update(base_url, [])
+                raise
+
+    async def aget(
+        self, base_url: str, fetch: Callable[[], Awaitable[Sequence[Mapping[str, Any]]]]
+    ) -> Mapping[SignalKey, SignalVersion]:
+        """The versions of the signals of a server, awaiting a single ``fetch`` of its meta data if they are too old"""
+        versions = self._fresh(base_url)
+        if versions is not None:
+            return versions
+        pending = self._pending.get(base_url)
+        if pending is None:
+            pending = self._pending[base_url] = ensure_future(fetch())
+            pending.add_done_callback(lambda _: self._pending.pop(base_url, None))
+        try:
+            rows = await pending
+        except Exception:
+            self._update(base_url, [])
+            raise
+        versions = self._fresh(base_url)
+        return versions if versions is not None else self._update(base_url, rows)
+
+
+SIGNAL_VERSIONS: Final = SignalVersions()
+
+
+@lru_cache(maxsize=None)
+def cache_directory() -> str:
+    """The directory of the response cache, announced the first time it is looked up."""
+    from appdirs import user_cache_dir  # pylint: disable=import-outside-toplevel
+
+    directory: str = user_cache_dir(appname="epidatpy", appauthor="delphi")
+    if environ.get("USE_EPIDATPY_CACHE", None):
+        print(
+            f"diskcache is being used (unset USE_EPIDATPY_CACHE if not intended). "
+            f"The cache directory is {directory}. "
+            f"The TTL of the latest data is set to {environ.get('EPIDATPY_CACHE_MAX_AGE_DAYS', '7')} days."
+        )
+    return directory
+
+
+def open_cache() -> "Cache":
+    """Open the response cache, importing diskcache only once caching is used."""
+    from diskcache import Cache  # pylint: disable=import-outside-toplevel
+
+    return Cache(cache_directory())
+
+
+class ResponseCache:
+    """the response cache on disk, opened once, behind an in-memory LRU tier of at most ``max_memory_bytes``
+
+    Values are pickled once as they are stored, and their pickles are what is kept in
+    memory (along with those read back from the disk). Every lookup unpickles its own copy
+    of the value, which the caller is free to modify, while sparing the disk read.
+    """
+
+    def __init__(self, max_memory_bytes: int = DEFAULT_CACHE_MEMORY_BYTES) -> None:
+        self.max_memory_bytes = max_memory_bytes
+        self._disk: Optional[Cache] = None
+        # pickled value and expiration time (if any) of every key, least recently used first
+        self._memory: OrderedDict[str, Tuple[bytes, Optional[float]]] = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = RLock()
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._memory_bytes
+
+    def _open(self) -> "Cache":
+        with self._lock:
+            if self._disk is None:
+                self._disk = open_cache()
+            return self._disk
+
+    def _forget(self, key: str) -> None:
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= len(entry[0])
+
+    def _remember(self, key: str, data: bytes, expire_time: Optional[float]) -> None:
+        with self._lock:
+            self._forget(key)
+            if len(data) > self.max_memory_bytes:
+                return
+            self._memory[key] = (data, expire_time)
+            self._memory_bytes += len(data)
+            while self._memory_bytes > self.max_memory_bytes:
+                self._forget(next(iter(self._memory)))
+
+    def get(self, key: str) -> Any:
+        """A copy of the value of a key, from memory or else from the disk, ``None`` if missing or expired"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                data, expire_time = entry
+                if expire_time is None or expire_time > wall_time():
+                    self._memory.move_to_end(key)
+                    return pickle.loads(data)
+                self._forget(key)
+        data, expire_time = self._open().get(key, expire_time=True)
+        if not isinstance(data, bytes):
+            return data
+        self._remember(key, data, expire_time)
+        return pickle.loads(data)
+
+    def set(self, key: str, value: Any, expire: Optional[float] = None) -> None:
+        """Store the value of a key for ``expire`` seconds (for ever if ``None``)"""
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self._open().set(key, data, expire=expire)
+        self._remember(key, data, None if expire is None else wall_time() + expire)
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+    def close(self) -> None:
+        """Close the disk tier, which is opened again if the cache is used further"""
+        with self._lock:
+            self.clear_memory()
+            if self._disk is not None:
+                self._disk.close()
+                self._disk = None
+
+
+@lru_cache(maxsize=None)
+def default_response_cache() -> ResponseCache:
+    """The response cache of the calls not created by a context, shared by all of them"""
+    return ResponseCache()
+
+
+def rows_to_columns(rows: Sequence[Mapping[str, Any]]) -> Dict[str, List[Any]]:
+    """Transpose rows into columns of all the fields found in any of them"""
+    names = dict.fromkeys(name for row in rows for name in row)
+    return {name: [row.get(name) for row in rows] for name in names}
+
+
+def _resolve(fields: Optional[Sequence[str]], names: Sequence[str]) -> Set[str]:
+    pred = fields_to_predicate(fields)
+    return {name for name in names if pred(name)}
+
+
+def _is_include_list(fields: Optional[Sequence[str]]) -> bool:
+    return bool(fields) and not any(f.startswith("-") for f in fields or ())
+
+
+def covers(cached: Optional[Sequence[str]], fields: Optional[Sequence[str]], names: Sequence[str]) -> bool:
+    """Whether a response fetched for the ``cached`` fields holds all of the requested ``fields``
+
+    With the ``names`` of all fields of the endpoint both are resolved to sets of names,
+    otherwise only lists of included fields can be compared.
+    """
+    if not cached:
+        return True
+    if names:
+        return _resolve(fields, names) <= _resolve(cached, names)
+    if _is_include_list(cached) and _is_include_list(fields):
+        return set(fields or ()) <= set(cached)
+    return list(cached) == list(fields or ())
+
+
+def widen(
+    cached: Optional[Sequence[str]], fields: Optional[Sequence[str]], names: Sequence[str]
+) -> Optional[List[str]]:
+    """The fields to fetch to hold both the ``cached`` and the requested ``fields`` (``None`` for all)"""
+    if not cached or not fields:
+        return None
+    if names:
+        union = _resolve(cached, names) | _resolve(fields, names)
+        return None if len(union) == len(names) else [name for name in names if name in union]
+    if _is_include_list(cached) and _is_include_list(fields):
+        return list(dict.fromkeys([*cached, *(fields or ())]))
+    return None
+
+
+@dataclass
+class CachedResponse:
+    """unparsed response of a call, stored as columns along with the fields it was fetched for"""
+
+    result: int
+    message: str
+    columns: Dict[str, List[Any]]
+    # the fields requested from the API, all of them if None
+    fields: Optional[Tuple[str, ...]] = None
+    # the versions of the data on the server when fetched, if known
+    version: Optional[Tuple[Any, ...]] = None
+
+    @property
+    def cacheable(self) -> bool:
+        return self.result in CACHEABLE_RESULTS
+
+    def project(self, fields: Optional[Sequence[str]]) -> "CachedResponse":
+        """The response narrowed down to the given fields"""
+        if not fields:
+            return self
+        pred = fields_to_predicate(fields)
+        columns = {name: values for name, values in self.columns.items() if pred(name)}
+        return CachedResponse(self.result, self.message, columns, tuple(fields), self.version)
+
+    def rows(self) -> List[Dict[str, Any]]:
+        names = list(self.columns)
+        return [dict(zip(names, values)) for values in zip(*self.columns.values())]
+
+
+def lookup(
+    cache: ResponseCache,
+    key: str,
+    fields: Optional[Sequence[str]],
+    names: Sequence[str],
+    version: Optional[Tuple[Any, ...]] = None,
+) -> Tuple[Optional[CachedResponse], Optional[Sequence[str]]]:
+    """Look up the cached response of a call, projected onto the requested ``fields``
+
+    If the cache does not hold all of the fields, the fields to fetch instead are returned,
+    widened to those cached already so that the stored response only ever grows. A response
+    of another ``version`` of the data is out of date.
+    """
+    cached = cache.get(key)
+    if not isinstance(cached, CachedResponse) or cached.version != version:
+        return None, fields
+    if covers(cached.fields, fields, names):
+        return cached.project(fields), fields
+    return None, widen(cached.fields, fields, names)
+
+
+def store(cache: ResponseCache, key: str, response: CachedResponse, expire: Optional[float]) -> None:
+    if response.cacheable:
+        cache.set(key, response, expire=expire)
+
+
+def _shift(t: TimeLike, units: int) -> TimeLike:
+    return t + units if isinstance(t, Week) else t + timedelta(days=units)
+
+
+def merge_intervals(intervals: Sequence[Interval]) -> List[Interval]:
+    """Sort the intervals, merging those that overlap or touch"""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= _shift(merged[-1][1], 1):
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_intervals(intervals: Sequence[Interval], covered: Sequence[Interval]) -> List[Interval]:
+    """The parts of the ``intervals`` outside of the (merged) ``covered`` ones"""
+    gaps: List[Interval] = []
+    for start, end in merge_intervals(intervals):
+        for covered_start, covered_end in covered:
+            if covered_end < start or covered_start > end:
+                continue
+            if covered_start > start:
+                gaps.append((start, _shift(covered_start, -1)))
+            start = _shift(covered_end, 1)
+            if start > end:
+                break
+        else:
+            gaps.append((start, end))
+    return gaps
+
+
+def _concat(first: Mapping[str, List[Any]], second: Mapping[str, List[Any]]) -> Dict[str, List[Any]]:
+    n_first = len(next(iter(first.values()), []))
+    n_second = len(next(iter(second.values()), []))
+    names = dict.fromkeys([*first, *second])
+    return {name: [*first.get(name, [None] * n_first), *second.get(name, [None] * n_second)] for name in names}
+
+
+@dataclass
+class CachedSeries:
+    """cached response of a call over intervals of its time parameter, extended as others are fetched"""
+
+    time_field: str
+    # the merged intervals the rows were fetched for, up to the last time value returned
+    covered: List[Interval]
+    response: CachedResponse
+    # the wall time the series expires at, set by its first fetch and kept as it is extended
+    expire_time: Optional[float] = None
+
+    def _times(self, columns: Mapping[str, List[Any]]) -> List[Optional[TimeLike]]:
+        """The day or week of every row"""
+        out_type: Literal["day", "week"] = "week" if self.covered and isinstance(self.covered[0][0], Week) else "day"
+        parsed: Dict[Any, Optional[TimeLike]] = {None: None}
+        times: List[Optional[TimeLike]] = []
+        for value in columns.get(self.time_field, []):
+            if value not in parsed:
+                parsed[value] = parse_user_date_or_week(value, out_type)
+            times.append(parsed[value])
+        return times
+
+    def select(self, intervals: Sequence[Interval], fields: Optional[Sequence[str]]) -> CachedResponse:
+        """The cached rows within the given intervals, projected onto the requested ``fields``"""
+        merged = merge_intervals(intervals)
+        starts = [start for start, _ in merged]
+
+        def within(t: Optional[TimeLike]) -> bool:
+            i = bisect_right(starts, t) - 1 if t is not None else -1
+            return i >= 0 and t is not None and t <= merged[i][1]
+
+        keep = [i for i, t in enumerate(self._times(self.response.columns)) if within(t)]
+        columns = {name: [values[i] for i in keep] for name, values in self.response.columns.items()}
+        result, message = (1, "success") if keep else (-2, "no results")
+        return CachedResponse(result, message, columns, self.response.fields, self.response.version).project(fields)
+
+    def extend(self, response: CachedResponse, intervals: Sequence[Interval]) -> "CachedSeries":
+        """The series with the rows fetched for other intervals, sorted by time"""
+        covered = merge_intervals([*self.covered, *intervals])
+        merged = CachedResponse(1, "success", {}, self.response.fields, self.response.version)
+        series = CachedSeries(self.time_field, covered, merged)
+        columns = _concat(self.response.columns, response.columns)
+        times = series._times(columns)
+        # rows without a time value could never be selected
+        timed = [(t, i) for i, t in enumerate(times) if t is not None]
+        order = [i for _, i in sorted(timed, key=lambda row: row[0])]
+        series.response.columns = {name: [values[i] for i in order] for name, values in columns.items()}
+        return series
+
+    def restrict(self, covered: List[Interval], expire_time: Optional[float]) -> "CachedSeries":
+        """The series over the given (merged) intervals only, with the rows within them"""
+        rows = self.select(covered, None)
+        response = CachedResponse(1, "success", rows.columns, rows.fields, rows.version)
+        return CachedSeries(self.time_field, covered, response, expire_time)
+
+
+def _with_field(fields: Optional[Sequence[str]], name: str) -> Optional[List[str]]:
+    """The fields, making sure that ``name`` is among them"""
+    if not fields:
+        return None
+    with_name = [f for f in fields if f != f"-{name}"]
+    if any(not f.startswith("-") for f in with_name) and name not in with_name:
+        with_name.append(name)
+    return with_name or None
+
+
+@dataclass
+class SeriesPlan:
+    """the intervals of a call missing from its cached series, and the fields to fetch them with"""
+
+    key: str
+    time_field: str
+    intervals: List[Interval]
+    cached: Optional[CachedSeries]
+    gaps: List[Interval]
+    fields: Optional[List[str]]
+
+
+def _before_revision(
+    series: CachedSeries,
+    version: Optional[Tuple[Any, ...]],
+    revised_since: Optional[Callable[[Tuple[Any, ...]], Optional[TimeLike]]],
+) -> Optional[CachedSeries]:
+    """The part of a series of an older version of the data that the newer ``version`` left as is, if any"""
+    if version is None or series.response.version is None or revised_since is None:
+        return None
+    start = revised_since(series.response.version)
+    if start is None:
+        return None
+    end = _shift(start, -1)
+    covered = [(first, min(last, end)) for first, last in series.covered if first <= end]
+    if not covered:
+        return None
+    kept = series.restrict(covered, series.expire_time)
+    kept.response.version = version
+    return kept
+
+
+def plan_series(
+    cache: ResponseCache,
+    key: str,
+    time_field: str,
+    intervals: Sequence[Interval],
+    fields: Optional[Sequence[str]],
+    names: Sequence[str],
+    version: Optional[Tuple[Any, ...]] = None,
+    revised_since: Optional[Callable[[Tuple[Any, ...]], Optional[TimeLike]]] = None,
+) -> SeriesPlan:
+    """Find the gaps of the cached series of a call over the given intervals
+
+    If the series lacks some of the requested fields, or is of weeks rather than days (or vice
+    versa), it is fetched all over again, with the fields widened to the cached ones. Of a
+    series of another ``version`` of the data, only the intervals before the first time value
+    ``revised_since`` its version are kept, and the rest is fetched again. The whole series
+    is fetched again if that time value is unknown.
+    """
+    cached = cache.get(key)
+    cached_fields = None
+    if isinstance(cached, CachedSeries) and cached.response.version != version:
+        cached = _before_revision(cached, version, revised_since)
+    if isinstance(cached, CachedSeries) and cached.time_field == time_field:
+        cached_fields = cached.response.fields
+        weekly = isinstance(intervals[0][0], Week)
+        if not covers(cached_fields, fields, names) or any(isinstance(t, Week) != weekly for t, _ in cached.covered):
+            cached = None
+    else:
+        cached = None
+    if cached is not None:
+        gaps = subtract_intervals(intervals, cached.covered)
+        return SeriesPlan(key, time_field, list(intervals), cached, gaps, _with_field(cached_fields, time_field))
+    fetch_fields = widen(cached_fields, fields, names) if cached_fields else fields
+    return SeriesPlan(
+        key, time_field, list(intervals), None, merge_intervals(intervals), _with_field(fetch_fields, time_field)
+    )
+
+
+def complete_series(
+    cache: ResponseCache,
+    plan: SeriesPlan,
+    fetched: Optional[CachedResponse],
+    fields: Optional[Sequence[str]],
+    expire: Callable[[Sequence[Interval]], Optional[float]],
+    latest: Optional[TimeLike] = None,
+) -> CachedResponse:
+    """Merge the rows fetched for the gaps of a plan into its series, and select the requested ones
+
+    The gaps only count as covered up to the last time value returned for them, and short
+    of the ``latest`` day or week (whose data may still be missing), so that the periods
+    the API may not have all the data of yet are fetched again. The series expires the
+    seconds ``expire`` gives for all of the intervals it covers after its first fetch:
+    extending it does not renew it.
+    """
+    if fetched is None and plan.cached is not None:
+        return plan.cached.select(plan.intervals, fields)
+    if fetched is None or not fetched.cacheable:
+        return fetched.project(fields) if fetched else CachedResponse(-2, "no results", {})
+    series = plan.cached
+    if series is None:
+        series = CachedSeries(plan.time_field, [], CachedResponse(1, "success", {}, fetched.fields, fetched.version))
+    extended = series.extend(fetched, plan.gaps)
+    last = max((t for t in extended._times(fetched.columns) if t is not None), default=None)
+    if last is not None and latest is not None:
+        last = min(last, _shift(latest, -1))
+    returned = [(start, min(end, last)) for start, end in plan.gaps if last is not None and start <= last]
+    covered = merge_intervals([*series.covered, *returned])
+    if covered:
+        seconds = expire(covered)
+        expire_time = None if seconds is None else wall_time() + seconds
+        if series.expire_time is not None:
+            expire_time = series.expire_time if expire_time is None else min(expire_time, series.expire_time)
+        remaining = None if expire_time is None else max(0.0, expire_time - wall_time())
+        cache.set(plan.key, extended.restrict(covered, expire_time), expire=remaining)
+    return extended.select(plan.intervals, fields)
@@ -0,0 +1,263 @@
+from datetime import date, timedelta
+from typing import (
+    Dict,
+    Final,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+from urllib.parse import quote_plus, urlencode
+
+from epiweeks import Week
+
+from ._endpoints import SHARDABLE_PARAMS
+from ._model import EpidataFieldInfo, EpiDataResponse, EpiRange, EpiRangeLike, EpiRangeParam, format_item, format_list
+from ._parse import parse_user_date_or_week
+
+ChunkBy = Literal["time", "list"]
+Params = Mapping[str, Optional[EpiRangeParam]]
+
+# time parameters that can be split, and the field of the returned rows they select on
+TIME_PARAM_FIELDS: Final[Mapping[str, str]] = {
+    "time_values": "time_value",
+    "epiweeks": "epiweek",
+    "dates": "date",
+    "collection_weeks": "collection_week",
+}
+# rough number of locations a `geo_values="*"` request returns per geo type
+GEO_TYPE_SIZES: Final[Mapping[str, int]] = {
+    "nation": 1,
+    "hhs": 10,
+    "state": 60,
+    "hrr": 310,
+    "msa": 400,
+    "county": 3300,
+}
+DEFAULT_WILDCARD_SIZE: Final = 100
+DEFAULT_MAX_ROWS: Final = 100_000
+DEFAULT_MAX_URL_LENGTH: Final = 4000
+
+
+def find_time_param(params: Params, meta: Sequence[EpidataFieldInfo]) -> Optional[str]:
+    """Find the parameter selecting on the time field of the returned rows."""
+    field_names = {info.name for info in meta}
+    for param, field_name in TIME_PARAM_FIELDS.items():
+        if params.get(param) is not None and field_name in field_names:
+            return param
+    return None
+
+
+def _shift(d: Union[date, Week], units: int) -> Union[date, Week]:
+    if isinstance(d, Week):
+        return d + units
+    return d + timedelta(days=units)
+
+
+def time_units(r: EpiRange) -> int:
+    """Number of days (or weeks) covered by a range."""
+    if isinstance(r.start, Week) and isinstance(r.end, Week):
+        return (r.end.startdate() - r.start.startdate()).days // 7 + 1
+    if isinstance(r.start, date) and isinstance(r.end, date):
+        return (r.end - r.start).days + 1
+    raise ValueError(f"Cannot mix dates and weeks in {r}")
+
+
+def to_time_ranges(value: Optional[EpiRangeParam]) -> Optional[List[EpiRange]]:
+    """Normalize a time parameter into a list of ranges, or None if it cannot be split (e.g. a wildcard)."""
+    if value is None:
+        return None
+    values = value if isinstance(value, Sequence) and not isinstance(value, str) else [value]
+    ranges: List[EpiRange] = []
+    for v in values:
+        if isinstance(v, EpiRange):
+            ranges.append(v)
+        elif isinstance(v, dict):
+            ranges.append(EpiRange(v["from"], v["to"]))
+        elif isinstance(v, str) and v.count("-") == 1:
+            start, end = v.split("-")
+            ranges.append(EpiRange(start, end))
+        else:
+            try:
+                d = parse_user_date_or_week(v)
+            except ValueError:
+                return None
+            ranges.append(EpiRange(d, d))
+    return ranges
+
+
+def split_epirange(r: EpiRange, span: int) -> List[EpiRange]:
+    """Split a range into consecutive ranges of at most ``span`` days (or weeks)."""
+    pieces: List[EpiRange] = []
+    start = r.start
+    while start <= r.end:
+        end = min(_shift(start, span - 1), r.end)
+        pieces.append(EpiRange(start, end))
+        start = _shift(end, 1)
+    return pieces
+
+
+def count_values(name: str, value: Optional[EpiRangeParam], params: Params) -> int:
+    """Estimate the number of distinct values a parameter selects."""
+    if value is None:
+        return 1
+    if isinstance(value, str):
+        if value == "*":
+            if name == "geo_values":
+                return GEO_TYPE_SIZES.get(str(params.get("geo_type")), DEFAULT_WILDCARD_SIZE)
+            return DEFAULT_WILDCARD_SIZE
+        return len(value.split(","))
+    if isinstance(value, Sequence):
+        return sum(count_values(name, v, params) for v in value)
+    if isinstance(value, (EpiRange, dict)):
+        ranges = to_time_ranges(value)
+        return sum(time_units(r) for r in ranges) if ranges else DEFAULT_WILDCARD_SIZE
+    return 1
+
+
+def estimate_rows_per_value(params: Params, param: str) -> int:
+    """Estimate the rows returned for every value of ``param`` (e.g. every day of the time parameter)."""
+    rows = 1
+    for name, value in params.items():
+        if name != param:
+            rows *= count_values(name, value, params)
+    return max(rows, 1)
+
+
+def plan_time_chunks(
+    params: Params,
+    meta: Sequence[EpidataFieldInfo],
+    max_rows: int = DEFAULT_MAX_ROWS,
+) -> List[Dict[str, Optional[EpiRangeParam]]]:
+    """Split the time parameter into chunks estimated to return at most ``max_rows`` rows each."""
+    time_param = find_time_param(params, meta)
+    ranges = to_time_ranges(params.get(time_param)) if time_param else None
+    if not time_param or not ranges:
+        return [dict(params)]
+    span = max(1, max_rows // estimate_rows_per_value(params, time_param))
+
+    # pack the pieces into chunks of at most `span` units
+    chunks: List[List[EpiRange]] = [[]]
+    units = 0
+    for piece in (p for r in ranges for p in split_epirange(r, span)):
+        piece_units = time_units(piece)
+        if chunks[-1] and units + piece_units > span:
+            chunks.append([])
+            units = 0
+        chunks[-1].append(piece)
+        units += piece_units
+    return [{**params, time_param: chunk[0] if len(chunk) == 1 else chunk} for chunk in chunks]
+
+
+def shardable_values(value: Optional[EpiRangeParam]) -> Optional[List[EpiRangeLike]]:
+    """The values of a list parameter, or None if it is a single value or a wildcard."""
+    if isinstance(value, str):
+        values: List[EpiRangeLike] = list(value.split(",")) if value != "*" else []
+    elif isinstance(value, Sequence):
+        values = list(value)
+    else:
+        values = []
+    return values if len(values) > 1 else None
+
+
+def plan_list_shards(
+    params: Params,
+    endpoint: str,
+    url: str,
+    max_rows: int = DEFAULT_MAX_ROWS,
+    max_url_length: int = DEFAULT_MAX_URL_LENGTH,
+) -> List[Dict[str, Optional[EpiRangeParam]]]:
+    """Shard the endpoint's list parameter so that every request stays below ``max_url_length``
+    characters and is estimated to return at most ``max_rows`` rows."""
+    param = SHARDABLE_PARAMS.get(endpoint.strip("/"))
+    values = shardable_values(params.get(param)) if param else None
+    if not param or not values:
+        return [dict(params)]
+    per_shard = max(1, max_rows // estimate_rows_per_value(params, param))
+    others = {k: format_list(v) for k, v in params.items() if v is not None and k != param}
+    # "?", "&" and "=" around the sharded parameter
+    budget = max_url_length - len(url) - len(urlencode(others)) - len(param) - 3
+
+    shards: List[List[EpiRangeLike]] = [[]]
+    length = 0
+    for value in values:
+        # values are joined by an encoded comma ("%2C")
+        value_length = len(quote_plus(format_item(value))) + 3
+        if shards[-1] and (len(shards[-1]) >= per_shard or length + value_length > budget):
+            shards.append([])
+            length = 0
+        shards[-1].append(value)
+        length += value_length
+    return [{**params, param: shard} for shard in shards]
+
+
+def plan_chunks(
+    params: Params,
+    meta: Sequence[EpidataFieldInfo],
+    chunk_by: Union[ChunkBy, Sequence[ChunkBy]],
+    endpoint: str,
+    url: str,
+    max_rows: int = DEFAULT_MAX_ROWS,
+    max_url_length: int = DEFAULT_MAX_URL_LENGTH,
+) -> List[Dict[str, Optional[EpiRangeParam]]]:
+    """Split a call's parameters into the parameters of smaller calls.
+
+    List parameters are sharded first, then the time range of every shard is split
+    within what remains of the row budget.
+    """
+    modes = {chunk_by} if isinstance(chunk_by, str) else set(chunk_by)
+    unknown = modes - {"time", "list"}
+    if unknown:
+        raise ValueError(f"Unknown chunking mode {unknown}")
+    chunks = [dict(params)]
+    if "list" in modes:
+        chunks = plan_list_shards(params, endpoint, url, max_rows, max_url_length)
+    if "time" in modes:
+        chunks = [chunk for shard in chunks for chunk in plan_time_chunks(shard, meta, max_rows)]
+    return chunks
+
+
+def is_truncated(response: EpiDataResponse) -> bool:
+    """Whether the API hit its row limit and returned partial results."""
+    return response.get("result") == 2
+
+
+def bisect_params(
+    params: Params,
+    meta: Sequence[EpidataFieldInfo],
+    endpoint: str,
+) -> Optional[Tuple[Dict[str, Optional[EpiRangeParam]], Dict[str, Optional[EpiRangeParam]]]]:
+    """Split a call's parameters in two halves, on its time range first and then on its
+    list parameter. Returns None if neither can be split any further."""
+    time_param = find_time_param(params, meta)
+    ranges = to_time_ranges(params.get(time_param)) if time_param else None
+    if time_param and ranges:
+        if len(ranges) == 1:
+            units = time_units(ranges[0])
+            if units > 1:
+                first, second = split_epirange(ranges[0], (units + 1) // 2)
+                return {**params, time_param: first}, {**params, time_param: second}
+        else:
+            half = len(ranges) // 2
+            return {**params, time_param: ranges[:half]}, {**params, time_param: ranges[half:]}
+
+    param = SHARDABLE_PARAMS.get(endpoint.strip("/"))
+    values = shardable_values(params.get(param)) if param else None
+    if param and values:
+        half = len(values) // 2
+        return {**params, param: values[:half]}, {**params, param: values[half:]}
+    return None
+
+
+def merge_responses(responses: Sequence[EpiDataResponse]) -> EpiDataResponse:
+    """Concatenate the rows of chunked responses, reporting the first error or truncation among them."""
+    epidata = [row for r in responses for row in r.get("epidata") or []]
+    for r in responses:
+        if r.get("result") not in (1, -2):
+            return {"result": r["result"], "message": r["message"], "epidata": epidata}
+    if epidata:
+        return {"result": 1, "message": "success", "epidata": epidata}
+    return {"result": -2, "message": "no results", "epidata": epidata}
@@ -0,0 +1,265 @@
+from concurrent.futures import Executor, Future
+from math import nan
+from typing import Any, Dict, Final, Mapping, Optional, Sequence, Union
+
+import numpy as np
+from pandas import Categorical, CategoricalDtype, DataFrame, Series
+from pandas import array as pd_array
+from pandas.api.extensions import ExtensionArray
+from pandas.arrays import FloatingArray, IntegerArray, SparseArray, StringArray
+
+from ._model import TIME_FORMATS, EpidataFieldInfo, EpidataFieldType, NullColumns
+from ._parse import fields_to_predicate, is_integral
+from ._time import detect_time_format, parse_time_column
+
+ColumnValues = Sequence[Union[str, float, int, None]]
+TIME_FIELD_TYPES: Final = (EpidataFieldType.date, EpidataFieldType.epiweek, EpidataFieldType.date_or_epiweek)
+# text columns with at most this share of distinct values are stored as categoricals in compact mode
+COMPACT_MAX_CARDINALITY: Final = 0.5
+COMPACT_INT_DTYPES: Final = ("Int8", "Int16", "Int32")
+# columns shorter than this are built in-process, as shipping them to a worker would cost more than it saves
+PARALLEL_MIN_ROWS: Final = 100_000
+# the only fields built on workers: their values pickle as packed numbers and come back as numpy
+# buffers, while text costs more to ship both ways than to build in-process
+PARALLEL_FIELD_TYPES: Final = (EpidataFieldType.int, EpidataFieldType.float, *TIME_FIELD_TYPES)
+
+
+def _null_mask(values: ColumnValues) -> np.ndarray:
+    return np.fromiter((v is None for v in values), dtype=bool, count=len(values))
+
+
+def _int_data(values: ColumnValues) -> Optional[np.ndarray]:
+    """The values as ``int64`` (0 for nulls), or ``None`` if some of them are not integral"""
+    if not is_integral(values):
+        return None
+    return np.fromiter((0 if v is None else v for v in values), dtype=np.int64, count=len(values))
+
+
+def build_int_column(values: ColumnValues) -> Union[IntegerArray, FloatingArray]:
+    """Nullable ``Int64`` array, filled straight from the values and their null mask, or
+    ``Float64`` if some of the values are not integral."""
+    data = _int_data(values)
+    if data is None:
+        return build_float_column(values)
+    return IntegerArray(data, _null_mask(values))
+
+
+def build_float_column(values: ColumnValues) -> FloatingArray:
+    """Nullable ``Float64`` array, filled straight from the values and their null mask."""
+    mask = _null_mask(values)
+    data = np.fromiter((nan if v is None else v for v in values), dtype=np.float64, count=len(values))
+    return FloatingArray(data, mask)
+
+
+def build_bool_column(values: ColumnValues) -> np.ndarray:
+    return np.fromiter((bool(v) for v in values), dtype=bool, count=len(values))
+
+
+def build_string_column(values: ColumnValues) -> StringArray:
+    return pd_array(values, dtype="string")
+
+
+def build_categorical_column(values: ColumnValues, categories: Sequence[str]) -> Categorical:
+    return Categorical(values, categories=list(categories) if categories else None, ordered=True)
+
+
+def build_time_column(values: ColumnValues, parse_epiweeks: bool = False) -> Union[np.ndarray, StringArray]:
+    """Parse dates (and, with ``parse_epiweeks``, the first days of epiweeks) once the
+    format of the column is detected, or else keep them as strings."""
+    time_format = detect_time_format(values)
+    if time_format == "epiweek" and not parse_epiweeks:
+        return build_string_column(values)
+    try:
+        return parse_time_column(values, time_format).astype("datetime64[ns]")
+    except ValueError:
+        return build_string_column(values)
+
+
+def build_numpy_column(
+    info: EpidataFieldInfo,
+    values: ColumnValues,
+    disable_date_parsing: Optional[bool] = False,
+) -> np.ndarray:
+    """Build the NumPy array of a field: masked ``int64`` arrays for integers, ``float64``
+    with NaN for nulls (and for integers that are not all integral), ``bool``,
+    ``datetime64[D]`` with NaT for the dates (and first days of epiweeks) of time fields,
+    and ``object`` arrays of the values otherwise."""
+    data = _int_data(values) if info.type == EpidataFieldType.int else None
+    if data is not None:
+        return np.ma.masked_array(data, _null_mask(values))  # type: ignore[no-untyped-call]
+    if info.type in (EpidataFieldType.int, EpidataFieldType.float):
+        return np.fromiter((nan if v is None else v for v in values), dtype=np.float64, count=len(values))
+    if info.type == EpidataFieldType.bool:
+        return build_bool_column(values)
+    if info.type in TIME_FIELD_TYPES and not disable_date_parsing:
+        try:
+            return parse_time_column(values, TIME_FORMATS[info.type])
+        except ValueError:
+            pass
+    return np.array(values, dtype=object)
+
+
+def build_arrays(
+    meta: Sequence[EpidataFieldInfo],
+    columns: Mapping[str, ColumnValues],
+    fields: Optional[Sequence[str]] = None,
+    disable_date_parsing: Optional[bool] = False,
+    disable_type_parsing: Optional[bool] = False,
+) -> Dict[str, np.ndarray]:
+    """Build a NumPy array per field from buffers of (unparsed) column values
+
+    Without ``meta``, or with ``disable_type_parsing``, the arrays hold the values as they are.
+    """
+    if not meta or disable_type_parsing:
+        return {name: np.array(values, dtype=object) for name, values in columns.items()}
+    pred = fields_to_predicate(fields)
+    n = max((len(values) for values in columns.values()), default=0)
+    arrays: Dict[str, np.ndarray] = {}
+    for info in meta:
+        if pred(info.name):
+            values = columns.get(info.name)
+            arrays[info.name] = build_numpy_column(
+                info, values if values is not None else [None] * n, disable_date_parsing
+            )
+    return arrays
+
+
+def build_null_column(n: int) -> SparseArray:
+    """A column of ``n`` nulls stored sparsely, without a value per row"""
+    return SparseArray(np.full(n, nan), fill_value=nan)
+
+
+def build_column(
+    info: EpidataFieldInfo,
+    values: ColumnValues,
+    disable_date_parsing: Optional[bool] = False,
+    parse_epiweeks: bool = False,
+) -> Union[np.ndarray, ExtensionArray]:
+    """Build a column of the final dtype of the field in a single pass."""
+    if info.type == EpidataFieldType.bool:
+        return build_bool_column(values)
+    if info.type == EpidataFieldType.categorical:
+        return build_categorical_column(values, info.categories)
+    if info.type == EpidataFieldType.int:
+        return build_int_column(values)
+    if info.type == EpidataFieldType.float:
+        return build_float_column(values)
+    if info.type == EpidataFieldType.epiweek and not parse_epiweeks:
+        return build_string_column(values)
+    if info.type in TIME_FIELD_TYPES and not disable_date_parsing:
+        return build_time_column(values, parse_epiweeks)
+    return build_string_column(values)
+
+
+def _build_on_worker(info: EpidataFieldInfo, disable_date_parsing: Optional[bool], parse_epiweeks: bool) -> bool:
+    if info.type not in PARALLEL_FIELD_TYPES:
+        return False
+    if info.type in TIME_FIELD_TYPES:
+        return not disable_date_parsing and (parse_epiweeks or info.type != EpidataFieldType.epiweek)
+    return True
+
+
+def build_frame(
+    meta: Sequence[EpidataFieldInfo],
+    columns: Mapping[str, ColumnValues],
+    fields: Optional[Sequence[str]] = None,
+    disable_date_parsing: Optional[bool] = False,
+    parse_epiweeks: bool = False,
+    null_columns: NullColumns = "keep",
+    executor: Optional[Executor] = None,
+) -> DataFrame:
+    """Build a typed data frame from buffers of (unparsed) column values
+
+    Without ``meta`` the column dtypes are inferred as usual. Epiweeks are kept as
+    ``YYYYWW`` strings unless ``parse_epiweeks`` is set. Columns that are null in every
+    row (or missing) are dropped with ``null_columns="drop"`` and stored as sparse arrays
+    with ``null_columns="sparse"``. Given an ``executor`` (a process pool), the long numeric
+    and time columns are built on its workers while the others are built in-process.
+    """
+    if not meta:
+        return DataFrame(columns)
+    pred = fields_to_predicate(fields)
+    n = max((len(values) for values in columns.values()), default=0)
+    arrays: Dict[str, Any] = {}
+    local = []
+    for info in meta:
+        if pred(info.name):
+            values = columns.get(info.name)
+            if null_columns != "keep" and n and (values is None or all(v is None for v in values)):
+                if null_columns == "sparse":
+                    arrays[info.name] = build_null_column(n)
+                continue
+            if values is None:
+                values = [None] * n
+            if (
+                executor is not None
+                and n >= PARALLEL_MIN_ROWS
+                and _build_on_worker(info, disable_date_parsing, parse_epiweeks)
+            ):
+                arrays[info.name] = executor.submit(build_column, info, values, disable_date_parsing, parse_epiweeks)
+            else:
+                # built once all the worker columns are submitted, so that both run at the same time
+                arrays[info.name] = None
+                local.append((info, values))
+    for info, values in local:
+        arrays[info.name] = build_column(info, values, disable_date_parsing, parse_epiweeks)
+    arrays = {name: array.result() if isinstance(array, Future) else array for name, array in arrays.items()}
+    return DataFrame(arrays, copy=False)
+
+
+def smallest_int_dtype(column: Series) -> Optional[str]:
+    """The narrowest nullable integer dtype holding all values of the column, if narrower than ``Int64``"""
+    if column.isna().all():
+        return COMPACT_INT_DTYPES[0]
+    low, high = column.min(), column.max()
+    for dtype in COMPACT_INT_DTYPES:
+        info = np.iinfo(dtype.lower())
+        if info.min <= low and high <= info.max:
+            return dtype
+    return None
+
+
+def compact_column(
+    column: Series, categories: Optional[Sequence[str]] = None, float32: bool = False
+) -> Optional[Series]:
+    """Shrink a column to a more compact dtype, or return ``None`` if there is none
+
+    Text becomes categorical when ``categories`` are known for it (values outside of them are
+    appended) or when few of its values are distinct, integers are downcast to the narrowest
+    safe width and, with ``float32``, floats are stored in single precision.
+    """
+    dtype = str(column.dtype)
+    if dtype == "string":
+        observed = column.dropna().unique()
+        if categories:
+            known = set(categories)
+            categories = [*categories, *(v for v in observed if v not in known)]
+        elif len(observed) > COMPACT_MAX_CARDINALITY * len(column):
+            return None
+        return column.astype(CategoricalDtype(categories if categories else observed))
+    if dtype == "Int64":
+        int_dtype = smallest_int_dtype(column)
+        return column.astype(int_dtype) if int_dtype else None
+    if dtype == "Float64" and float32:
+        return column.astype("Float32")
+    return None
+
+
+def compact_frame(
+    df: DataFrame, categories: Optional[Mapping[str, Sequence[str]]] = None, float32: bool = False
+) -> DataFrame:
+    """Shrink the columns of a data frame built by :func:`build_frame` to compact dtypes
+
+    The number of bytes saved is reported in ``df.attrs["memory_saved"]``.
+    """
+    categories = categories or {}
+    compacted: Dict[str, Series] = {}
+    saved = 0
+    for name, column in df.items():
+        shrunk = compact_column(column, categories.get(str(name)), float32)
+        if shrunk is not None:
+            compacted[str(name)] = shrunk
+            saved += column.memory_usage(index=False, deep=True) - shrunk.memory_usage(index=False, deep=True)
+    df = df.assign(**compacted) if compacted else df
+    df.attrs["memory_saved"] = int(saved)
+    return df
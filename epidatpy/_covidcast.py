@@ -1,6 +1,7 @@
 from dataclasses import Field, InitVar, asdict, dataclass, field, fields
 from functools import cached_property
 from typing import (
+    TYPE_CHECKING,
     Any,
     Callable,
     Dict,
@@ -18,8 +19,6 @@ from typing import (
     overload,
 )
 
-from pandas import DataFrame
-
 from ._model import (
     CALL_TYPE,
     EpidataFieldInfo,
@@ -28,8 +27,12 @@ from ._model import (
     GeoType,
     InvalidArgumentException,
     TimeType,
+    format_list,
 )
 
+if TYPE_CHECKING:
+    from pandas import DataFrame
+
 
 @dataclass
 class WebLink:
@@ -54,7 +57,7 @@ def _limit_fields(data: Dict[str, Any], class_fields: Tuple[Field, ...]) -> Dict
     return {k: v for k, v in data.items() if k in field_names}
 
 
-def define_covidcast_fields() -> List[EpidataFieldInfo]:
+def define_covidcast_fields(has_stderr: bool = True, has_sample_size: bool = True) -> List[EpidataFieldInfo]:
     return [
         EpidataFieldInfo("source", EpidataFieldType.text),
         EpidataFieldInfo("signal", EpidataFieldType.text),
@@ -69,8 +72,8 @@ def define_covidcast_fields() -> List[EpidataFieldInfo]:
         EpidataFieldInfo("issue", EpidataFieldType.date),
         EpidataFieldInfo("lag", EpidataFieldType.int),
         EpidataFieldInfo("value", EpidataFieldType.float),
-        EpidataFieldInfo("stderr", EpidataFieldType.float),
-        EpidataFieldInfo("sample_size", EpidataFieldType.float),
+        EpidataFieldInfo("stderr", EpidataFieldType.float, always_null=not has_stderr),
+        EpidataFieldInfo("sample_size", EpidataFieldType.float, always_null=not has_sample_size),
         EpidataFieldInfo("direction", EpidataFieldType.float),
         EpidataFieldInfo("missing_value", EpidataFieldType.int),
         EpidataFieldInfo("missing_stderr", EpidataFieldType.int),
@@ -78,6 +81,21 @@ def define_covidcast_fields() -> List[EpidataFieldInfo]:
     ]
 
 
+def define_signal_fields(meta: List[Dict], params: Mapping[str, Optional[EpiRangeParam]]) -> List[EpidataFieldInfo]:
+    """The covidcast fields of a call, marking the statistics that none of its signals have (according
+    to the ``covidcast/meta`` of the sources) as always null."""
+    source, signals = params.get("data_source"), params.get("signals")
+    names = set(format_list(signals).split(",")) if signals is not None else set()
+    found = [s for m in meta for s in m.get("signals", []) if s.get("source") == source and s.get("signal") in names]
+    if not found or len(found) < len(names):
+        # unknown (or wildcard) signals may have any statistic
+        return define_covidcast_fields()
+    return define_covidcast_fields(
+        has_stderr=any(s.get("has_stderr", False) for s in found),
+        has_sample_size=any(s.get("has_sample_size", False) for s in found),
+    )
+
+
 @dataclass
 class DataSignal(Generic[CALL_TYPE]):
     """represents a COVIDcast data signal"""
@@ -118,7 +136,9 @@ class DataSignal(Generic[CALL_TYPE]):
         }
 
     @staticmethod
-    def to_df(signals: Iterable["DataSignal"]) -> DataFrame:
+    def to_df(signals: Iterable["DataSignal"]) -> "DataFrame":
+        from pandas import DataFrame  # pylint: disable=import-outside-toplevel
+
         df = DataFrame(
             [asdict(s) for s in signals],
             columns=[
@@ -218,7 +238,9 @@ class DataSource(Generic[CALL_TYPE]):
         ]
 
     @staticmethod
-    def to_df(sources: Iterable["DataSource"]) -> DataFrame:
+    def to_df(sources: Iterable["DataSource"]) -> "DataFrame":
+        from pandas import DataFrame  # pylint: disable=import-outside-toplevel
+
         df = DataFrame(
             [asdict(source) for source in sources],
             columns=[
@@ -237,7 +259,7 @@ class DataSource(Generic[CALL_TYPE]):
         return next((s for s in self.signals if s.signal == signal), None)
 
     @cached_property
-    def signal_df(self) -> DataFrame:
+    def signal_df(self) -> "DataFrame":
         return DataSignal.to_df(self.signals)
 
 
@@ -268,7 +290,7 @@ class CovidcastDataSources(Generic[CALL_TYPE]):
         return [s.signal for s in self._source_by_name[source].signals]
 
     @cached_property
-    def source_df(self) -> DataFrame:
+    def source_df(self) -> "DataFrame":
         """Fetch metadata about available covidcast sources.
 
         Obtains a data frame of source metadata describing all publicly
@@ -301,7 +323,7 @@ class CovidcastDataSources(Generic[CALL_TYPE]):
         return DataSource.to_df(self.sources)
 
     @cached_property
-    def signal_df(self) -> DataFrame:
+    def signal_df(self) -> "DataFrame":
         """Fetch metadata about available covidcast signals.
 
         Obtains a data frame of metadata describing all publicly available data
@@ -1,6 +1,7 @@
 import warnings
 from abc import ABC, abstractmethod
 from typing import (
+    Final,
     Generic,
     Literal,
     Mapping,
@@ -35,6 +36,32 @@ def get_wildcard_equivalent_dates(time_value: EpiRangeParam, time_type: Literal[
     return time_value
 
 
+# the list parameter of each endpoint that a large call can be sharded on
+SHARDABLE_PARAMS: Final[Mapping[str, str]] = {
+    "cdc": "locations",
+    "covid_hosp_facility": "hospital_pks",
+    "covid_hosp_state_timeseries": "states",
+    "covidcast": "geo_values",
+    "dengue_nowcast": "locations",
+    "dengue_sensors": "locations",
+    "ecdc_ili": "regions",
+    "flusurv": "locations",
+    "fluview_clinical": "regions",
+    "fluview": "regions",
+    "gft": "locations",
+    "ght": "locations",
+    "kcdc_ili": "regions",
+    "nidss_dengue": "locations",
+    "nidss_flu": "regions",
+    "nowcast": "locations",
+    "paho_dengue": "regions",
+    "quidel": "locations",
+    "sensors": "locations",
+    "twitter": "locations",
+    "wiki": "articles",
+}
+
+
 class AEpiDataEndpoints(ABC, Generic[CALL_TYPE]):
     """epidata endpoint list and fetcher"""
 
@@ -0,0 +1,47 @@
+import json
+from typing import Any, Callable, Literal, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+JsonDecoder = Callable[[bytes], Any]
+
+
+def _stdlib_loads(data: bytes) -> Any:
+    # the stdlib decoder detects the encoding of bytes itself
+    return json.loads(data)
+
+
+def _default_decoder() -> JsonDecoder:
+    return orjson.loads if orjson is not None else _stdlib_loads
+
+
+_loads: JsonDecoder = _default_decoder()
+
+
+def set_json_decoder(decoder: Union[Literal["auto", "orjson", "json"], JsonDecoder] = "auto") -> None:
+    """Select how response bodies are decoded.
+
+    ``"auto"`` uses `orjson <https://github.com/ijl/orjson>`_ when it is installed and
+    the standard library otherwise. A callable decoding raw bytes may be given as well.
+    """
+    global _loads  # pylint: disable=global-statement
+    if decoder == "auto":
+        _loads = _default_decoder()
+    elif decoder == "json":
+        _loads = _stdlib_loads
+    elif decoder == "orjson":
+        if orjson is None:
+            raise ImportError("orjson is not installed, install it with `pip install epidatpy[fast]`")
+        _loads = orjson.loads
+    elif callable(decoder):
+        _loads = decoder
+    else:
+        raise ValueError(f"Unknown JSON decoder {decoder!r}")
+
+
+def json_loads(data: bytes) -> Any:
+    """Decode JSON straight from the raw bytes of a response, skipping the text decode."""
+    return _loads(data)
@@ -1,8 +1,12 @@
-from dataclasses import dataclass, field
-from datetime import date
+from dataclasses import dataclass, field, replace
+from datetime import date, timedelta
 from enum import Enum
 from os import environ
 from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
     Final,
     List,
     Literal,
@@ -19,13 +23,41 @@ from urllib.parse import urlencode
 
 from epiweeks import Week
 
+from ._cache import (
+    CACHE_POLICIES,
+    CACHEABLE_RESULTS,
+    DEFAULT_CACHE_POLICY,
+    CachedResponse,
+    Interval,
+    ResponseCache,
+    SeriesPlan,
+    SignalKey,
+    SignalVersion,
+    complete_series,
+    default_response_cache,
+    lookup,
+    plan_series,
+    rows_to_columns,
+    store,
+)
 from ._parse import (
+    fields_to_predicate,
     parse_api_date,
     parse_api_date_or_week,
     parse_api_week,
     parse_user_date_or_week,
 )
 
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    import numpy as np
+    from pandas import DataFrame
+    from polars import DataFrame as PolarsDataFrame
+    from pyarrow import Table
+
+    from ._time import TimeFormat
+
 GeoType = Literal["nation", "msa", "hrr", "hhs", "state", "county"]
 TimeType = Literal["day", "week"]
 EpiDateLike = Union[int, str, date, Week]
@@ -35,6 +67,12 @@ EpiRangeParam = Union[EpiRangeLike, Sequence[EpiRangeLike]]
 StringParam = Union[str, Sequence[str]]
 IntParam = Union[int, Sequence[int]]
 ParamType = Union[StringParam, IntParam, EpiRangeParam]
+# compact dtypes of data frames, with floats narrowed to single precision for "float32"
+Compact = Union[bool, Literal["float32"]]
+# whether classic responses hold a dict per row or an array per field
+Layout = Literal["rows", "columns"]
+# what becomes of columns that are null in every row of a data frame
+NullColumns = Literal["keep", "drop", "sparse"]
 CALL_TYPE = TypeVar("CALL_TYPE")
 
 
@@ -46,6 +84,14 @@ class EpiDataResponse(TypedDict):
     epidata: List
 
 
+class EpiDataColumnsResponse(TypedDict):
+    """response from the API, with the epidata as one array per field"""
+
+    result: int
+    message: str
+    epidata: Dict[str, "np.ndarray"]
+
+
 def format_date(d: EpiDateLike) -> str:
     if isinstance(d, date):
         # YYYYMMDD
@@ -124,6 +170,8 @@ class EpidataFieldInfo:
     type: Final[EpidataFieldType] = EpidataFieldType.text
     description: Final[str] = ""
     categories: Final[Sequence[str]] = field(default_factory=list)
+    # known to be null in every row, e.g. the stderr of a signal without standard errors
+    always_null: Final[bool] = False
 
 
 def add_endpoint_to_url(url: str, endpoint: str) -> str:
@@ -133,6 +181,67 @@ def add_endpoint_to_url(url: str, endpoint: str) -> str:
     return url
 
 
+# the parameters listing the known values of text fields, seeding their categories in compact data frames
+CATEGORY_PARAMS: Final[Mapping[str, str]] = {"source": "data_source", "signal": "signals"}
+# the format of the values of time fields, if not to be detected
+TIME_FORMATS: Final[Mapping[EpidataFieldType, Optional["TimeFormat"]]] = {
+    EpidataFieldType.date: "date",
+    EpidataFieldType.epiweek: "epiweek",
+    EpidataFieldType.date_or_epiweek: None,
+}
+TIME_PARSERS: Final[Mapping[EpidataFieldType, Callable[[Union[str, float, int, None]], Optional[date]]]] = {
+    EpidataFieldType.date: parse_api_date,
+    EpidataFieldType.epiweek: parse_api_week,
+    EpidataFieldType.date_or_epiweek: parse_api_date_or_week,
+}
+
+ColumnConverter = Callable[[List[Any]], List[Any]]
+
+
+def _memoized(convert: ColumnConverter) -> ColumnConverter:
+    """Apply a column converter to the distinct values of a column only."""
+
+    def convert_distinct(values: List[Any]) -> List[Any]:
+        distinct = list(dict.fromkeys(values))
+        if len(distinct) == len(values):
+            return convert(values)
+        lookup = dict(zip(distinct, convert(distinct)))
+        return [lookup[v] for v in values]
+
+    return convert_distinct
+
+
+def _time_converter(field_type: EpidataFieldType) -> ColumnConverter:
+    def convert(values: List[Any]) -> List[Any]:
+        from ._time import parse_time_column  # pylint: disable=import-outside-toplevel
+
+        try:
+            return cast(List[Any], parse_time_column(values, TIME_FORMATS[field_type]).tolist())
+        except ValueError:
+            # the values do not share one format, parse them one by one
+            return [TIME_PARSERS[field_type](v) for v in values]
+
+    return _memoized(convert)
+
+
+def _bool_converter(values: List[Any]) -> List[Any]:
+    return [None if v is None else bool(v) for v in values]
+
+
+def compile_converters(
+    meta: Sequence[EpidataFieldInfo],
+    disable_date_parsing: Optional[bool] = False,
+) -> Dict[str, ColumnConverter]:
+    """Compile a schema into a table of converters of the columns needing parsing"""
+    converters: Dict[str, ColumnConverter] = {}
+    for info in meta:
+        if info.type == EpidataFieldType.bool:
+            converters[info.name] = _bool_converter
+        elif info.type in TIME_FORMATS and not disable_date_parsing:
+            converters[info.name] = _time_converter(info.type)
+    return converters
+
+
 class AEpiDataCall:
     """base epidata call class"""
 
@@ -143,6 +252,7 @@ class AEpiDataCall:
     meta_by_name: Final[Mapping[str, EpidataFieldInfo]]
     only_supports_classic: Final[bool]
     use_cache: Final[bool]
+    _response_cache: Final[Optional[ResponseCache]]
 
     def __init__(
         self,
@@ -153,13 +263,18 @@ class AEpiDataCall:
         only_supports_classic: bool = False,
         use_cache: Optional[bool] = None,
         cache_max_age_days: Optional[int] = None,
+        response_cache: Optional[ResponseCache] = None,
     ) -> None:
         self._base_url = base_url
         self._endpoint = endpoint
         self._params = params
+        # the cache handle of the context that created the call, if any
+        self._response_cache = response_cache
         self.only_supports_classic = only_supports_classic
         self.meta = meta or []
         self.meta_by_name = {k.name: k for k in self.meta}
+        # converters compiled from the meta data, with and without date parsing
+        self._converters: Dict[bool, Dict[str, ColumnConverter]] = {}
         # Set the use_cache value from the constructor if present.
         # Otherwise check the USE_EPIDATPY_CACHE variable, accepting various "truthy" values.
         self.use_cache = (
@@ -218,30 +333,327 @@ class AEpiDataCall:
     def __str__(self) -> str:
         return f"EpiDataCall(endpoint={self._endpoint}, params={self._formatted_parameters()})"
 
-    def _parse_value(
+    def _parse_rows(
         self,
-        key: str,
-        value: Union[str, float, int, None],
+        rows: List[Dict[str, Any]],
         disable_date_parsing: Optional[bool] = False,
-    ) -> Union[str, float, int, date, None]:
-        meta = self.meta_by_name.get(key)
-        if not meta or value is None:
-            return value
-        if meta.type == EpidataFieldType.date_or_epiweek and not disable_date_parsing:
-            return parse_api_date_or_week(value)
-        if meta.type == EpidataFieldType.date and not disable_date_parsing:
-            return parse_api_date(value)
-        if meta.type == EpidataFieldType.epiweek and not disable_date_parsing:
-            return parse_api_week(value)
-        if meta.type == EpidataFieldType.bool:
-            return bool(value)
-        return value
-
-    def _parse_row(
+    ) -> List[Dict[str, Any]]:
+        """Parse the values of classic rows in place, a whole column at a time"""
+        disable_date_parsing = bool(disable_date_parsing)
+        converters = self._converters.get(disable_date_parsing)
+        if converters is None:
+            converters = self._converters[disable_date_parsing] = compile_converters(self.meta, disable_date_parsing)
+        for name, convert in converters.items():
+            parsed = convert([row.get(name) for row in rows])
+            for row, value in zip(rows, parsed):
+                if name in row:
+                    row[name] = value
+        return rows
+
+    def _cache(self) -> ResponseCache:
+        return self._response_cache or default_response_cache()
+
+    def _get_cache_key(self) -> str:
+        # the response is cached once per parameters, whatever the fields and the parsing asked for
+        cache_key = self._endpoint
+        if self._params:
+            cache_key += f" | {str(dict(sorted(self._params.items())))}"
+        return cache_key
+
+    def _lookup_cached(
+        self, fields: Optional[Sequence[str]] = None, version: Optional[Tuple[Any, ...]] = None
+    ) -> Tuple[Optional[CachedResponse], Optional[Sequence[str]]]:
+        """The cached response of the given version holding the requested fields, or else the fields to fetch"""
+        return lookup(self._cache(), self._get_cache_key(), fields, list(self.meta_by_name), version)
+
+    def _signal_keys(self) -> List[SignalKey]:
+        """The covidcast signals whose versions the cached response of the call is revalidated against,
+        none for other endpoints and for historical calls"""
+        if self._endpoint.strip("/") != "covidcast" or self._is_historical():
+            return []
+        source, time_type, geo_type = (self._params.get(k) for k in ("data_source", "time_type", "geo_type"))
+        if not isinstance(source, str) or not isinstance(time_type, str) or not isinstance(geo_type, str):
+            return []
+        signals = self._params.get("signals")
+        names = signals.split(",") if isinstance(signals, str) else signals if isinstance(signals, Sequence) else []
+        return [(source, str(signal), time_type, geo_type) for signal in names]
+
+    def _signal_version(self, versions: Mapping[SignalKey, SignalVersion]) -> Optional[Tuple[Any, ...]]:
+        """The versions of the covidcast signals of the call, unless some of them are unknown"""
+        keys = self._signal_keys()
+        if not keys or any(key not in versions for key in keys):
+            return None
+        return tuple(versions[key] for key in keys)
+
+    @staticmethod
+    def _signal_version_rows(response: EpiDataResponse) -> List[Dict[str, Any]]:
+        if response["result"] != 1:
+            raise ValueError(f"covidcast_meta failed: {response['message']}")
+        return cast(List[Dict[str, Any]], response["epidata"])
+
+    def _is_historical(self, intervals: Sequence[Interval] = ()) -> bool:
+        """Whether the call selects data that can no longer change: of past issues, as of a past date,
+        or reported with a lag that has passed for all of the given time intervals"""
+        from ._chunking import to_time_ranges  # pylint: disable=import-outside-toplevel
+
+        def is_past(t: Union[date, Week]) -> bool:
+            return t < Week.thisweek() if isinstance(t, Week) else t < date.today()
+
+        for param in ("as_of", "issues"):
+            ranges = to_time_ranges(self._params.get(param))
+            if ranges and all(is_past(r.end) for r in ranges):
+                return True
+        lag = self._params.get("lag")
+        if isinstance(lag, int) and intervals:
+            return all(
+                is_past(end + lag if isinstance(end, Week) else end + timedelta(days=lag)) for _, end in intervals
+            )
+        return False
+
+    @staticmethod
+    def _revised_since(
+        cached: Tuple[Any, ...], version: Optional[Tuple[Any, ...]], weekly: bool = False
+    ) -> Optional[Union[date, Week]]:
+        """The first day (or week) the covidcast signals may have revised since their cached
+        versions, ``None`` if unknown
+
+        The issues since then (and the last cached one, which may have been updated along) only
+        report the time values up to the maximum lag of their signal before them.
+        """
+        if version is None or len(cached) != len(version):
+            return None
+        starts: List[Union[date, Week]] = []
+        for cached_signal, signal in zip(cached, version):
+            issue, max_lag = cached_signal[1], signal[3]
+            if not isinstance(issue, int) or not isinstance(max_lag, int):
+                return None
+            last_issue = parse_user_date_or_week(issue, "week" if weekly else "day")
+            starts.append(
+                last_issue - max_lag if isinstance(last_issue, Week) else last_issue - timedelta(days=max_lag)
+            )
+        return min(starts, default=None)
+
+    def _latest_time(self, weekly: bool = False) -> Optional[Union[date, Week]]:
+        """The first day (or week) whose data may still be missing from the API, by the lag the
+        call selects if any, or ``None`` if the call is historical"""
+        if self._is_historical():
+            return None
+        lag = self._params.get("lag")
+        lag = lag if isinstance(lag, int) else 0
+        return Week.thisweek() - lag if weekly else date.today() - timedelta(days=lag)
+
+    def _cache_expire(self, intervals: Sequence[Interval] = (), versioned: bool = False) -> Optional[float]:
+        """Seconds the response of the call stays cached, following the cache policy of its endpoint"""
+        policy = CACHE_POLICIES.get(self._endpoint.strip("/"), DEFAULT_CACHE_POLICY)
+        # a versioned response is revalidated on every lookup, and kept as long as a historical one
+        return policy.expire(versioned or self._is_historical(intervals), self.cache_max_age_days)
+
+    def _store_cached(self, response: CachedResponse, version: Optional[Tuple[Any, ...]] = None) -> CachedResponse:
+        """Cache the response fetched at the given version of the data"""
+        response = replace(response, version=version)
+        store(self._cache(), self._get_cache_key(), response, expire=self._cache_expire(versioned=version is not None))
+        return response
+
+    def _classic_cache_key(self, fields: Optional[Sequence[str]] = None) -> str:
+        # the epidata of classic-only endpoints are not rows to project, so they are cached per fields
+        cache_key = f"{self._get_cache_key()} | classic"
+        return f"{cache_key} | {','.join(fields)}" if fields else cache_key
+
+    @staticmethod
+    def _copy_classic(response: Mapping[str, Any]) -> EpiDataResponse:
+        """A copy of a classic response down to its rows, which parsing them modifies in place"""
+        epidata = response.get("epidata")
+        if isinstance(epidata, list):
+            epidata = [dict(row) if isinstance(row, dict) else row for row in epidata]
+        return cast(EpiDataResponse, {**response, "epidata": epidata})
+
+    def _lookup_cached_classic(self, fields: Optional[Sequence[str]] = None) -> Optional[EpiDataResponse]:
+        """The raw classic response cached for the fields of a call to a classic-only endpoint"""
+        cached = self._cache().get(self._classic_cache_key(fields))
+        return self._copy_classic(cached) if isinstance(cached, dict) else None
+
+    def _store_cached_classic(
+        self, response: EpiDataResponse, fields: Optional[Sequence[str]] = None
+    ) -> EpiDataResponse:
+        """Cache the raw classic response of a call to a classic-only endpoint as is"""
+        if response.get("result") in CACHEABLE_RESULTS:
+            self._cache().set(
+                self._classic_cache_key(fields), self._copy_classic(response), expire=self._cache_expire()
+            )
+        return response
+
+    def _plan_cached_series(
+        self, fields: Optional[Sequence[str]] = None, version: Optional[Tuple[Any, ...]] = None
+    ) -> Optional[SeriesPlan]:
+        """Plan to fetch only the time ranges missing from the cached series of this call, if it selects
+        explicit dates or weeks"""
+        from ._chunking import TIME_PARAM_FIELDS, find_time_param, to_time_ranges  # pylint: disable=import-outside-toplevel
+
+        time_param = find_time_param(self._params, self.meta)
+        ranges = to_time_ranges(self._params.get(time_param)) if time_param else None
+        if not time_param or not ranges:
+            return None
+        intervals = [(r.start, r.end) for r in ranges]
+        if len({isinstance(t, Week) for interval in intervals for t in interval}) > 1:
+            return None
+        # a series is cached for every value of the other parameters
+        others = {k: v for k, v in sorted(self._params.items()) if k != time_param}
+        key = f"{self._endpoint} | {others} | by {time_param}"
+        weekly = isinstance(intervals[0][0], Week)
+        return plan_series(
+            self._cache(),
+            key,
+            TIME_PARAM_FIELDS[time_param],
+            intervals,
+            fields,
+            list(self.meta_by_name),
+            version,
+            revised_since=lambda cached: self._revised_since(cached, version, weekly),
+        )
+
+    def _gap_params(self, plan: SeriesPlan) -> Mapping[str, Optional[EpiRangeParam]]:
+        from ._chunking import find_time_param  # pylint: disable=import-outside-toplevel
+
+        time_param = cast(str, find_time_param(self._params, self.meta))
+        return {**self._params, time_param: [EpiRange(start, end) for start, end in plan.gaps]}
+
+    def _complete_cached_series(
         self,
-        row: Mapping[str, Union[str, float, int, None]],
+        plan: SeriesPlan,
+        fetched: Optional[CachedResponse],
+        fields: Optional[Sequence[str]] = None,
+        version: Optional[Tuple[Any, ...]] = None,
+    ) -> CachedResponse:
+        return complete_series(
+            self._cache(),
+            plan,
+            replace(fetched, version=version) if fetched else None,
+            fields,
+            expire=lambda intervals: self._cache_expire(intervals, versioned=version is not None),
+            latest=self._latest_time(isinstance(plan.intervals[0][0], Week)),
+        )
+
+    @staticmethod
+    def _as_cached_response(
+        response: EpiDataResponse, fields: Optional[Sequence[str]] = None
+    ) -> Optional[CachedResponse]:
+        """The columns of a classic response to cache, or ``None`` if its epidata are not rows"""
+        epidata = response.get("epidata")
+        if epidata is None:
+            epidata = []
+        if not isinstance(epidata, list) or not all(isinstance(row, dict) for row in epidata[:1]):
+            return None
+        columns = rows_to_columns(epidata)
+        return CachedResponse(response["result"], response["message"], columns, tuple(fields) if fields else None)
+
+    @staticmethod
+    def _as_classic_response(response: CachedResponse) -> EpiDataResponse:
+        return {"result": response.result, "message": response.message, "epidata": response.rows()}
+
+    def _as_df(
+        self,
+        rows: Sequence[Mapping[str, Union[str, float, int, None]]],
+        fields: Optional[Sequence[str]] = None,
         disable_date_parsing: Optional[bool] = False,
-    ) -> Mapping[str, Union[str, float, int, date, None]]:
+        parse_epiweeks: bool = False,
+        compact: Compact = False,
+        null_columns: NullColumns = "keep",
+        executor: Optional["Executor"] = None,
+    ) -> "DataFrame":
+        """Build a typed data frame from (unparsed) classic epidata rows"""
+        if not self.meta:
+            from pandas import DataFrame  # pylint: disable=import-outside-toplevel
+
+            return DataFrame(rows)
+        columns = self._rows_to_columns(rows, fields)
+        return self._columns_as_df(
+            columns, fields, disable_date_parsing, parse_epiweeks, compact, null_columns, executor
+        )
+
+    def _rows_to_columns(
+        self,
+        rows: Sequence[Mapping[str, Union[str, float, int, None]]],
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict[str, List[Union[str, float, int, None]]]:
+        """Transpose classic epidata rows into the values of every (requested) column"""
         if not self.meta:
-            return row
-        return {k: self._parse_value(k, v, disable_date_parsing) for k, v in row.items()}
+            names: Sequence[str] = list(dict.fromkeys(name for row in rows for name in row))
+        else:
+            pred = fields_to_predicate(fields)
+            names = [info.name for info in self.meta if pred(info.name)]
+        return {name: [row.get(name) for row in rows] for name in names}
+
+    def _columns_as_df(
+        self,
+        columns: Mapping[str, Sequence[Union[str, float, int, None]]],
+        fields: Optional[Sequence[str]] = None,
+        disable_date_parsing: Optional[bool] = False,
+        parse_epiweeks: bool = False,
+        compact: Compact = False,
+        null_columns: NullColumns = "keep",
+        executor: Optional["Executor"] = None,
+    ) -> "DataFrame":
+        """Build a typed data frame from buffers of (unparsed) column values"""
+        from ._columnar import build_frame, compact_frame  # pylint: disable=import-outside-toplevel
+
+        df = build_frame(self.meta, columns, fields, disable_date_parsing, parse_epiweeks, null_columns, executor)
+        if compact:
+            df = compact_frame(df, self._known_categories(), float32=compact == "float32")
+        return df
+
+    def _useful_fields(self, fields: Optional[Sequence[str]] = None) -> Optional[Sequence[str]]:
+        """The fields to request, excluding those known to be null in every row"""
+        pred = fields_to_predicate(fields)
+        exclude = [f"-{info.name}" for info in self.meta if info.always_null and pred(info.name)]
+        return [*(fields or []), *exclude] if exclude else fields
+
+    def _as_columns_response(
+        self,
+        response: EpiDataResponse,
+        fields: Optional[Sequence[str]] = None,
+        disable_date_parsing: Optional[bool] = False,
+        disable_type_parsing: Optional[bool] = False,
+    ) -> EpiDataColumnsResponse:
+        """Turn an (unparsed) classic response into one with a typed array per field"""
+        from ._columnar import build_arrays  # pylint: disable=import-outside-toplevel
+
+        epidata = response.get("epidata")
+        rows = epidata if isinstance(epidata, list) else []
+        columns = self._rows_to_columns(rows, fields)
+        arrays = build_arrays(self.meta, columns, fields, disable_date_parsing, disable_type_parsing)
+        return {"result": response["result"], "message": response["message"], "epidata": arrays}
+
+    def _known_categories(self) -> Dict[str, List[str]]:
+        """Values of text fields known from the parameters of the call, e.g. the requested signals"""
+        categories: Dict[str, List[str]] = {}
+        for name, param in CATEGORY_PARAMS.items():
+            value = self._params.get(param)
+            if name in self.meta_by_name and value is not None:
+                values = format_list(value).split(",")
+                if "*" not in values:
+                    categories[name] = values
+        return categories
+
+    def _columns_as_table(
+        self,
+        columns: Mapping[str, Sequence[Union[str, float, int, None]]],
+        fields: Optional[Sequence[str]] = None,
+        disable_date_parsing: Optional[bool] = False,
+        parse_epiweeks: bool = False,
+    ) -> "Table":
+        """Build an Arrow table from buffers of (unparsed) column values"""
+        from ._arrow import build_table  # pylint: disable=import-outside-toplevel
+
+        return build_table(self.meta, columns, fields, disable_date_parsing, parse_epiweeks)
+
+    def _columns_as_polars(
+        self,
+        columns: Mapping[str, Sequence[Union[str, float, int, None]]],
+        fields: Optional[Sequence[str]] = None,
+        disable_date_parsing: Optional[bool] = False,
+        parse_epiweeks: bool = False,
+    ) -> "PolarsDataFrame":
+        """Build a Polars data frame from buffers of (unparsed) column values"""
+        from ._polars import build_polars_frame  # pylint: disable=import-outside-toplevel
+
+        return build_polars_frame(self.meta, columns, fields, disable_date_parsing, parse_epiweeks)
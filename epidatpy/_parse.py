@@ -71,6 +71,11 @@ def parse_user_date_or_week(
     raise ValueError(f"Cannot parse date or week from {value}")
 
 
+def is_integral(values: Sequence[Union[str, float, int, None]]) -> bool:
+    """Whether none of the values is a float with a fractional part, so that integers can hold them all"""
+    return not any(isinstance(v, float) and not v.is_integer() for v in values)
+
+
 def fields_to_predicate(
     fields: Optional[Sequence[str]] = None,
 ) -> Callable[[str], bool]:
@@ -0,0 +1,96 @@
+from typing import Any, List, Mapping, Optional, Sequence
+
+try:
+    import polars as pl
+except ImportError as e:  # pragma: no cover
+    raise ImportError("Polars output requires polars, install it with `pip install epidatpy[polars]`") from e
+
+from ._model import EpidataFieldInfo, EpidataFieldType
+from ._parse import fields_to_predicate, is_integral
+from ._time import as_ints, detect_time_format, parse_time_column
+
+ColumnValues = Sequence[Any]
+
+
+def build_string_series(name: str, values: ColumnValues) -> pl.Series:
+    return pl.Series(name, values, dtype=pl.String, strict=False)
+
+
+def build_enum_series(name: str, values: ColumnValues, categories: Optional[Sequence[str]] = None) -> pl.Series:
+    """Strings restricted to the given categories (if any) in their order"""
+    strings = build_string_series(name, values)
+    if not categories:
+        return strings.cast(pl.Categorical)
+    # values outside of the categories become nulls, as in a pandas categorical
+    return strings.cast(pl.Enum(list(categories)), strict=False)
+
+
+def build_epiweek_series(name: str, values: ColumnValues) -> pl.Series:
+    """``YYYYWW`` epiweeks as 32-bit integers"""
+    ints, mask = as_ints(values)
+    series = pl.Series(name, ints.astype("int32"))
+    return series.set(pl.Series(mask), None) if mask.any() else series
+
+
+def build_time_series(
+    name: str, values: ColumnValues, field_type: EpidataFieldType, parse_epiweeks: bool = False
+) -> pl.Series:
+    """Dates as ``Date``, and epiweeks as integers (or the ``Date`` of their first days),
+    falling back to strings when the values do not share one format."""
+    time_format = "epiweek" if field_type == EpidataFieldType.epiweek else detect_time_format(values)
+    try:
+        if time_format == "epiweek" and not parse_epiweeks:
+            return build_epiweek_series(name, values)
+        return pl.Series(name, parse_time_column(values, time_format), dtype=pl.Date)
+    except ValueError:
+        return build_string_series(name, values)
+
+
+def build_polars_series(
+    info: EpidataFieldInfo,
+    values: ColumnValues,
+    disable_date_parsing: Optional[bool] = False,
+    parse_epiweeks: bool = False,
+) -> pl.Series:
+    """Build the Polars series of a field straight from its values, with the integers that
+    are not all integral as ``Float64``."""
+    if info.type == EpidataFieldType.int and is_integral(values):
+        return pl.Series(info.name, values, dtype=pl.Int64, strict=False)
+    if info.type in (EpidataFieldType.int, EpidataFieldType.float):
+        return pl.Series(info.name, values, dtype=pl.Float64, strict=False)
+    if info.type == EpidataFieldType.bool:
+        return pl.Series(info.name, values, dtype=pl.Boolean, strict=False)
+    if info.type == EpidataFieldType.categorical:
+        return build_enum_series(info.name, values, info.categories)
+    if info.type == EpidataFieldType.text or disable_date_parsing:
+        return build_string_series(info.name, values)
+    return build_time_series(info.name, values, info.type, parse_epiweeks)
+
+
+def build_polars_frame(
+    meta: Sequence[EpidataFieldInfo],
+    columns: Mapping[str, ColumnValues],
+    fields: Optional[Sequence[str]] = None,
+    disable_date_parsing: Optional[bool] = False,
+    parse_epiweeks: bool = False,
+) -> pl.DataFrame:
+    """Build a Polars data frame from buffers of (unparsed) column values
+
+    Categorical fields become enums, dates are ``Date`` and epiweeks ``Int32``
+    (``YYYYWW``) unless ``parse_epiweeks`` is set. Without ``meta`` the column types
+    are inferred.
+    """
+    if not meta:
+        return pl.DataFrame(dict(columns), strict=False)
+    pred = fields_to_predicate(fields)
+    n = max((len(values) for values in columns.values()), default=0)
+    series: List[pl.Series] = []
+    for info in meta:
+        if pred(info.name):
+            values = columns.get(info.name)
+            series.append(
+                build_polars_series(
+                    info, values if values is not None else [None] * n, disable_date_parsing, parse_epiweeks
+                )
+            )
+    return pl.DataFrame(series)
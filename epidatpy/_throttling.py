@@ -0,0 +1,127 @@
+from asyncio import sleep as async_sleep
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from random import uniform
+from threading import Lock
+from time import monotonic, sleep
+from typing import TYPE_CHECKING, Any, Callable, Dict, Final, FrozenSet, Optional, Union
+
+if TYPE_CHECKING:
+    from tenacity import RetryCallState
+
+# 429 Too Many Requests and the 5xx codes of an overloaded or restarting server
+RETRYABLE_STATUS_CODES: Final[FrozenSet[int]] = frozenset({429, 500, 502, 503, 504})
+DEFAULT_MAX_RETRIES: Final = 3
+DEFAULT_BACKOFF_INITIAL: Final = 0.5
+DEFAULT_BACKOFF_MAX: Final = 30.0
+DEFAULT_BACKOFF_JITTER: Final = 0.5
+
+
+class RateLimiter:
+    """token bucket limiting requests to ``rate`` per second, in bursts of up to ``burst``
+
+    A single limiter can be shared by several contexts, sync and async alike: tokens are
+    reserved under a lock and the wait for them happens outside of it.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        if rate <= 0:
+            raise ValueError("`rate` must be positive")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = monotonic()
+        self._lock = Lock()
+
+    def reserve(self) -> float:
+        """Take a token, returning the number of seconds to wait before it may be used."""
+        with self._lock:
+            now = monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # the balance goes negative while callers queue up for tokens that are yet to be refilled
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self) -> None:
+        """Block until a request may be made."""
+        delay = self.reserve()
+        if delay > 0:
+            sleep(delay)
+
+    async def acquire_async(self) -> None:
+        """Wait, without blocking the event loop, until a request may be made."""
+        delay = self.reserve()
+        if delay > 0:
+            await async_sleep(delay)
+
+
+def as_rate_limiter(rate_limit: Union[None, float, RateLimiter], burst: int = 1) -> Optional[RateLimiter]:
+    """Create a limiter from a number of requests per second, or pass a shared one through."""
+    if rate_limit is None or isinstance(rate_limit, RateLimiter):
+        return rate_limit
+    return RateLimiter(rate_limit, burst)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a ``Retry-After`` header, given either in seconds or as an HTTP date."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        until = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if until.tzinfo is None:
+        until = until.replace(tzinfo=timezone.utc)
+    return max(0.0, (until - datetime.now(timezone.utc)).total_seconds())
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """how requests failing with a retryable error are retried
+
+    Connection errors, timeouts and responses with one of ``retryable_status_codes`` are
+    retried up to ``max_retries`` times. Between attempts the client waits for as long as
+    the server's ``Retry-After`` header asks, or else backs off exponentially from
+    ``backoff_initial`` seconds with up to ``jitter`` seconds of random jitter. No single
+    wait exceeds ``backoff_max`` seconds.
+    """
+
+    max_retries: int = DEFAULT_MAX_RETRIES
+    backoff_initial: float = DEFAULT_BACKOFF_INITIAL
+    backoff_max: float = DEFAULT_BACKOFF_MAX
+    jitter: float = DEFAULT_BACKOFF_JITTER
+    retryable_status_codes: FrozenSet[int] = RETRYABLE_STATUS_CODES
+
+    def backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Seconds to wait after the given (1-based) failed attempt."""
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            delay = self.backoff_initial * 2 ** (attempt - 1) + uniform(0, self.jitter)
+        return min(delay, self.backoff_max)
+
+    def retrying_kwargs(
+        self,
+        is_retryable: Callable[[BaseException], bool],
+        get_retry_after: Callable[[BaseException], Optional[str]],
+    ) -> Dict[str, Any]:
+        """Arguments of a tenacity ``Retrying`` (or ``AsyncRetrying``) following this policy."""
+        from tenacity import retry_if_exception, stop_after_attempt  # pylint: disable=import-outside-toplevel
+
+        def wait(state: "RetryCallState") -> float:
+            error = state.outcome.exception() if state.outcome else None
+            return self.backoff(state.attempt_number, get_retry_after(error) if error is not None else None)
+
+        return {
+            "reraise": True,
+            "stop": stop_after_attempt(self.max_retries + 1),
+            "retry": retry_if_exception(is_retryable),
+            "wait": wait,
+        }
+
+
+DEFAULT_RETRY_POLICY: Final = RetryPolicy()
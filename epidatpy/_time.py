@@ -0,0 +1,80 @@
+from typing import Literal, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+TimeFormat = Literal["date", "epiweek"]
+TimeValues = Sequence[Union[str, float, int, None]]
+
+
+def detect_time_format(values: TimeValues) -> Optional[TimeFormat]:
+    """Detect the format of a time column from its first value: ``YYYYMMDD`` and
+    ``YYYY-MM-DD`` dates, or ``YYYYWW`` epiweeks."""
+    first = next((v for v in values if v is not None), None)
+    if first is None:
+        return None
+    length = len(str(first))
+    if length in (8, 10):
+        return "date"
+    if length == 6:
+        return "epiweek"
+    return None
+
+
+def as_ints(values: TimeValues) -> Tuple[np.ndarray, np.ndarray]:
+    """The values as integers (dropping the dashes of ISO dates) and their null mask."""
+    mask = np.fromiter((v is None for v in values), dtype=bool, count=len(values))
+    ints = np.fromiter(
+        (0 if v is None else int(v.replace("-", "")) if isinstance(v, str) else int(v) for v in values),
+        dtype=np.int64,
+        count=len(values),
+    )
+    return ints, mask
+
+
+def dates_to_datetime64(values: TimeValues) -> np.ndarray:
+    """Convert ``YYYYMMDD`` (or ``YYYY-MM-DD``) dates to ``datetime64[D]``, with NaT for nulls."""
+    ints, mask = as_ints(values)
+    ints = np.where(mask, 19700101, ints)
+    month, day = ints // 100 % 100, ints % 100
+    months = ((ints // 10000 - 1970) * 12 + month - 1).astype("datetime64[M]")
+    days: np.ndarray = months.astype("datetime64[D]") + (day - 1)
+    invalid = (
+        (ints < 10000000) | (ints > 99999999) | (month < 1) | (month > 12) | (days.astype("datetime64[M]") != months)
+    )
+    if invalid.any():
+        raise ValueError(f"Invalid dates {ints[invalid][:5].tolist()}")
+    days[mask] = np.datetime64("NaT")
+    return days
+
+
+def epiweek_starts(years: np.ndarray) -> np.ndarray:
+    """The first day (a Sunday) of the first CDC epiweek of every year, the week containing January 4."""
+    jan4 = (years - 1970).astype("datetime64[Y]").astype("datetime64[D]") + 3
+    # 1970-01-01 was a Thursday, the 4th day of a week starting on Sunday
+    return jan4 - (jan4.astype(np.int64) + 4) % 7
+
+
+def epiweeks_to_datetime64(values: TimeValues) -> np.ndarray:
+    """Convert ``YYYYWW`` epiweeks to the ``datetime64[D]`` of their first day, with NaT for nulls."""
+    ints, mask = as_ints(values)
+    ints = np.where(mask, 197001, ints)
+    years, weeks = ints // 100, ints % 100
+    days: np.ndarray = epiweek_starts(years) + 7 * (weeks - 1)
+    invalid = (ints < 100000) | (ints > 999999) | (weeks < 1) | (days >= epiweek_starts(years + 1))
+    if invalid.any():
+        raise ValueError(f"Invalid epiweeks {ints[invalid][:5].tolist()}")
+    days[mask] = np.datetime64("NaT")
+    return days
+
+
+def parse_time_column(values: TimeValues, time_format: Optional[TimeFormat] = None) -> np.ndarray:
+    """Parse a whole column of dates or epiweeks to ``datetime64[D]``, detecting its format
+    unless given. Raises a ``ValueError`` if the values are not all of that format."""
+    time_format = time_format or detect_time_format(values)
+    if time_format == "date":
+        return dates_to_datetime64(values)
+    if time_format == "epiweek":
+        return epiweeks_to_datetime64(values)
+    if all(v is None for v in values):
+        return np.full(len(values), np.datetime64("NaT"), dtype="datetime64[D]")
+    raise ValueError("Cannot detect the format of the time values")
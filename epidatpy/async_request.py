@@ -0,0 +1,495 @@
+import warnings
+from asyncio import AbstractEventLoop, Semaphore, gather, get_running_loop
+from asyncio import TimeoutError as AsyncTimeoutError
+from dataclasses import dataclass
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Final,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+    overload,
+)
+
+from aiohttp import BasicAuth, ClientConnectionError, ClientResponse, ClientResponseError, ClientSession, TCPConnector
+from tenacity import AsyncRetrying
+
+from ._auth import _get_api_key
+from ._cache import DEFAULT_CACHE_MEMORY_BYTES, SIGNAL_VERSION_FIELDS, SIGNAL_VERSIONS, CachedResponse, ResponseCache
+from ._chunking import bisect_params, is_truncated, merge_responses
+from ._constants import BASE_URL, HTTP_HEADERS
+from ._covidcast import CovidcastDataSources, define_signal_fields
+from ._endpoints import AEpiDataEndpoints
+from ._json import json_loads
+from ._model import (
+    AEpiDataCall,
+    Compact,
+    EpiDataColumnsResponse,
+    EpidataFieldInfo,
+    EpiDataResponse,
+    EpiRangeParam,
+    Layout,
+    NullColumns,
+    OnlySupportsClassicFormatException,
+    add_endpoint_to_url,
+)
+from ._throttling import DEFAULT_RETRY_POLICY, RateLimiter, RetryPolicy, as_rate_limiter
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
+
+DEFAULT_MAX_CONCURRENT_REQUESTS: Final = 10
+
+
+class AsyncHTTPClient:
+    """aiohttp session, concurrency and rate limits shared by an async context and its calls
+
+    Unless a session is given, the client owns a pooled session. It is created lazily
+    within the running event loop, as is the semaphore, and replaced (once closed) if the
+    client is used from another loop.
+    """
+
+    def __init__(
+        self,
+        session: Optional[ClientSession] = None,
+        max_concurrent_requests: int = DEFAULT_MAX_CONCURRENT_REQUESTS,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+    ) -> None:
+        self._session = session
+        self._owns_session = session is None
+        self.max_concurrent_requests = max_concurrent_requests
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self._semaphore: Optional[Semaphore] = None
+        self._loop: Optional[AbstractEventLoop] = None
+
+    async def _bind_loop(self) -> None:
+        loop = get_running_loop()
+        if self._loop is loop:
+            return
+        # asyncio primitives (and aiohttp sessions) are bound to the loop they were created in
+        self._loop = loop
+        self._semaphore = Semaphore(self.max_concurrent_requests)
+        if self._owns_session:
+            await self.close()
+
+    def _pooled_session(self) -> ClientSession:
+        if self._owns_session and (self._session is None or self._session.closed):
+            self._session = ClientSession(connector=TCPConnector(limit=self.max_concurrent_requests))
+        assert self._session is not None
+        return self._session
+
+    async def get_json(self, url: str, params: Mapping[str, str], raise_for_status: bool = False) -> Any:
+        """Make the request within the concurrency limit and decode the JSON body."""
+        await self._bind_loop()
+        assert self._semaphore is not None
+        async with self._semaphore:
+            return await self._request(self._pooled_session(), url, params, raise_for_status)
+
+    async def _request(
+        self, session: ClientSession, url: str, params: Mapping[str, str], raise_for_status: bool
+    ) -> Any:
+        return await _async_request_with_retry(
+            session, url, params, raise_for_status, rate_limiter=self.rate_limiter, retry_policy=self.retry_policy
+        )
+
+    async def close(self) -> None:
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+def _is_retryable(error: BaseException, retry_policy: RetryPolicy) -> bool:
+    if isinstance(error, ClientResponseError):
+        return error.status in retry_policy.retryable_status_codes
+    return isinstance(error, (ClientConnectionError, AsyncTimeoutError))
+
+
+def _retry_after(error: BaseException) -> Optional[str]:
+    if isinstance(error, ClientResponseError) and error.headers:
+        return error.headers.get("Retry-After")
+    return None
+
+
+async def _async_request_with_retry(
+    session: ClientSession,
+    url: str,
+    params: Mapping[str, str],
+    raise_for_status: bool = False,
+    rate_limiter: Optional[RateLimiter] = None,
+    retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+) -> Any:
+    """Make request, retrying connection errors and retryable status codes as per the retry policy."""
+    basic_auth = BasicAuth("epidata", _get_api_key())
+
+    async def read_json(res: ClientResponse) -> Any:
+        if raise_for_status or res.status in retry_policy.retryable_status_codes:
+            res.raise_for_status()
+        body = await res.read()
+        return json_loads(body) if body.strip() else None
+
+    async def attempt() -> Any:
+        if rate_limiter:
+            await rate_limiter.acquire_async()
+        async with session.get(url, params=params, headers=HTTP_HEADERS, auth=basic_auth) as res:
+            if res.status != 414:
+                return await read_json(res)
+        if rate_limiter:
+            await rate_limiter.acquire_async()
+        async with session.post(url, params=params, headers=HTTP_HEADERS, auth=basic_auth) as res:
+            return await read_json(res)
+
+    retrying = AsyncRetrying(
+        **retry_policy.retrying_kwargs(lambda error: _is_retryable(error, retry_policy), _retry_after)
+    )
+    return await retrying(attempt)
+
+
+class AsyncEpiDataCall(AEpiDataCall):
+    """async epidata call representation"""
+
+    _client: Final[AsyncHTTPClient]
+
+    def __init__(
+        self,
+        base_url: str,
+        client: AsyncHTTPClient,
+        endpoint: str,
+        params: Mapping[str, Optional[EpiRangeParam]],
+        meta: Optional[Sequence[EpidataFieldInfo]] = None,
+        only_supports_classic: bool = False,
+        use_cache: Optional[bool] = None,
+        cache_max_age_days: Optional[int] = None,
+        response_cache: Optional[ResponseCache] = None,
+    ) -> None:
+        super().__init__(
+            base_url, endpoint, params, meta, only_supports_classic, use_cache, cache_max_age_days, response_cache
+        )
+        self._client = client
+
+    def with_base_url(self, base_url: str) -> "AsyncEpiDataCall":
+        return AsyncEpiDataCall(
+            base_url,
+            self._client,
+            self._endpoint,
+            self._params,
+            self.meta,
+            self.only_supports_classic,
+            self.use_cache,
+            self.cache_max_age_days,
+            self._response_cache,
+        )
+
+    def _with_params(self, params: Mapping[str, Optional[EpiRangeParam]]) -> "AsyncEpiDataCall":
+        return AsyncEpiDataCall(
+            self._base_url,
+            self._client,
+            self._endpoint,
+            params,
+            self.meta,
+            self.only_supports_classic,
+            self.use_cache,
+            self.cache_max_age_days,
+            self._response_cache,
+        )
+
+    async def _call(
+        self,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Any:
+        url, params = self.request_arguments(fields)
+        return await self._client.get_json(url, params)
+
+    async def _fetch_classic(self, fields: Optional[Sequence[str]] = None) -> EpiDataResponse:
+        """Request the unparsed classic response, bisecting the call until no part of it is truncated."""
+        r = cast(EpiDataResponse, await self._call(fields))
+        if not is_truncated(r):
+            return r
+        halves = bisect_params(self._params, self.meta, self._endpoint)
+        if halves is None:
+            warnings.warn(f"{self} returned truncated results and cannot be split any further", UserWarning)
+            return r
+        responses = await gather(*(self._with_params(params)._fetch_classic(fields) for params in halves))
+        return merge_responses(responses)
+
+    async def _fetch_response(self, fields: Optional[Sequence[str]] = None) -> CachedResponse:
+        response = self._as_cached_response(await self._fetch_classic(fields), fields)
+        if response is None:
+            raise ValueError(f"{self} did not return rows")
+        return response
+
+    async def _cache_version(self) -> Optional[Tuple[Any, ...]]:
+        """The versions of the covidcast signals of the call reported by covidcast_meta, if any."""
+        if not self._signal_keys():
+            return None
+        meta_call = AsyncEpiDataCall(self._base_url, self._client, "covidcast_meta/", {}, use_cache=False)
+
+        async def fetch() -> List[Dict[str, Any]]:
+            return self._signal_version_rows(await meta_call._fetch_classic(SIGNAL_VERSION_FIELDS))
+
+        try:
+            versions = await SIGNAL_VERSIONS.aget(self._base_url, fetch)
+        except Exception:  # pylint: disable=broad-except
+            # without the versions the cached response is kept for its TTL
+            return None
+        return self._signal_version(versions)
+
+    async def _response(self, fields: Optional[Sequence[str]] = None) -> CachedResponse:
+        """The unparsed response as columns, served from the cache if it holds all of the fields."""
+        if not self.use_cache:
+            return await self._fetch_response(fields)
+        version = await self._cache_version()
+        plan = self._plan_cached_series(fields, version)
+        if plan is not None:
+            fetched = None
+            if plan.gaps:
+                fetched = await self._with_params(self._gap_params(plan))._fetch_response(plan.fields)
+            return self._complete_cached_series(plan, fetched, fields, version)
+        cached, fetch_fields = self._lookup_cached(fields, version)
+        if cached is not None:
+            return cached
+        response = self._store_cached(await self._fetch_response(fetch_fields), version)
+        return response.project(fields)
+
+    @overload
+    async def classic(
+        self,
+        fields: Optional[Sequence[str]] = ...,
+        disable_date_parsing: Optional[bool] = ...,
+        disable_type_parsing: Optional[bool] = ...,
+        layout: Literal["rows"] = ...,
+    ) -> EpiDataResponse: ...
+
+    @overload
+    async def classic(
+        self,
+        fields: Optional[Sequence[str]] = ...,
+        disable_date_parsing: Optional[bool] = ...,
+        disable_type_parsing: Optional[bool] = ...,
+        *,
+        layout: Literal["columns"],
+    ) -> EpiDataColumnsResponse: ...
+
+    async def classic(
+        self,
+        fields: Optional[Sequence[str]] = None,
+        disable_date_parsing: Optional[bool] = False,
+        disable_type_parsing: Optional[bool] = False,
+        layout: Layout = "rows",
+    ) -> Union[EpiDataResponse, EpiDataColumnsResponse]:
+        """Request and parse epidata in CLASSIC message format (see ``EpiDataCall.classic``)."""
+        if layout == "columns":
+            r = await self.classic(fields, disable_type_parsing=True)
+            return self._as_columns_response(r, fields, disable_date_parsing, disable_type_parsing)
+        self._verify_parameters()
+        try:
+            if self.use_cache and self.only_supports_classic:
+                r = self._lookup_cached_classic(fields) or self._store_cached_classic(
+                    await self._fetch_classic(fields), fields
+                )
+            elif self.use_cache:
+                r = self._as_classic_response(await self._response(fields))
+            else:
+                r = await self._fetch_classic(fields)
+            if disable_type_parsing:
+                return r
+            epidata = r.get("epidata")
+            if epidata and isinstance(epidata, list) and len(epidata) > 0 and isinstance(epidata[0], dict):
+                r["epidata"] = self._parse_rows(epidata, disable_date_parsing=disable_date_parsing)
+            return r
+        except Exception as e:  # pylint: disable=broad-except
+            return {"result": 0, "message": f"error: {e}", "epidata": []}
+
+    async def __call__(
+        self,
+        fields: Optional[Sequence[str]] = None,
+        disable_date_parsing: Optional[bool] = False,
+    ) -> Union[EpiDataResponse, "DataFrame"]:
+        """Request and parse epidata in df message format."""
+        if self.only_supports_classic:
+            return await self.classic(
+                fields,
+                disable_date_parsing=disable_date_parsing,
+                disable_type_parsing=False,
+            )
+        return await self.df(fields, disable_date_parsing=disable_date_parsing)
+
+    async def df(
+        self,
+        fields: Optional[Sequence[str]] = None,
+        disable_date_parsing: Optional[bool] = False,
+        parse_epiweeks: bool = False,
+        compact: Compact = False,
+        null_columns: NullColumns = "keep",
+    ) -> "DataFrame":
+        """Request and parse epidata as a pandas data frame (see ``EpiDataCall.df``)"""
+        if self.only_supports_classic:
+            raise OnlySupportsClassicFormatException()
+        self._verify_parameters()
+
+        # fields known to be null are not requested, but dropped or made sparse like the others
+        request_fields = self._useful_fields(fields) if null_columns != "keep" else fields
+        json = await self.classic(request_fields, disable_type_parsing=True)
+        return self._as_df(json.get("epidata", []), fields, disable_date_parsing, parse_epiweeks, compact, null_columns)
+
+
+class AsyncEpiDataContext(AEpiDataEndpoints[AsyncEpiDataCall]):
+    """async epidata call class
+
+    Owns a pooled aiohttp session (unless one is given) that is shared by all the calls
+    it creates. At most ``max_concurrent_requests`` requests are in flight at a time,
+    and at most ``rate_limit`` are started per second, as for :class:`EpiDataContext`.
+    It holds the cache open for its lifetime as well, as :class:`EpiDataContext` does.
+    Use it as an async context manager or ``await close()`` it when done.
+    """
+
+    _base_url: Final[str]
+    _client: Final[AsyncHTTPClient]
+    _response_cache: Final[ResponseCache]
+    _owns_response_cache: Final[bool]
+
+    def __init__(
+        self,
+        base_url: str = BASE_URL,
+        session: Optional[ClientSession] = None,
+        use_cache: Optional[bool] = None,
+        cache_max_age_days: Optional[int] = None,
+        max_concurrent_requests: int = DEFAULT_MAX_CONCURRENT_REQUESTS,
+        client: Optional[AsyncHTTPClient] = None,
+        rate_limit: Union[None, float, RateLimiter] = None,
+        burst: int = 1,
+        retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+        cache_memory_bytes: int = DEFAULT_CACHE_MEMORY_BYTES,
+        response_cache: Optional[ResponseCache] = None,
+    ) -> None:
+        super().__init__()
+        self._base_url = base_url
+        self._client = client or AsyncHTTPClient(
+            session, max_concurrent_requests, rate_limiter=as_rate_limiter(rate_limit, burst), retry_policy=retry_policy
+        )
+        self.use_cache = use_cache
+        self.cache_max_age_days = cache_max_age_days
+        self._owns_response_cache = response_cache is None
+        self._response_cache = response_cache or ResponseCache(cache_memory_bytes)
+
+    def with_base_url(self, base_url: str) -> "AsyncEpiDataContext":
+        return AsyncEpiDataContext(
+            base_url,
+            use_cache=self.use_cache,
+            cache_max_age_days=self.cache_max_age_days,
+            client=self._client,
+            response_cache=self._response_cache,
+        )
+
+    def with_session(self, session: ClientSession) -> "AsyncEpiDataContext":
+        return AsyncEpiDataContext(
+            self._base_url,
+            session,
+            self.use_cache,
+            self.cache_max_age_days,
+            self._client.max_concurrent_requests,
+            rate_limit=self._client.rate_limiter,
+            retry_policy=self._client.retry_policy,
+            response_cache=self._response_cache,
+        )
+
+    async def close(self) -> None:
+        """Close the pooled session and the cache owned by this context."""
+        await self._client.close()
+        if self._owns_response_cache:
+            self._response_cache.close()
+
+    async def __aenter__(self) -> "AsyncEpiDataContext":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    def _create_call(
+        self,
+        endpoint: str,
+        params: Mapping[str, Optional[EpiRangeParam]],
+        meta: Optional[Sequence[EpidataFieldInfo]] = None,
+        only_supports_classic: bool = False,
+    ) -> AsyncEpiDataCall:
+        return AsyncEpiDataCall(
+            self._base_url,
+            self._client,
+            endpoint,
+            params,
+            meta,
+            only_supports_classic,
+            self.use_cache,
+            self.cache_max_age_days,
+            self._response_cache,
+        )
+
+
+@dataclass
+class AsyncCovidcastDataSources(CovidcastDataSources[AsyncEpiDataCall]):
+    """COVIDcast data source helper whose calls share the pooled session of one client
+
+    Use it as an async context manager or ``await close()`` it when done.
+    """
+
+    _client: Optional[AsyncHTTPClient] = None
+
+    async def close(self) -> None:
+        """Close the pooled session shared by the calls."""
+        if self._client is not None:
+            await self._client.close()
+
+    async def __aenter__(self) -> "AsyncCovidcastDataSources":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+
+async def AsyncCovidcastEpidata(
+    base_url: str = BASE_URL,
+    session: Optional[ClientSession] = None,
+    use_cache: Optional[bool] = None,
+    cache_max_age_days: Optional[int] = None,
+    max_concurrent_requests: int = DEFAULT_MAX_CONCURRENT_REQUESTS,
+    rate_limit: Union[None, float, RateLimiter] = None,
+    burst: int = 1,
+    retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+) -> AsyncCovidcastDataSources:
+    # the meta request and all the signal calls share one pool of connections and one rate limit
+    client = AsyncHTTPClient(
+        session,
+        max_concurrent_requests,
+        rate_limiter=as_rate_limiter(rate_limit, burst),
+        retry_policy=retry_policy,
+    )
+    url = add_endpoint_to_url(base_url, "covidcast/meta")
+    try:
+        meta_data = await client.get_json(url, {}, raise_for_status=True)
+    except BaseException:
+        await client.close()
+        raise
+
+    def create_call(
+        params: Mapping[str, Optional[EpiRangeParam]],
+    ) -> AsyncEpiDataCall:
+        return AsyncEpiDataCall(
+            base_url,
+            client,
+            "covidcast",
+            params,
+            define_signal_fields(meta_data, params),
+            use_cache=use_cache,
+            cache_max_age_days=cache_max_age_days,
+        )
+
+    sources = CovidcastDataSources.create(meta_data, create_call)
+    return AsyncCovidcastDataSources(sources.sources, create_call, client)
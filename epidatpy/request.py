@@ -1,66 +1,158 @@
 import inspect
-from os import environ
+import warnings
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+from dataclasses import dataclass
+from threading import Lock
+from time import monotonic
 from typing import (
+    TYPE_CHECKING,
     Any,
+    Callable,
     Dict,
     Final,
+    Iterable,
+    Iterator,
     List,
+    Literal,
     Mapping,
     Optional,
     Sequence,
+    Tuple,
+    TypeVar,
     Union,
     cast,
+    overload,
 )
+from urllib.parse import urlencode
 
-from appdirs import user_cache_dir
-from diskcache import Cache
-from pandas import CategoricalDtype, DataFrame, Series, to_datetime
-from requests import Response, Session
+from requests import ConnectionError as RequestsConnectionError
+from requests import HTTPError, Response, Session, Timeout
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
-from tenacity import retry, stop_after_attempt
+from tenacity import Retrying
 
 from ._auth import _get_api_key
+from ._cache import DEFAULT_CACHE_MEMORY_BYTES, SIGNAL_VERSION_FIELDS, SIGNAL_VERSIONS, CachedResponse, ResponseCache
+from ._chunking import (
+    DEFAULT_MAX_ROWS,
+    DEFAULT_MAX_URL_LENGTH,
+    ChunkBy,
+    bisect_params,
+    is_truncated,
+    merge_responses,
+    plan_chunks,
+)
 from ._constants import BASE_URL, HTTP_HEADERS
-from ._covidcast import CovidcastDataSources, define_covidcast_fields
+from ._covidcast import CovidcastDataSources, define_signal_fields
 from ._endpoints import AEpiDataEndpoints
+from ._json import json_loads
 from ._model import (
     AEpiDataCall,
+    Compact,
+    EpiDataColumnsResponse,
     EpidataFieldInfo,
-    EpidataFieldType,
     EpiDataResponse,
     EpiRangeParam,
+    InvalidArgumentException,
+    Layout,
+    NullColumns,
     OnlySupportsClassicFormatException,
     add_endpoint_to_url,
+    format_list,
 )
-from ._parse import fields_to_predicate
+from ._throttling import DEFAULT_RETRY_POLICY, RateLimiter, RetryPolicy, as_rate_limiter
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
+    from polars import DataFrame as PolarsDataFrame
+    from polars import LazyFrame
+    from pyarrow import Table
+
+DEFAULT_POOL_CONNECTIONS: Final = 10
+DEFAULT_POOL_MAXSIZE: Final = 10
+DEFAULT_POOL_IDLE_TIMEOUT: Final = 60.0
+# one worker per pooled connection, so that no connection has to be discarded
+DEFAULT_MAX_WORKERS: Final = DEFAULT_POOL_MAXSIZE
+DEFAULT_BATCH_ROWS: Final = 100_000
+
+T = TypeVar("T")
+R = TypeVar("R")
+DtypeBackend = Literal["numpy_nullable", "pyarrow"]
+
+
+class PooledSession(Session):
+    """requests session with a sized pool of keep-alive connections
+
+    ``pool_connections`` is the number of hosts to keep a pool for and ``pool_maxsize`` the
+    number of connections kept per host. Pooled connections are dropped once the session has
+    been idle for more than ``idle_timeout`` seconds, as the server will have closed them by then.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        idle_timeout: Optional[float] = DEFAULT_POOL_IDLE_TIMEOUT,
+    ) -> None:
+        super().__init__()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+        self.idle_timeout = idle_timeout
+        self._last_used = monotonic()
+        self._idle_lock = Lock()
+
+    def request(self, *args: Any, **kwargs: Any) -> Response:
+        with self._idle_lock:
+            now = monotonic()
+            if self.idle_timeout is not None and now - self._last_used > self.idle_timeout:
+                # connections in use are checked out of the pool, so only idle ones get closed
+                for adapter in self.adapters.values():
+                    adapter.close()
+            self._last_used = now
+        return super().request(*args, **kwargs)
 
-# Make the linter happy about the unused variables
-CACHE_DIRECTORY = user_cache_dir(appname="epidatpy", appauthor="delphi")
 
-if environ.get("USE_EPIDATPY_CACHE", None):
-    print(
-        f"diskcache is being used (unset USE_EPIDATPY_CACHE if not intended). "
-        f"The cache directory is {CACHE_DIRECTORY}. "
-        f"The TTL is set to {environ.get('EPIDATPY_CACHE_MAX_AGE_DAYS', '7')} days."
-    )
+def _is_retryable(error: BaseException) -> bool:
+    # HTTP errors are only raised for the retryable status codes of the policy
+    return isinstance(error, (HTTPError, RequestsConnectionError, Timeout))
+
+
+def _retry_after(error: BaseException) -> Optional[str]:
+    response = error.response if isinstance(error, HTTPError) else None
+    return response.headers.get("Retry-After") if response is not None else None
 
 
-@retry(reraise=True, stop=stop_after_attempt(2))
 def _request_with_retry(
     url: str,
     params: Mapping[str, str],
     session: Optional[Session] = None,
     stream: bool = False,
+    rate_limiter: Optional[RateLimiter] = None,
+    retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
 ) -> Response:
-    """Make request with a retry if an exception is thrown."""
+    """Make request, retrying connection errors and retryable status codes as per the retry policy."""
     basic_auth = HTTPBasicAuth("epidata", _get_api_key())
 
-    def call_impl(s: Session) -> Response:
-        res = s.get(url, params=params, headers=HTTP_HEADERS, stream=stream, auth=basic_auth)
+    def send(s: Session, method: str) -> Response:
+        if rate_limiter:
+            rate_limiter.acquire()
+        res = s.request(method, url, params=params, headers=HTTP_HEADERS, stream=stream, auth=basic_auth)
+        if res.status_code in retry_policy.retryable_status_codes:
+            res.close()
+            raise HTTPError(f"{res.status_code} {res.reason} for url: {res.url}", response=res)
+        return res
+
+    def attempt(s: Session) -> Response:
+        res = send(s, "GET")
         if res.status_code == 414:
-            return s.post(url, params=params, headers=HTTP_HEADERS, stream=stream, auth=basic_auth)
+            return send(s, "POST")
         return res
 
+    def call_impl(s: Session) -> Response:
+        return Retrying(**retry_policy.retrying_kwargs(_is_retryable, _retry_after))(attempt, s)
+
     if session:
         return call_impl(session)
 
@@ -68,10 +160,131 @@ def _request_with_retry(
         return call_impl(s)
 
 
+def _iter_jsonl_columns(lines: Iterable[bytes], batch_rows: Optional[int] = None) -> Iterator[Dict[str, List[Any]]]:
+    """Decode JSONL rows one at a time into lists of values per column, yielding them
+    every ``batch_rows`` rows (or once all rows are read). The values stay boxed Python
+    objects until the columns are built."""
+    columns: Dict[str, List[Any]] = {}
+    n = 0
+    for line in lines:
+        if not line:
+            continue
+        row = json_loads(line)
+        for name, value in row.items():
+            column = columns.get(name)
+            if column is None:
+                column = columns[name] = [None] * n
+            column.append(value)
+        n += 1
+        if len(row) != len(columns):
+            for column in columns.values():
+                if len(column) < n:
+                    column.append(None)
+        if n == batch_rows:
+            yield columns
+            columns = {name: [] for name in columns}
+            n = 0
+    if n:
+        yield columns
+
+
+def _slice_columns(columns: Dict[str, List[Any]], batch_rows: int) -> Iterator[Dict[str, List[Any]]]:
+    n = max((len(column) for column in columns.values()), default=0)
+    for start in range(0, n, batch_rows):
+        yield {name: column[start : start + batch_rows] for name, column in columns.items()}
+
+
+def _concat_columns(parts: Sequence[Dict[str, List[Any]]]) -> Dict[str, List[Any]]:
+    """Concatenate column buffers, padding the columns missing from some of them."""
+    columns: Dict[str, List[Any]] = {}
+    n = 0
+    for part in parts:
+        part_n = max((len(column) for column in part.values()), default=0)
+        for name in part.keys() - columns.keys():
+            columns[name] = [None] * n
+        for name, column in columns.items():
+            column.extend(part.get(name) or [None] * part_n)
+        n += part_n
+    return columns
+
+
+class ParsePool(Executor):
+    """process pool building the columns of large data frames, shared by the calls of a context
+
+    The ``workers`` processes are only started once a column long enough to be worth
+    shipping is submitted, and stay up until the pool is shut down.
+    """
+
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = Lock()
+
+    def submit(self, fn: Callable[..., R], *args: Any, **kwargs: Any) -> "Future[R]":
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool.submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True, **kwargs: Any) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait)
+
+
+def as_parse_pool(parse_workers: Union[int, ParsePool]) -> Optional[ParsePool]:
+    """Create a pool of ``parse_workers`` processes (none for at most one), or pass a shared one through."""
+    if isinstance(parse_workers, ParsePool):
+        return parse_workers
+    return ParsePool(parse_workers) if parse_workers > 1 else None
+
+
+def _execute_concurrently(
+    fn: Callable[[T], R],
+    items: Sequence[T],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> Iterator[Tuple[int, Optional[R], Optional[Exception]]]:
+    """Apply ``fn`` to the items on a thread pool, yielding ``(index, result, error)`` as they complete.
+
+    Items are submitted as workers free up, so that at most ``max_workers`` results are
+    waiting for a slow consumer at any time.
+    """
+    if not items:
+        return
+    max_workers = max(1, min(max_workers, len(items)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        queue = iter(enumerate(items))
+        pending: Dict[Future[R], int] = {}
+
+        def submit_next() -> None:
+            for i, item in queue:
+                pending[executor.submit(fn, item)] = i
+                return
+
+        for _ in range(max_workers):
+            submit_next()
+        while pending:
+            done, _ = wait_futures(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                submit_next()
+                error = future.exception()
+                if error is None:
+                    yield index, future.result(), None
+                elif isinstance(error, Exception):
+                    yield index, None, error
+                else:
+                    raise error
+
+
 class EpiDataCall(AEpiDataCall):
     """epidata call representation"""
 
     _session: Final[Optional[Session]]
+    _rate_limiter: Final[Optional[RateLimiter]]
+    _retry_policy: Final[RetryPolicy]
+    _parse_pool: Final[Optional[Executor]]
 
     def __init__(
         self,
@@ -83,15 +296,78 @@ class EpiDataCall(AEpiDataCall):
         only_supports_classic: bool = False,
         use_cache: Optional[bool] = None,
         cache_max_age_days: Optional[int] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+        response_cache: Optional[ResponseCache] = None,
+        parse_pool: Optional[Executor] = None,
     ) -> None:
-        super().__init__(base_url, endpoint, params, meta, only_supports_classic, use_cache, cache_max_age_days)
+        super().__init__(
+            base_url, endpoint, params, meta, only_supports_classic, use_cache, cache_max_age_days, response_cache
+        )
         self._session = session
+        self._rate_limiter = rate_limiter
+        self._retry_policy = retry_policy
+        self._parse_pool = parse_pool
 
     def with_base_url(self, base_url: str) -> "EpiDataCall":
-        return EpiDataCall(base_url, self._session, self._endpoint, self._params)
+        return EpiDataCall(
+            base_url,
+            self._session,
+            self._endpoint,
+            self._params,
+            self.meta,
+            self.only_supports_classic,
+            self.use_cache,
+            self.cache_max_age_days,
+            self._rate_limiter,
+            self._retry_policy,
+            self._response_cache,
+            self._parse_pool,
+        )
 
     def with_session(self, session: Session) -> "EpiDataCall":
-        return EpiDataCall(self._base_url, session, self._endpoint, self._params)
+        return self._with_transport(
+            session, self._rate_limiter, self._retry_policy, self._response_cache, self._parse_pool
+        )
+
+    def _with_transport(
+        self,
+        session: Optional[Session],
+        rate_limiter: Optional[RateLimiter],
+        retry_policy: RetryPolicy,
+        response_cache: Optional[ResponseCache],
+        parse_pool: Optional[Executor],
+    ) -> "EpiDataCall":
+        return EpiDataCall(
+            self._base_url,
+            session,
+            self._endpoint,
+            self._params,
+            self.meta,
+            self.only_supports_classic,
+            self.use_cache,
+            self.cache_max_age_days,
+            rate_limiter,
+            retry_policy,
+            response_cache,
+            parse_pool,
+        )
+
+    def _with_params(self, params: Mapping[str, Optional[EpiRangeParam]]) -> "EpiDataCall":
+        return EpiDataCall(
+            self._base_url,
+            self._session,
+            self._endpoint,
+            params,
+            self.meta,
+            self.only_supports_classic,
+            self.use_cache,
+            self.cache_max_age_days,
+            self._rate_limiter,
+            self._retry_policy,
+            self._response_cache,
+            self._parse_pool,
+        )
 
     def _call(
         self,
@@ -99,48 +375,223 @@ class EpiDataCall(AEpiDataCall):
         stream: bool = False,
     ) -> Response:
         url, params = self.request_arguments(fields)
-        return _request_with_retry(url, params, self._session, stream)
+        return _request_with_retry(
+            url, params, self._session, stream, rate_limiter=self._rate_limiter, retry_policy=self._retry_policy
+        )
 
-    def _get_cache_key(self, method: str) -> str:
-        cache_key = f"{self._endpoint} | {method}"
-        if self._params:
-            cache_key += f" | {str(dict(sorted(self._params.items())))}"
-        return cache_key
+    def _stream_columns(self, fields: Optional[Sequence[str]] = None) -> Dict[str, List[Any]]:
+        """Stream the rows in JSONL format, decoding them into column buffers as they arrive."""
+        batches = list(self._stream_column_batches(fields))
+        return batches[0] if batches else {}
 
-    def classic(
+    def _stream_column_batches(
+        self,
+        fields: Optional[Sequence[str]] = None,
+        batch_rows: Optional[int] = None,
+    ) -> Iterator[Dict[str, List[Any]]]:
+        url, params = self.request_arguments(fields)
+        with _request_with_retry(
+            url,
+            {**params, "format": "jsonl"},
+            self._session,
+            True,
+            rate_limiter=self._rate_limiter,
+            retry_policy=self._retry_policy,
+        ) as res:
+            # errors are reported by status code, as there is no envelope around the rows
+            res.raise_for_status()
+            yield from _iter_jsonl_columns(res.iter_lines(), batch_rows)
+
+    def _fetch_classic(self, fields: Optional[Sequence[str]] = None) -> EpiDataResponse:
+        """Request the unparsed classic response, bisecting the call until no part of it is truncated."""
+        r = cast(EpiDataResponse, json_loads(self._call(fields).content))
+        if not is_truncated(r):
+            return r
+        halves = bisect_params(self._params, self.meta, self._endpoint)
+        if halves is None:
+            warnings.warn(f"{self} returned truncated results and cannot be split any further", UserWarning)
+            return r
+        responses: List[EpiDataResponse] = [r, r]
+        for i, half, error in _execute_concurrently(
+            lambda params: self._with_params(params)._fetch_classic(fields), halves, max_workers=2
+        ):
+            if error is not None:
+                raise error
+            responses[i] = cast(EpiDataResponse, half)
+        return merge_responses(responses)
+
+    def _fetch_response(self, fields: Optional[Sequence[str]] = None, stream: bool = False) -> CachedResponse:
+        if stream:
+            columns = self._stream_columns(fields)
+            result = 1 if any(columns.values()) else -2
+            return CachedResponse(
+                result, "success" if result == 1 else "no results", columns, tuple(fields or ()) or None
+            )
+        r = self._fetch_classic(fields)
+        response = self._as_cached_response(r, fields)
+        if response is None:
+            raise ValueError(f"{self} did not return rows")
+        return response
+
+    def _cache_version(self) -> Optional[Tuple[Any, ...]]:
+        """The versions of the covidcast signals of the call reported by covidcast_meta, if any."""
+        if not self._signal_keys():
+            return None
+        meta_call = EpiDataCall(
+            self._base_url,
+            self._session,
+            "covidcast_meta/",
+            {},
+            use_cache=False,
+            rate_limiter=self._rate_limiter,
+            retry_policy=self._retry_policy,
+        )
+        try:
+            versions = SIGNAL_VERSIONS.get(
+                self._base_url,
+                lambda: self._signal_version_rows(meta_call._fetch_classic(SIGNAL_VERSION_FIELDS)),
+            )
+        except Exception:  # pylint: disable=broad-except
+            # without the versions the cached response is kept for its TTL
+            return None
+        return self._signal_version(versions)
+
+    def _response(self, fields: Optional[Sequence[str]] = None, stream: bool = False) -> CachedResponse:
+        """The unparsed response as columns, served from the cache if it holds all of the fields
+        of the current version of the data."""
+        if not self.use_cache:
+            return self._fetch_response(fields, stream)
+        version = self._cache_version()
+        plan = self._plan_cached_series(fields, version)
+        if plan is not None:
+            fetched = None
+            if plan.gaps:
+                fetched = self._with_params(self._gap_params(plan))._fetch_response(plan.fields, stream)
+            return self._complete_cached_series(plan, fetched, fields, version)
+        cached, fetch_fields = self._lookup_cached(fields, version)
+        if cached is not None:
+            return cached
+        response = self._store_cached(self._fetch_response(fetch_fields, stream), version)
+        return response.project(fields)
+
+    def _classic(
         self,
         fields: Optional[Sequence[str]] = None,
         disable_date_parsing: Optional[bool] = False,
         disable_type_parsing: Optional[bool] = False,
     ) -> EpiDataResponse:
-        """Request and parse epidata in CLASSIC message format."""
+        if self.use_cache and self.only_supports_classic:
+            r = self._lookup_cached_classic(fields) or self._store_cached_classic(self._fetch_classic(fields), fields)
+        elif self.use_cache:
+            r = self._as_classic_response(self._response(fields))
+        else:
+            r = self._fetch_classic(fields)
+        if disable_type_parsing:
+            return r
+        epidata = r.get("epidata")
+        if epidata and isinstance(epidata, list) and len(epidata) > 0 and isinstance(epidata[0], dict):
+            r["epidata"] = self._parse_rows(epidata, disable_date_parsing=disable_date_parsing)
+        return r
+
+    @overload
+    def classic(
+        self,
+        fields: Optional[Sequence[str]] = ...,
+        disable_date_parsing: Optional[bool] = ...,
+        disable_type_parsing: Optional[bool] = ...,
+        layout: Literal["rows"] = ...,
+    ) -> EpiDataResponse: ...
+
+    @overload
+    def classic(
+        self,
+        fields: Optional[Sequence[str]] = ...,
+        disable_date_parsing: Optional[bool] = ...,
+        disable_type_parsing: Optional[bool] = ...,
+        *,
+        layout: Literal["columns"],
+    ) -> EpiDataColumnsResponse: ...
+
+    def classic(
+        self,
+        fields: Optional[Sequence[str]] = None,
+        disable_date_parsing: Optional[bool] = False,
+        disable_type_parsing: Optional[bool] = False,
+        layout: Layout = "rows",
+    ) -> Union[EpiDataResponse, EpiDataColumnsResponse]:
+        """Request and parse epidata in CLASSIC message format.
+
+        With ``layout="columns"`` the epidata is a dict of one NumPy array per field rather
+        than a list of row dicts: masked ``int64`` arrays for integers, ``float64`` arrays
+        with NaN for nulls, ``bool`` arrays, ``datetime64[D]`` arrays of the dates (and the
+        first days of epiweeks) of time fields and ``object`` arrays otherwise.
+        """
         self._verify_parameters()
         try:
-            if self.use_cache:
-                with Cache(CACHE_DIRECTORY) as cache:
-                    cache_key = self._get_cache_key("classic")
-                    if cache_key in cache:
-                        return cast(EpiDataResponse, cache[cache_key])
-            response = self._call(fields)
-            r = cast(EpiDataResponse, response.json())
-            if disable_type_parsing:
-                return r
-            epidata = r.get("epidata")
-            if epidata and isinstance(epidata, list) and len(epidata) > 0 and isinstance(epidata[0], dict):
-                r["epidata"] = [self._parse_row(row, disable_date_parsing=disable_date_parsing) for row in epidata]
-            if self.use_cache:
-                with Cache(CACHE_DIRECTORY) as cache:
-                    cache_key = self._get_cache_key("classic")
-                    cache.set(cache_key, r, expire=self.cache_max_age_days * 24 * 60 * 60)
-            return r
+            if layout == "columns":
+                r = self._classic(fields, disable_type_parsing=True)
+                return self._as_columns_response(r, fields, disable_date_parsing, disable_type_parsing)
+            return self._classic(fields, disable_date_parsing, disable_type_parsing)
         except Exception as e:  # pylint: disable=broad-except
-            return {"result": 0, "message": f"error: {e}", "epidata": []}
+            error: EpiDataResponse = {"result": 0, "message": f"error: {e}", "epidata": []}
+            return self._as_columns_response(error, fields) if layout == "columns" else error
+
+    def _chunk_calls(
+        self,
+        fields: Optional[Sequence[str]],
+        chunk_by: Union[ChunkBy, Sequence[ChunkBy]],
+        max_rows: int = DEFAULT_MAX_ROWS,
+        max_url_length: int = DEFAULT_MAX_URL_LENGTH,
+    ) -> List["EpiDataCall"]:
+        url = add_endpoint_to_url(self._base_url, self._endpoint)
+        if fields:
+            max_url_length -= len(urlencode({"fields": format_list(fields)})) + 1
+        chunks = plan_chunks(self._params, self.meta, chunk_by, self._endpoint, url, max_rows, max_url_length)
+        return [self._with_params(params) for params in chunks]
+
+    def _stream_columns_chunked(
+        self,
+        fields: Optional[Sequence[str]],
+        chunk_by: Union[ChunkBy, Sequence[ChunkBy]],
+        max_rows: int = DEFAULT_MAX_ROWS,
+        max_url_length: int = DEFAULT_MAX_URL_LENGTH,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> Dict[str, List[Any]]:
+        """Stream concurrent chunks into column buffers, concatenated in order."""
+        calls = self._chunk_calls(fields, chunk_by, max_rows, max_url_length)
+        parts: List[Dict[str, List[Any]]] = [{}] * len(calls)
+        for i, part, error in _execute_concurrently(
+            lambda call: call._response(fields, True).columns, calls, max_workers
+        ):
+            if error is not None:
+                raise error
+            parts[i] = cast(Dict[str, List[Any]], part)
+        return _concat_columns(parts)
+
+    def _classic_chunked(
+        self,
+        fields: Optional[Sequence[str]],
+        chunk_by: Union[ChunkBy, Sequence[ChunkBy]],
+        max_rows: int = DEFAULT_MAX_ROWS,
+        max_url_length: int = DEFAULT_MAX_URL_LENGTH,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> EpiDataResponse:
+        """Fetch the unparsed classic response as concurrent chunks, concatenated in order."""
+        calls = self._chunk_calls(fields, chunk_by, max_rows, max_url_length)
+        responses: List[EpiDataResponse] = [{"result": -2, "message": "no results", "epidata": []}] * len(calls)
+        for i, r, error in _execute_concurrently(
+            lambda call: call._classic(fields, disable_type_parsing=True), calls, max_workers
+        ):
+            if error is not None:
+                raise error
+            responses[i] = cast(EpiDataResponse, r)
+        return merge_responses(responses)
 
     def __call__(
         self,
         fields: Optional[Sequence[str]] = None,
         disable_date_parsing: Optional[bool] = False,
-    ) -> Union[EpiDataResponse, DataFrame]:
+    ) -> Union[EpiDataResponse, "DataFrame"]:
         """Request and parse epidata in df message format."""
         if self.only_supports_classic:
             return self.classic(
@@ -154,80 +605,308 @@ class EpiDataCall(AEpiDataCall):
         self,
         fields: Optional[Sequence[str]] = None,
         disable_date_parsing: Optional[bool] = False,
-    ) -> DataFrame:
-        """Request and parse epidata as a pandas data frame"""
+        chunk_by: Union[None, ChunkBy, Sequence[ChunkBy]] = None,
+        max_rows: int = DEFAULT_MAX_ROWS,
+        max_url_length: int = DEFAULT_MAX_URL_LENGTH,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        stream: bool = False,
+        parse_epiweeks: bool = False,
+        dtype_backend: DtypeBackend = "numpy_nullable",
+        compact: Compact = False,
+        null_columns: NullColumns = "keep",
+    ) -> "DataFrame":
+        """Request and parse epidata as a pandas data frame
+
+        Dates are parsed into ``datetime64`` columns, while epiweeks are kept as ``YYYYWW``
+        strings unless ``parse_epiweeks`` is set, which converts them to the dates of their
+        first days (as ``classic()`` does). With ``dtype_backend="pyarrow"`` the columns are
+        backed by the Arrow arrays of :meth:`arrow` instead of pandas' nullable dtypes.
+
+        With ``compact=True`` the frame takes less memory: text fields with few distinct
+        values (and those listed by the call, such as the requested ``source`` and
+        ``signal`` names) become categoricals and integers like ``lag`` are downcast to the
+        narrowest width that holds them. ``compact="float32"`` also stores floats such as
+        ``value`` and ``stderr`` in single precision. The number of bytes saved is reported
+        in ``df.attrs["memory_saved"]``.
+
+        Columns that are null in every row are dropped with ``null_columns="drop"``, or
+        stored as sparse arrays with ``null_columns="sparse"``. Fields known to be null, such
+        as the ``stderr`` and ``sample_size`` of covidcast signals without them, are then not
+        requested at all.
+
+        The numeric and time columns of large responses (of at least 100,000 rows) are parsed
+        in parallel if the context was created with ``parse_workers`` (see
+        :class:`EpiDataContext`).
+
+        With ``chunk_by="time"`` the time range of the call is split into sub-ranges
+        estimated to return at most ``max_rows`` rows each. With ``chunk_by="list"`` the
+        endpoint's list parameter (e.g. ``geo_values``, ``regions`` or ``hospital_pks``) is
+        sharded so that every request also stays below ``max_url_length`` characters. Both
+        can be combined with ``chunk_by=["list", "time"]``. The chunks are fetched
+        concurrently on up to ``max_workers`` threads and concatenated in order. Unlike a
+        single request, a chunked request raises the error of a failing chunk rather than
+        returning partial data.
+
+        With ``stream=True`` the rows are requested in JSONL format and decoded into column
+        buffers as they arrive, instead of holding the whole JSON response and a list of row
+        dicts in memory. The buffers are lists of the decoded Python values, so they take
+        about twice the memory of the final frame, and memory peaks at about three times its
+        size while the frame is built (rather than about five times for a classic response).
+        Use :meth:`iter_batches` to bound it further. Errors are raised rather than returned. Note that the API does not
+        flag a streamed response that hit its row limit, so truncated results cannot be
+        detected (or bisected) in this mode; combine it with ``chunk_by`` to keep the calls
+        below the limit.
+        """
+        return self._df(
+            fields,
+            disable_date_parsing,
+            chunk_by=chunk_by,
+            max_rows=max_rows,
+            max_url_length=max_url_length,
+            max_workers=max_workers,
+            stream=stream,
+            parse_epiweeks=parse_epiweeks,
+            dtype_backend=dtype_backend,
+            compact=compact,
+            null_columns=null_columns,
+        )
+
+    def arrow(
+        self,
+        fields: Optional[Sequence[str]] = None,
+        disable_date_parsing: Optional[bool] = False,
+        chunk_by: Union[None, ChunkBy, Sequence[ChunkBy]] = None,
+        max_rows: int = DEFAULT_MAX_ROWS,
+        max_url_length: int = DEFAULT_MAX_URL_LENGTH,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        stream: bool = False,
+        parse_epiweeks: bool = False,
+    ) -> "Table":
+        """Request and parse epidata as an Apache Arrow table (requires ``pyarrow``)
+
+        Every column is built straight from the response in the Arrow type of its field:
+        text and categorical fields are dictionary-encoded, dates are ``date32`` and epiweeks
+        ``int32`` (``YYYYWW``), or the ``date32`` of their first days with ``parse_epiweeks``.
+        The other arguments are those of :meth:`df`, and the cache is used as it is by :meth:`df`.
+        """
         if self.only_supports_classic:
             raise OnlySupportsClassicFormatException()
         self._verify_parameters()
+        columns = self._fetch_columns(fields, False, chunk_by, max_rows, max_url_length, max_workers, stream)
+        return self._columns_as_table(columns, fields, disable_date_parsing, parse_epiweeks)
 
-        if self.use_cache:
-            with Cache(CACHE_DIRECTORY) as cache:
-                cache_key = self._get_cache_key("df")
-                if cache_key in cache:
-                    return cast(DataFrame, cache[cache_key])
-
-        json = self.classic(fields, disable_type_parsing=True)
-        rows = json.get("epidata", [])
-        pred = fields_to_predicate(fields)
-        columns: List[str] = [info.name for info in self.meta if pred(info.name)]
-        df = DataFrame(rows, columns=columns or None)
-
-        data_types: Dict[str, Any] = {}
-        time_fields: List[EpidataFieldInfo] = []
-        for info in self.meta:
-            if not pred(info.name):
-                continue
-            if info.type == EpidataFieldType.bool:
-                data_types[info.name] = bool
-            elif info.type == EpidataFieldType.categorical:
-                data_types[info.name] = CategoricalDtype(
-                    categories=Series(info.categories) if info.categories else None,
-                    ordered=True,
-                )
-            elif info.type == EpidataFieldType.int:
-                data_types[info.name] = "Int64"
-            elif info.type in (
-                EpidataFieldType.date,
-                EpidataFieldType.epiweek,
-                EpidataFieldType.date_or_epiweek,
-            ):
-                data_types[info.name] = "string"
-                time_fields.append(info)
-            elif info.type == EpidataFieldType.float:
-                data_types[info.name] = "Float64"
-            else:
-                data_types[info.name] = "string"
-        if data_types:
-            df = df.astype(data_types)
-        if not disable_date_parsing:
-            for info in time_fields:
-                if info.type == EpidataFieldType.epiweek:
-                    continue
-                # Try two date foramts, otherwise keep as string. The try except
-                # is needed because the time field might be date_or_epiweek.
-                try:
-                    df[info.name] = to_datetime(df[info.name], format="%Y-%m-%d")
-                    continue
-                except ValueError:
-                    pass
-                try:
-                    df[info.name] = to_datetime(df[info.name], format="%Y%m%d")
-                except ValueError:
-                    pass
+    @overload
+    def polars(
+        self,
+        fields: Optional[Sequence[str]] = ...,
+        disable_date_parsing: Optional[bool] = ...,
+        chunk_by: Union[None, ChunkBy, Sequence[ChunkBy]] = ...,
+        max_rows: int = ...,
+        max_url_length: int = ...,
+        max_workers: int = ...,
+        stream: bool = ...,
+        parse_epiweeks: bool = ...,
+        lazy: Literal[False] = ...,
+    ) -> "PolarsDataFrame": ...
 
-        if self.use_cache:
-            with Cache(CACHE_DIRECTORY) as cache:
-                cache_key = self._get_cache_key("df")
-                cache.set(cache_key, df, expire=self.cache_max_age_days * 24 * 60 * 60)
+    @overload
+    def polars(
+        self,
+        fields: Optional[Sequence[str]] = ...,
+        disable_date_parsing: Optional[bool] = ...,
+        chunk_by: Union[None, ChunkBy, Sequence[ChunkBy]] = ...,
+        max_rows: int = ...,
+        max_url_length: int = ...,
+        max_workers: int = ...,
+        stream: bool = ...,
+        parse_epiweeks: bool = ...,
+        *,
+        lazy: Literal[True],
+    ) -> "LazyFrame": ...
+
+    def polars(
+        self,
+        fields: Optional[Sequence[str]] = None,
+        disable_date_parsing: Optional[bool] = False,
+        chunk_by: Union[None, ChunkBy, Sequence[ChunkBy]] = None,
+        max_rows: int = DEFAULT_MAX_ROWS,
+        max_url_length: int = DEFAULT_MAX_URL_LENGTH,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        stream: bool = False,
+        parse_epiweeks: bool = False,
+        lazy: bool = False,
+    ) -> Union["PolarsDataFrame", "LazyFrame"]:
+        """Request and parse epidata as a Polars data frame (requires ``polars``)
+
+        Every column is built straight from the response in the Polars type of its field,
+        without going through pandas: categorical fields are enums, dates are ``Date`` and
+        epiweeks ``Int32`` (``YYYYWW``), or the ``Date`` of their first days with
+        ``parse_epiweeks``. With ``lazy`` a ``LazyFrame`` over the fetched data is returned.
+        The other arguments are those of :meth:`df`, and the cache is used as it is by :meth:`df`.
+        """
+        if self.only_supports_classic:
+            raise OnlySupportsClassicFormatException()
+        self._verify_parameters()
+        columns = self._fetch_columns(fields, False, chunk_by, max_rows, max_url_length, max_workers, stream)
+        df = self._columns_as_polars(columns, fields, disable_date_parsing, parse_epiweeks)
+        return df.lazy() if lazy else df
+
+    def iter_batches(
+        self,
+        rows: int = DEFAULT_BATCH_ROWS,
+        fields: Optional[Sequence[str]] = None,
+        disable_date_parsing: Optional[bool] = False,
+        chunk_by: Union[None, ChunkBy, Sequence[ChunkBy]] = None,
+        max_rows: int = DEFAULT_MAX_ROWS,
+        max_url_length: int = DEFAULT_MAX_URL_LENGTH,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        parse_epiweeks: bool = False,
+    ) -> Iterator["DataFrame"]:
+        """Request epidata and yield it as data frames of at most ``rows`` rows each
+
+        The frames are typed like those of :meth:`df`. Without ``chunk_by``, the rows are
+        streamed in JSONL format and every batch is yielded as soon as it has been read. With
+        ``chunk_by``, the chunks are streamed concurrently and their batches are yielded as
+        the chunks complete, in no particular order; at most ``max_workers`` chunks are held
+        in memory at a time. Nothing is yielded if there are no results, the cache is not
+        used, and errors are raised. As with ``df(stream=True)``, truncated results cannot be
+        detected, so use ``chunk_by`` to keep the calls below the API's row limit.
+        """
+        if self.only_supports_classic:
+            raise OnlySupportsClassicFormatException()
+        self._verify_parameters()
+        if rows < 1:
+            raise InvalidArgumentException("`rows` must be positive")
+
+        if chunk_by is None:
+            for columns in self._stream_column_batches(fields, rows):
+                yield self._columns_as_df(columns, fields, disable_date_parsing, parse_epiweeks)
+            return
+
+        calls = self._chunk_calls(fields, chunk_by, max_rows, max_url_length)
+        for _, chunk, error in _execute_concurrently(lambda call: call._stream_columns(fields), calls, max_workers):
+            if error is not None:
+                raise error
+            for columns in _slice_columns(cast(Dict[str, List[Any]], chunk), rows):
+                yield self._columns_as_df(columns, fields, disable_date_parsing, parse_epiweeks)
+
+    def _df(
+        self,
+        fields: Optional[Sequence[str]] = None,
+        disable_date_parsing: Optional[bool] = False,
+        raise_errors: bool = False,
+        chunk_by: Union[None, ChunkBy, Sequence[ChunkBy]] = None,
+        max_rows: int = DEFAULT_MAX_ROWS,
+        max_url_length: int = DEFAULT_MAX_URL_LENGTH,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        stream: bool = False,
+        parse_epiweeks: bool = False,
+        dtype_backend: DtypeBackend = "numpy_nullable",
+        compact: Compact = False,
+        null_columns: NullColumns = "keep",
+    ) -> "DataFrame":
+        if self.only_supports_classic:
+            raise OnlySupportsClassicFormatException()
+        if (compact or null_columns != "keep") and dtype_backend != "numpy_nullable":
+            raise InvalidArgumentException(
+                "`compact` and `null_columns` are only supported with the numpy_nullable dtype backend"
+            )
+        self._verify_parameters()
+
+        # fields known to be null are not requested, but dropped or made sparse like the others
+        request_fields = self._useful_fields(fields) if null_columns != "keep" else fields
+
+        columns = self._fetch_columns(
+            request_fields, raise_errors, chunk_by, max_rows, max_url_length, max_workers, stream
+        )
+        if dtype_backend == "pyarrow":
+            from pandas import ArrowDtype  # pylint: disable=import-outside-toplevel
 
+            table = self._columns_as_table(columns, fields, disable_date_parsing, parse_epiweeks)
+            df = table.to_pandas(types_mapper=ArrowDtype)
+        else:
+            df = self._columns_as_df(
+                columns, fields, disable_date_parsing, parse_epiweeks, compact, null_columns, self._parse_pool
+            )
         return df
 
+    def _fetch_columns(
+        self,
+        fields: Optional[Sequence[str]] = None,
+        raise_errors: bool = False,
+        chunk_by: Union[None, ChunkBy, Sequence[ChunkBy]] = None,
+        max_rows: int = DEFAULT_MAX_ROWS,
+        max_url_length: int = DEFAULT_MAX_URL_LENGTH,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        stream: bool = False,
+    ) -> Mapping[str, Sequence[Any]]:
+        """Fetch the unparsed values of every column, streamed or from the classic response."""
+        if chunk_by is not None:
+            if stream:
+                return self._stream_columns_chunked(fields, chunk_by, max_rows, max_url_length, max_workers)
+            json = self._classic_chunked(fields, chunk_by, max_rows, max_url_length, max_workers)
+            return self._rows_to_columns(json.get("epidata", []), fields)
+        if stream:
+            return self._response(fields, stream=True).columns
+        if self.use_cache:
+            try:
+                return self._response(fields).columns
+            except Exception:  # pylint: disable=broad-except
+                if raise_errors:
+                    raise
+                return self._rows_to_columns([], fields)
+        if raise_errors:
+            json = self._classic(fields, disable_type_parsing=True)
+        else:
+            json = self.classic(fields, disable_type_parsing=True)
+        return self._rows_to_columns(json.get("epidata", []), fields)
+
+
+@dataclass
+class FetchResult:
+    """outcome of a single call executed by :meth:`EpiDataContext.fetch_many`"""
+
+    index: int
+    call: EpiDataCall
+    result: Union["DataFrame", EpiDataResponse, None] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
 
 class EpiDataContext(AEpiDataEndpoints[EpiDataCall]):
-    """sync epidata call class"""
+    """sync epidata call class
+
+    Unless a session is given, the context owns a :class:`PooledSession` whose keep-alive
+    connections are shared by all the calls it creates (including those of contexts derived
+    via ``with_base_url``). Use it as a context manager or ``close()`` it when done.
+
+    ``rate_limit`` caps the requests made by all those calls to that many per second, in
+    bursts of up to ``burst`` requests. Pass a :class:`RateLimiter` instead to share one
+    limit between several contexts. Failed requests are retried as per ``retry_policy``.
+    With ``use_cache`` the context also holds the cache open for its lifetime, with up to
+    ``cache_memory_bytes`` of the responses looked up most recently kept in memory.
+
+    With ``parse_workers`` greater than one, the numeric and time columns of large data
+    frames are parsed on a :class:`ParsePool` of that many processes, started by the first
+    response large enough and shared by all the calls of the context until it is closed.
+    Pass a :class:`ParsePool` instead to share one between several contexts.
+    It is off by default: shipping the values to the workers costs about as much as
+    parsing them, so it only pays off with several idle cores and responses of millions
+    of rows.
+    """
 
     _base_url: Final[str]
-    _session: Final[Optional[Session]]
+    _session: Final[Session]
+    _owns_session: Final[bool]
+    _rate_limiter: Final[Optional[RateLimiter]]
+    _retry_policy: Final[RetryPolicy]
+    _response_cache: Final[ResponseCache]
+    _owns_response_cache: Final[bool]
+    _parse_pool: Final[Optional[ParsePool]]
+    _owns_parse_pool: Final[bool]
 
     def __init__(
         self,
@@ -235,18 +914,164 @@ class EpiDataContext(AEpiDataEndpoints[EpiDataCall]):
         session: Optional[Session] = None,
         use_cache: Optional[bool] = None,
         cache_max_age_days: Optional[int] = None,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        pool_idle_timeout: Optional[float] = DEFAULT_POOL_IDLE_TIMEOUT,
+        rate_limit: Union[None, float, RateLimiter] = None,
+        burst: int = 1,
+        retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+        cache_memory_bytes: int = DEFAULT_CACHE_MEMORY_BYTES,
+        response_cache: Optional[ResponseCache] = None,
+        parse_workers: Union[int, ParsePool] = 0,
     ) -> None:
         super().__init__()
         self._base_url = base_url
-        self._session = session
+        self._owns_session = session is None
+        self._session = session or PooledSession(pool_connections, pool_maxsize, pool_idle_timeout)
         self.use_cache = use_cache
         self.cache_max_age_days = cache_max_age_days
+        self._rate_limiter = as_rate_limiter(rate_limit, burst)
+        self._retry_policy = retry_policy
+        # the disk tier is only opened once a call looks up the cache
+        self._owns_response_cache = response_cache is None
+        self._response_cache = response_cache or ResponseCache(cache_memory_bytes)
+        self._owns_parse_pool = not isinstance(parse_workers, ParsePool)
+        self._parse_pool = as_parse_pool(parse_workers)
 
     def with_base_url(self, base_url: str) -> "EpiDataContext":
-        return EpiDataContext(base_url, self._session)
+        return EpiDataContext(
+            base_url,
+            self._session,
+            self.use_cache,
+            self.cache_max_age_days,
+            rate_limit=self._rate_limiter,
+            retry_policy=self._retry_policy,
+            response_cache=self._response_cache,
+            parse_workers=self._parse_pool or 0,
+        )
 
     def with_session(self, session: Session) -> "EpiDataContext":
-        return EpiDataContext(self._base_url, session)
+        return EpiDataContext(
+            self._base_url,
+            session,
+            self.use_cache,
+            self.cache_max_age_days,
+            rate_limit=self._rate_limiter,
+            retry_policy=self._retry_policy,
+            response_cache=self._response_cache,
+            parse_workers=self._parse_pool or 0,
+        )
+
+    def close(self) -> None:
+        """Close the connection pool, the cache and the parse pool owned by this context."""
+        if self._owns_session:
+            self._session.close()
+        if self._owns_response_cache:
+            self._response_cache.close()
+        if self._owns_parse_pool and self._parse_pool is not None:
+            self._parse_pool.shutdown()
+
+    def __enter__(self) -> "EpiDataContext":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    @overload
+    def fetch_many(
+        self,
+        calls: Sequence[EpiDataCall],
+        fields: Optional[Sequence[str]] = ...,
+        disable_date_parsing: Optional[bool] = ...,
+        format_type: Literal["df", "classic"] = ...,
+        max_workers: int = ...,
+        *,
+        as_completed: Literal[False] = ...,
+        concat: Literal[False] = ...,
+    ) -> List[FetchResult]: ...
+
+    @overload
+    def fetch_many(
+        self,
+        calls: Sequence[EpiDataCall],
+        fields: Optional[Sequence[str]] = ...,
+        disable_date_parsing: Optional[bool] = ...,
+        format_type: Literal["df", "classic"] = ...,
+        max_workers: int = ...,
+        *,
+        as_completed: Literal[True],
+        concat: Literal[False] = ...,
+    ) -> Iterator[FetchResult]: ...
+
+    @overload
+    def fetch_many(
+        self,
+        calls: Sequence[EpiDataCall],
+        fields: Optional[Sequence[str]] = ...,
+        disable_date_parsing: Optional[bool] = ...,
+        format_type: Literal["df"] = ...,
+        max_workers: int = ...,
+        *,
+        as_completed: Literal[False] = ...,
+        concat: Literal[True],
+    ) -> "DataFrame": ...
+
+    def fetch_many(
+        self,
+        calls: Sequence[EpiDataCall],
+        fields: Optional[Sequence[str]] = None,
+        disable_date_parsing: Optional[bool] = False,
+        format_type: Literal["df", "classic"] = "df",
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        *,
+        as_completed: bool = False,
+        concat: bool = False,
+    ) -> Union[List[FetchResult], Iterator[FetchResult], "DataFrame"]:
+        """Execute many calls concurrently over this context's connection pool and rate limit.
+
+        An error raised by one call is captured in its :class:`FetchResult` instead of
+        aborting the batch. The results are returned in the order of ``calls``, or yielded
+        as they complete with ``as_completed=True``. With ``concat=True`` the data frames of
+        calls sharing the same fields are concatenated into one, and the first error (if any)
+        is raised once all calls are done. The data frames are parsed on the context's
+        parse pool, if any.
+        """
+        if concat:
+            if format_type != "df" or as_completed:
+                raise InvalidArgumentException("`concat` requires `format_type='df'` and `as_completed=False`")
+            if len({tuple(info.name for info in call.meta) for call in calls}) > 1:
+                raise InvalidArgumentException("`concat` requires all calls to share the same fields")
+
+        bound_calls = [
+            call._with_transport(
+                self._session, self._rate_limiter, self._retry_policy, self._response_cache, self._parse_pool
+            )
+            for call in calls
+        ]
+
+        def fetch(call: EpiDataCall) -> Union["DataFrame", EpiDataResponse]:
+            if format_type == "classic":
+                call._verify_parameters()
+                return call._classic(fields, disable_date_parsing=disable_date_parsing)
+            return call._df(fields, disable_date_parsing=disable_date_parsing, raise_errors=True)
+
+        def run() -> Iterator[FetchResult]:
+            for i, result, error in _execute_concurrently(fetch, bound_calls, max_workers):
+                yield FetchResult(i, calls[i], result, error)
+
+        if as_completed:
+            return run()
+        results = sorted(run(), key=lambda r: r.index)
+        if not concat:
+            return results
+        errors = [r.error for r in results if r.error is not None]
+        if errors:
+            raise errors[0]
+        from pandas import DataFrame  # pylint: disable=import-outside-toplevel
+        from pandas import concat as concat_frames  # pylint: disable=import-outside-toplevel
+
+        frames = [cast(DataFrame, r.result) for r in results]
+        return concat_frames(frames, ignore_index=True) if frames else DataFrame()
 
     def _create_call(
         self,
@@ -264,6 +1089,10 @@ class EpiDataContext(AEpiDataEndpoints[EpiDataCall]):
             only_supports_classic,
             self.use_cache,
             self.cache_max_age_days,
+            self._rate_limiter,
+            self._retry_policy,
+            self._response_cache,
+            self._parse_pool,
         )
 
 
@@ -272,11 +1101,17 @@ def CovidcastEpidata(
     session: Optional[Session] = None,
     use_cache: Optional[bool] = None,
     cache_max_age_days: Optional[int] = None,
+    rate_limit: Union[None, float, RateLimiter] = None,
+    burst: int = 1,
+    retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
 ) -> CovidcastDataSources[EpiDataCall]:
+    # the meta request and all the signal calls share one pool of connections and one rate limit
+    session = session or PooledSession()
+    rate_limiter = as_rate_limiter(rate_limit, burst)
     url = add_endpoint_to_url(base_url, "covidcast/meta")
-    meta_data_res = _request_with_retry(url, {}, session, False)
+    meta_data_res = _request_with_retry(url, {}, session, False, rate_limiter=rate_limiter, retry_policy=retry_policy)
     meta_data_res.raise_for_status()
-    meta_data = meta_data_res.json()
+    meta_data = json_loads(meta_data_res.content)
 
     def create_call(
         params: Mapping[str, Optional[EpiRangeParam]],
@@ -286,16 +1121,20 @@ def CovidcastEpidata(
             session,
             "covidcast",
             params,
-            define_covidcast_fields(),
+            define_signal_fields(meta_data, params),
             use_cache=use_cache,
             cache_max_age_days=cache_max_age_days,
+            rate_limiter=rate_limiter,
+            retry_policy=retry_policy,
         )
 
     return CovidcastDataSources.create(meta_data, create_call)
 
 
-def available_endpoints() -> DataFrame:
+def available_endpoints() -> "DataFrame":
     """Get a DataFrame of available endpoints and their descriptions."""
+    from pandas import DataFrame  # pylint: disable=import-outside-toplevel
+
     endpoints = [x for x in inspect.getmembers(AEpiDataEndpoints) if x[0].startswith("pvt_") or x[0].startswith("pub_")]
     data = {e[0]: e[1].__doc__.split("\n")[0] if e[1].__doc__ else "None" for e in endpoints}
     return DataFrame(data.items(), columns=["Endpoint", "Description"])
@@ -0,0 +1,162 @@
+import asyncio
+import json
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
+
+import pytest
+from pytest import MonkeyPatch
+from requests import Response, Session
+
+from epidatpy._parse import fields_to_predicate
+
+Answer = Callable[[str, Mapping[str, str]], Response]
+
+
+def make_response(payload: Any, status_code: int = 200, headers: Optional[Mapping[str, str]] = None) -> Response:
+    res = Response()
+    res.status_code = status_code
+    res.raw = BytesIO(json.dumps(payload).encode())
+    res.headers.update(headers or {})
+    return res
+
+
+def make_jsonl_response(rows: Sequence[Mapping[str, Any]], status_code: int = 200) -> Response:
+    res = Response()
+    res.status_code = status_code
+    res.raw = BytesIO(b"".join(json.dumps(row).encode() + b"\n" for row in rows))
+    return res
+
+
+def rows_response(params: Mapping[str, str], rows: List[Dict[str, Any]]) -> Response:
+    """answer the rows in the format requested, with the requested fields only"""
+    if "fields" in params:
+        pred = fields_to_predicate(params["fields"].split(","))
+        rows = [{k: v for k, v in row.items() if pred(k)} for row in rows]
+    if params.get("format") == "jsonl":
+        return make_jsonl_response(rows)
+    return make_response({"result": 1 if rows else -2, "message": "success" if rows else "no results", "epidata": rows})
+
+
+def fluview_api(url: str, params: Mapping[str, str]) -> Response:
+    """answers fluview requests with one row per requested region"""
+    if "error" in params["regions"]:
+        raise ConnectionError("boom")
+    rows = [
+        {"region": region, "epiweek": 201501, "issue": 201502, "lag": 1, "num_ili": 10, "wili": 1.5}
+        for region in params["regions"].split(",")
+    ]
+    return rows_response(params, rows)
+
+
+def covidcast_api(url: str, params: Mapping[str, str]) -> Response:
+    """answers covidcast requests with one row per requested day and location"""
+    rows = []
+    for time_range in params["time_values"].split(","):
+        start, _, end = time_range.partition("-")
+        for day in range(int(start), int(end or start) + 1):
+            for geo_value in params["geo_values"].split(","):
+                rows.append(
+                    {
+                        "source": params["data_source"],
+                        "signal": params["signals"],
+                        "geo_type": params["geo_type"],
+                        "geo_value": geo_value,
+                        "time_type": "day",
+                        "time_value": day,
+                        "issue": day,
+                        "lag": 0,
+                        "value": 1.0,
+                    }
+                )
+    return rows_response(params, rows)
+
+
+@dataclass
+class Request:
+    """a request made to the fake API"""
+
+    url: str
+    params: Mapping[str, str]
+    stream: bool
+    kwargs: Dict[str, Any]
+
+
+@dataclass
+class FakeAPI:
+    """stand-in for ``_request_with_retry`` recording the requests, answered by ``answer``
+
+    covidcast_meta requests are answered with the ``meta`` rows (as they are when requested)
+    and are not recorded.
+    """
+
+    answer: Answer
+    meta: List[Dict[str, Any]] = field(default_factory=list)
+    requests: List[Request] = field(default_factory=list)
+
+    def __call__(
+        self,
+        url: str,
+        params: Mapping[str, str],
+        session: Optional[Session] = None,
+        stream: bool = False,
+        **kwargs: Any,
+    ) -> Response:
+        if url.endswith("covidcast_meta/"):
+            return make_response({"result": 1 if self.meta else -2, "message": "", "epidata": list(self.meta)})
+        self.requests.append(Request(url, params, stream, kwargs))
+        return self.answer(url, params)
+
+    async def get_json(self, url: str, params: Mapping[str, str], raise_for_status: bool = False) -> Any:
+        await asyncio.sleep(0)
+        return self(url, params).json()
+
+    def param(self, name: str) -> List[Optional[str]]:
+        """The value of a parameter in every request"""
+        return [request.params.get(name) for request in self.requests]
+
+
+FakeAPIFactory = Callable[..., FakeAPI]
+
+
+@pytest.fixture
+def fake_api(monkeypatch: MonkeyPatch) -> FakeAPIFactory:
+    """Answer the requests of sync calls with ``answer`` (covidcast by default)"""
+
+    def install(answer: Answer = covidcast_api, meta: Sequence[Dict[str, Any]] = ()) -> FakeAPI:
+        api = FakeAPI(answer, list(meta))
+        monkeypatch.setattr("epidatpy.request._request_with_retry", api)
+        return api
+
+    return install
+
+
+@pytest.fixture
+def fake_async_api(monkeypatch: MonkeyPatch) -> FakeAPIFactory:
+    """Answer the requests of async calls with ``answer`` (covidcast by default)"""
+    pytest.importorskip("aiohttp")
+    from epidatpy.async_request import AsyncHTTPClient
+
+    def install(answer: Answer = covidcast_api, meta: Sequence[Dict[str, Any]] = ()) -> FakeAPI:
+        api = FakeAPI(answer, list(meta))
+
+        async def get_json(client: AsyncHTTPClient, url: str, params: Mapping[str, str], **kwargs: Any) -> Any:
+            return await api.get_json(url, params, **kwargs)
+
+        monkeypatch.setattr(AsyncHTTPClient, "get_json", get_json)
+        return api
+
+    return install
+
+
+@pytest.fixture
+def client_sessions(monkeypatch: MonkeyPatch) -> List[Any]:
+    """The sessions the requests of async clients are made with, answered with nothing"""
+    sessions: List[Any] = []
+
+    async def request(session: Any, url: str, params: Mapping[str, str], *args: Any, **kwargs: Any) -> Any:
+        sessions.append(session)
+        return []
+
+    monkeypatch.setattr("epidatpy.async_request._async_request_with_retry", request)
+    return sessions
@@ -0,0 +1,65 @@
+from datetime import date
+
+import pytest
+
+from epidatpy import EpiDataContext, EpiRange
+from epidatpy._model import EpidataFieldInfo, EpidataFieldType
+
+from .conftest import FakeAPIFactory
+from .test_columnar import COLUMNS, META
+
+pa = pytest.importorskip("pyarrow")
+
+from epidatpy._arrow import build_arrow_column, build_table
+
+
+def test_build_table_types() -> None:
+    table = build_table(META, COLUMNS)
+    assert table.column_names == ["geo_type", "geo_value", "time_value", "epiweek", "lag", "value", "flag"]
+    geo_type = table.column("geo_type").combine_chunks()
+    assert geo_type.type == pa.dictionary(pa.int32(), pa.string(), ordered=True)
+    assert geo_type.dictionary.to_pylist() == ["state", "county"]
+    assert geo_type.to_pylist() == ["state", None]
+    assert pa.types.is_dictionary(table.schema.field("geo_value").type)
+    assert table.column("time_value").to_pylist() == [date(2020, 1, 1), date(2020, 1, 2)]
+    assert table.schema.field("epiweek").type == pa.int32()
+    assert table.column("epiweek").to_pylist() == [202001, None]
+    assert table.schema.field("lag").type == pa.int64()
+    assert table.column("value").to_pylist() == [None, 0.5]
+    assert table.column("flag").to_pylist() == [True, None]
+
+
+def test_build_arrow_time_columns() -> None:
+    week = EpidataFieldInfo("epiweek", EpidataFieldType.epiweek)
+    assert build_arrow_column(week, [202001], parse_epiweeks=True).to_pylist() == [date(2019, 12, 29)]
+    assert build_arrow_column(week, [202001], disable_date_parsing=True).to_pylist() == ["202001"]
+    either = EpidataFieldInfo("time_value", EpidataFieldType.date_or_epiweek)
+    assert build_arrow_column(either, ["2020-01-01", None]).type == pa.date32()
+    # values of mixed formats are kept as strings
+    assert build_arrow_column(either, [20200101, 202001]).to_pylist() == ["20200101", "202001"]
+    lag = EpidataFieldInfo("lag", EpidataFieldType.int)
+    assert build_arrow_column(lag, [1, 3.7]).to_pylist() == [1.0, 3.7]
+
+
+def test_build_table_fields() -> None:
+    table = build_table(META, {"lag": [1, 2]}, fields=["geo_value", "lag"])
+    assert table.column_names == ["geo_value", "lag"]
+    assert table.column("geo_value").null_count == 2
+    assert build_table([], {"a": [1, 2]}).schema.field("a").type == pa.int64()
+
+
+def test_call_arrow(fake_api: FakeAPIFactory) -> None:
+    fake_api()
+    call = EpiDataContext(use_cache=False).pub_covidcast(
+        "src", "sig", "state", "day", ["ca", "fl"], EpiRange(20200101, 20200110)
+    )
+    table = call.arrow()
+    assert table.num_rows == 20
+    assert table.schema.field("time_value").type == pa.date32()
+    assert call.arrow(stream=True).equals(table)
+    assert call.arrow(["geo_value", "value"], chunk_by="time", max_rows=6).column_names == ["geo_value", "value"]
+
+    df = call.df(dtype_backend="pyarrow")
+    assert str(df["value"].dtype) == "double[pyarrow]"
+    assert df["time_value"].tolist() == table.column("time_value").to_pylist()
+    assert df["geo_value"].astype(str).tolist() == call.df()["geo_value"].tolist()
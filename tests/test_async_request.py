@@ -0,0 +1,107 @@
+import asyncio
+from typing import Any, List, Mapping
+
+import pytest
+from pytest import MonkeyPatch
+
+pytest.importorskip("aiohttp")
+
+from aiohttp import ClientConnectionError, ClientResponseError
+
+from epidatpy import EpiDataContext, EpiRange, RateLimiter, RetryPolicy
+from epidatpy.async_request import (
+    AsyncCovidcastEpidata,
+    AsyncEpiDataCall,
+    AsyncEpiDataContext,
+    AsyncHTTPClient,
+    _is_retryable,
+)
+
+from .conftest import FakeAPIFactory, make_response
+
+ROWS = [
+    {"location": "ca", "epiweek": 201501, "num": 1, "value": 0.5},
+    {"location": "fl", "epiweek": 201502, "num": None, "value": 1.5},
+]
+
+
+def test_async_call_matches_sync_call() -> None:
+    sync_call = EpiDataContext().pub_gft(locations="ca,fl", epiweeks=EpiRange(201501, 201502))
+    async_call = AsyncEpiDataContext().pub_gft(locations="ca,fl", epiweeks=EpiRange(201501, 201502))
+    assert isinstance(async_call, AsyncEpiDataCall)
+    assert async_call.request_url() == sync_call.request_url()
+    assert async_call.with_base_url("https://example.com/").request_url().startswith("https://example.com/gft/")
+
+
+def test_async_df_and_classic(fake_async_api: FakeAPIFactory) -> None:
+    api = fake_async_api(lambda url, params: make_response({"result": 1, "message": "success", "epidata": ROWS}))
+
+    async def run() -> Any:
+        async with AsyncEpiDataContext(use_cache=False, max_concurrent_requests=2) as epidata:
+            call = epidata.pub_gft(locations="ca,fl", epiweeks=EpiRange(201501, 201502))
+            return await asyncio.gather(call.df(), call.classic())
+
+    df, classic = asyncio.run(run())
+    assert len(api.requests) == 2
+    assert list(df.columns) == ["location", "epiweek", "num"]
+    assert str(df["num"].dtype) == "Int64"
+    assert classic["result"] == 1
+    assert len(classic["epidata"]) == 2
+
+
+def test_async_client_limits_concurrency(monkeypatch: MonkeyPatch) -> None:
+    in_flight: List[int] = [0, 0]
+
+    async def request(
+        session: Any, url: str, params: Mapping[str, str], raise_for_status: bool = False, **kwargs: Any
+    ) -> Any:
+        in_flight[0] += 1
+        in_flight[1] = max(in_flight[1], in_flight[0])
+        await asyncio.sleep(0.01)
+        in_flight[0] -= 1
+        return {}
+
+    monkeypatch.setattr("epidatpy.async_request._async_request_with_retry", request)
+
+    async def run() -> None:
+        client = AsyncHTTPClient(max_concurrent_requests=3)
+        await asyncio.gather(*(client.get_json("https://example.com/", {}) for _ in range(10)))
+        await client.close()
+
+    asyncio.run(run())
+    assert in_flight[1] == 3
+
+
+def test_async_covidcast_shares_one_pooled_session(client_sessions: List[Any]) -> None:
+    async def run() -> None:
+        async with await AsyncCovidcastEpidata() as covidcast:
+            assert covidcast._client is not None
+            await covidcast._client.get_json("https://example.com/", {})
+
+    asyncio.run(run())
+    assert len(client_sessions) == 2 and client_sessions[0] is client_sessions[1]
+    assert client_sessions[0].closed
+
+
+def test_async_client_closes_session_of_previous_loop(client_sessions: List[Any]) -> None:
+    client = AsyncHTTPClient()
+    asyncio.run(client.get_json("https://example.com/", {}))
+    asyncio.run(client.get_json("https://example.com/", {}))
+    asyncio.run(client.close())
+    assert client_sessions[0] is not client_sessions[1]
+    assert client_sessions[0].closed and client_sessions[1].closed
+
+
+def test_async_retry_and_rate_limit_settings() -> None:
+    policy = RetryPolicy()
+    for status, retryable in [(429, True), (503, True), (404, False)]:
+        error = ClientResponseError(None, (), status=status)  # type: ignore[arg-type]
+        assert _is_retryable(error, policy) is retryable
+    assert _is_retryable(ClientConnectionError(), policy)
+    assert not _is_retryable(ValueError(), policy)
+
+    limiter = RateLimiter(5)
+    epidata = AsyncEpiDataContext(rate_limit=limiter, retry_policy=RetryPolicy(max_retries=1))
+    assert epidata._client.rate_limiter is limiter
+    assert epidata.with_session(None)._client.rate_limiter is limiter  # type: ignore[arg-type]
+    assert epidata.with_session(None)._client.retry_policy.max_retries == 1  # type: ignore[arg-type]
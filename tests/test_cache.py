@@ -0,0 +1,388 @@
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from time import time
+from typing import Any, List, Mapping
+
+import pytest
+from diskcache import Cache
+from epiweeks import Week
+from pytest import MonkeyPatch
+from requests import Response
+
+from epidatpy import EpiDataContext, EpiRange
+from epidatpy._cache import (
+    WEEKLY_RELEASE_POLICY,
+    CachedResponse,
+    CachePolicy,
+    ResponseCache,
+    SignalVersions,
+    covers,
+    merge_intervals,
+    subtract_intervals,
+    widen,
+)
+from epidatpy._model import format_date
+
+from .conftest import FakeAPIFactory, make_response, rows_response
+
+NAMES = ["geo_value", "time_value", "value", "stderr"]
+
+
+def test_covers() -> None:
+    assert covers(None, ["value"], NAMES)
+    assert covers(["value", "geo_value"], ["value"], NAMES)
+    assert not covers(["value"], None, NAMES)
+    assert covers(["-stderr"], ["value", "time_value"], NAMES)
+    assert not covers(["-stderr"], ["stderr"], NAMES)
+    # without the names of the fields only lists of included fields are compared
+    assert covers(["value", "geo_value"], ["value"], [])
+    assert not covers(["-stderr"], ["value"], [])
+
+
+def test_widen() -> None:
+    assert widen(["value"], ["geo_value"], NAMES) == ["geo_value", "value"]
+    assert widen(["-stderr"], ["stderr"], NAMES) is None
+    assert widen(["value"], None, NAMES) is None
+    assert widen(["value"], ["geo_value"], []) == ["value", "geo_value"]
+    assert widen(["value"], ["-stderr"], []) is None
+
+
+def test_project() -> None:
+    response = CachedResponse(1, "success", {"geo_value": ["ca"], "value": [1.0], "stderr": [None]})
+    assert response.project(None) is response
+    assert response.project(["-stderr"]).columns == {"geo_value": ["ca"], "value": [1.0]}
+    assert response.project(["value"]).rows() == [{"value": 1.0}]
+    assert not CachedResponse(-1, "error", {}).cacheable
+
+
+def test_intervals() -> None:
+    days = [
+        (date(2020, 1, 5), date(2020, 1, 9)),
+        (date(2020, 1, 1), date(2020, 1, 4)),
+        (date(2020, 1, 20), date(2020, 1, 21)),
+    ]
+    covered = merge_intervals(days)
+    assert covered == [(date(2020, 1, 1), date(2020, 1, 9)), (date(2020, 1, 20), date(2020, 1, 21))]
+    assert subtract_intervals([(date(2019, 12, 31), date(2020, 1, 22))], covered) == [
+        (date(2019, 12, 31), date(2019, 12, 31)),
+        (date(2020, 1, 10), date(2020, 1, 19)),
+        (date(2020, 1, 22), date(2020, 1, 22)),
+    ]
+    assert subtract_intervals([(date(2020, 1, 2), date(2020, 1, 3))], covered) == []
+    weeks = merge_intervals([(Week(2020, 1), Week(2020, 10)), (Week(2019, 52), Week(2019, 52))])
+    assert weeks == [(Week(2019, 52), Week(2020, 10))]
+    assert subtract_intervals([(Week(2020, 5), Week(2020, 12))], weeks) == [(Week(2020, 11), Week(2020, 12))]
+
+
+def test_cache_policy_expire() -> None:
+    assert CachePolicy().expire(False, 7) == 7 * 24 * 60 * 60
+    assert CachePolicy().expire(True, 7) is None
+    assert CachePolicy(max_age_days=1, historical_max_age_days=30).expire(True, 7) == 30 * 24 * 60 * 60
+    # a Friday at noon, half a day before the weekly release
+    friday = datetime(2024, 1, 5, 12, tzinfo=timezone.utc)
+    assert WEEKLY_RELEASE_POLICY.expire(False, 7, now=friday) == 12 * 60 * 60
+    assert WEEKLY_RELEASE_POLICY.expire(False, 0.25, now=friday) == 6 * 60 * 60
+    saturday = datetime(2024, 1, 6, tzinfo=timezone.utc)
+    assert WEEKLY_RELEASE_POLICY.expire(False, 30, now=saturday) == 7 * 24 * 60 * 60
+
+
+def test_historical_calls() -> None:
+    epidata = EpiDataContext(use_cache=True)
+    latest = epidata.pub_covidcast("src", "sig", "state", "day", "ca", EpiRange(20200101, 20200105))
+    assert not latest._is_historical()
+    assert latest._cache_expire() == latest.cache_max_age_days * 24 * 60 * 60
+    as_of = epidata.pub_covidcast("src", "sig", "state", "day", "ca", 20200101, as_of=20200110)
+    assert as_of._is_historical()
+    assert as_of._cache_expire() is None
+    assert epidata.pub_covidcast(
+        "src", "sig", "state", "day", "ca", 20200101, issues=[20200102, 20200103]
+    )._is_historical()
+    assert not epidata.pub_covidcast("src", "sig", "state", "day", "ca", 20200101, issues="*")._is_historical()
+    assert not epidata.pub_covidcast("src", "sig", "state", "day", "ca", 20200101, as_of=30000101)._is_historical()
+    lag = epidata.pub_fluview(regions="nat", epiweeks=EpiRange(201501, 201510), lag=2)
+    assert lag._is_historical([(Week(2015, 1), Week(2015, 10))])
+    assert not lag._is_historical([(Week(2015, 1), Week.thisweek())])
+    assert epidata.pub_gft(locations="ca", epiweeks=201501)._cache_expire() is None
+
+
+@pytest.fixture
+def cache(tmp_path: Path, monkeypatch: MonkeyPatch) -> Path:
+    monkeypatch.setattr("epidatpy._cache.cache_directory", lambda: str(tmp_path))
+    monkeypatch.setattr("epidatpy.request.SIGNAL_VERSIONS", SignalVersions())
+    return tmp_path
+
+
+def test_cache_serves_subsets_of_fields(cache: Path, fake_api: FakeAPIFactory) -> None:
+    api = fake_api()
+    call = EpiDataContext(use_cache=True).pub_covidcast(
+        "src", "sig", "state", "day", ["ca", "fl"], EpiRange(20200101, 20200105)
+    )
+    assert list(call.df(["geo_value", "value"]).columns) == ["geo_value", "value"]
+    assert call.classic(["value"])["epidata"][0] == {"value": 1.0}
+    assert call.df(["geo_value", "time_value"], stream=True).shape == (10, 2)
+    # the time field is fetched along, to tell which rows are cached
+    assert api.param("fields") == ["geo_value,value,time_value"]
+
+    # a missing field widens the cached response rather than replacing it
+    call.df(["lag"])
+    assert set(str(api.param("fields")[-1]).split(",")) == {"geo_value", "time_value", "lag", "value"}
+    call.df(["-issue"])
+    assert "issue" not in str(api.param("fields")[-1]).split(",")
+    assert list(call.df(["-lag", "-issue"]).columns) == [
+        name for name in call.meta_by_name if name not in ("lag", "issue")
+    ]
+    assert len(api.param("fields")) == 3
+
+    with Cache(str(cache)) as disk:
+        assert len(disk) == 1
+
+
+def test_cache_skips_errors(cache: Path, fake_api: FakeAPIFactory) -> None:
+    api = fake_api(lambda url, params: make_response({"result": -1, "message": "error", "epidata": []}))
+    call = EpiDataContext(use_cache=True).pub_covidcast("src", "sig", "state", "day", "ca", 20200101)
+    assert call.classic()["result"] == -1
+    assert call.classic()["result"] == -1
+    assert len(api.requests) == 2
+
+
+def test_cache_serves_classic_only_endpoints(cache: Path, fake_api: FakeAPIFactory) -> None:
+    payload = {"result": 1, "message": "success", "epidata": {"forecast": {"ca": [1.0]}}}
+    api = fake_api(lambda url, params: make_response(payload))
+    epidata = EpiDataContext(use_cache=True)
+    call = epidata.pub_delphi("ec", 201501)
+    assert call.classic() == payload
+    assert call.classic() == payload
+    assert len(api.requests) == 1
+    # the raw response is cached per fields, as it cannot be projected
+    assert call.classic(["system"]) == payload
+    assert epidata.pub_meta().classic() == payload
+    assert len(api.requests) == 3
+
+
+def test_cache_keeps_classic_only_rows_unparsed(cache: Path, fake_api: FakeAPIFactory) -> None:
+    row = {"system": "ec", "epiweek": 201501, "json": "{}"}
+    api = fake_api(lambda url, params: make_response({"result": 1, "message": "success", "epidata": [row]}))
+    call = EpiDataContext(use_cache=True).pub_delphi("ec", 201501)
+    first, second = call.classic(), call.classic()
+    last = call.classic(disable_date_parsing=True)
+    assert [r["result"] for r in (first, second, last)] == [1, 1, 1]
+    assert first["epidata"] == second["epidata"] == [{**row, "epiweek": date(2015, 1, 4)}]
+    assert last["epidata"] == [row]
+    assert len(api.requests) == 1
+
+
+def test_cache_fetches_missing_time_ranges(cache: Path, fake_api: FakeAPIFactory) -> None:
+    api = fake_api()
+    epidata = EpiDataContext(use_cache=True)
+
+    def call(time_values: Any) -> Any:
+        return epidata.pub_covidcast("src", "sig", "state", "day", ["ca", "fl"], time_values)
+
+    assert call(EpiRange(20200101, 20200105)).df().shape[0] == 10
+    df = call(EpiRange(20200101, 20200107)).df()
+    assert api.param("time_values") == ["20200101-20200105", "20200106-20200107"]
+    assert df.shape[0] == 14
+    assert df["time_value"].is_monotonic_increasing
+
+    ranges = [EpiRange(20191230, 20191231), EpiRange(20200103, 20200110)]
+    assert call(ranges).df(stream=True).shape[0] == 20
+    assert api.param("time_values")[-1] == "20191230-20191231,20200108-20200110"
+    assert call(20200102).classic(["geo_value"])["epidata"] == [{"geo_value": "ca"}, {"geo_value": "fl"}]
+    assert len(api.param("time_values")) == 3
+
+    # the other parameters pick another series
+    epidata.pub_covidcast("src", "sig", "state", "day", "ca", 20200102).df()
+    assert len(api.param("time_values")) == 4
+
+
+def test_async_cache_fetches_missing_weeks(cache: Path, fake_async_api: FakeAPIFactory) -> None:
+    from epidatpy.async_request import AsyncEpiDataContext
+
+    def gft_api(url: str, params: Mapping[str, str]) -> Response:
+        weeks = [week for r in params["epiweeks"].split(",") for week in range(int(r[:6]), int(r[-6:]) + 1)]
+        return rows_response(params, [{"location": "ca", "epiweek": w} for w in weeks])
+
+    api = fake_async_api(gft_api)
+
+    async def run() -> Any:
+        async with AsyncEpiDataContext(use_cache=True) as epidata:
+            await epidata.pub_gft(locations="ca", epiweeks=EpiRange(201501, 201503)).classic()
+            return await epidata.pub_gft(locations="ca", epiweeks=EpiRange(201502, 201505)).df()
+
+    df = asyncio.run(run())
+    assert api.param("epiweeks") == ["201501-201503", "201504-201505"]
+    assert df["epiweek"].tolist() == ["201502", "201503", "201504", "201505"]
+
+
+def test_cache_refetches_the_data_not_returned_yet(
+    cache: Path, fake_api: FakeAPIFactory, monkeypatch: MonkeyPatch
+) -> None:
+    last_day = [date(2020, 1, 5)]
+
+    def growing_api(url: str, params: Mapping[str, str]) -> Response:
+        start, _, end = params["time_values"].partition("-")
+        first, last = parse_api_date(start), min(parse_api_date(end or start), last_day[0])
+        days = [first + timedelta(days=i) for i in range((last - first).days + 1)]
+        return rows_response(params, [{"geo_value": "ca", "time_value": format_date(day)} for day in days])
+
+    def parse_api_date(value: str) -> date:
+        return datetime.strptime(value, "%Y%m%d").date()
+
+    def series_expire_time() -> Any:
+        with Cache(str(cache)) as disk:
+            key = next(key for key in disk if key.endswith("by time_values"))
+        return epidata._response_cache.get(key).expire_time
+
+    api = fake_api(growing_api)
+    epidata = EpiDataContext(use_cache=True)
+    call = epidata.pub_covidcast("src", "sig", "state", "day", "ca", EpiRange(20200101, 20200110))
+    assert call.df().shape[0] == 5
+    expire_time = series_expire_time()
+
+    # the days after the last one returned are fetched again once the data grew
+    last_day[0] = date(2020, 1, 10)
+    monkeypatch.setattr("epidatpy._cache.wall_time", lambda: time() + 60 * 60)
+    assert call.df().shape[0] == 10
+    assert call.df().shape[0] == 10
+    assert api.param("time_values") == ["20200101-20200110", "20200106-20200110"]
+    # extending the series does not renew it
+    assert series_expire_time() == expire_time
+
+    # nor is the current day covered, even if the API returned data for it already
+    today = date.today()
+    last_day[0] = today
+    call = epidata.pub_covidcast(
+        "src", "sig", "state", "day", "fl", EpiRange(format_date(today - timedelta(days=2)), format_date(today))
+    )
+    assert call.df().shape[0] == 3
+    assert call.df().shape[0] == 3
+    assert api.param("time_values")[-1] == f"{format_date(today)}-{format_date(today)}"
+
+
+def test_cache_expires_latest_calls_only(cache: Path, fake_api: FakeAPIFactory) -> None:
+    fake_api()
+    epidata = EpiDataContext(use_cache=True, cache_max_age_days=3)
+    epidata.pub_covidcast("src", "sig", "state", "day", "ca", 20200101).classic()
+    epidata.pub_covidcast("src", "sig", "state", "day", "ca", 20200101, as_of=20200110).classic()
+    with Cache(str(cache)) as disk:
+        expire_times = sorted((disk.get(key, expire_time=True)[1] or 0) for key in disk)
+    assert expire_times[0] == 0
+    assert expire_times[1] > datetime.now().timestamp() + 2 * 24 * 60 * 60
+
+
+def test_cache_revalidates_covidcast_against_meta(
+    cache: Path, fake_api: FakeAPIFactory, monkeypatch: MonkeyPatch
+) -> None:
+    api = fake_api(
+        meta=[{"data_source": "src", "signal": "sig", "time_type": "day", "geo_type": "state", "last_update": 1}]
+    )
+    meta = api.meta
+    epidata = EpiDataContext(use_cache=True)
+    call = epidata.pub_covidcast("src", "sig", "state", "day", "ca", EpiRange(20200101, 20200105))
+    call.df()
+    call.df(["value"])
+    assert len(api.requests) == 1
+    with Cache(str(cache)) as disk:
+        assert all(disk.get(key, expire_time=True)[1] is None for key in disk)
+
+    # an update is only noticed once the meta data are fetched again
+    meta[0] = {**meta[0], "last_update": 2}
+    assert call.df().shape[0] == 5
+    assert len(api.requests) == 1
+    monkeypatch.setattr("epidatpy.request.SIGNAL_VERSIONS", SignalVersions(max_age=0))
+    call.df()
+    assert len(api.requests) == 2
+    call.df()
+    assert len(api.requests) == 2
+
+    # historical calls are not revalidated
+    as_of = epidata.pub_covidcast("src", "sig", "state", "day", "ca", 20200101, as_of=20200110)
+    assert as_of._signal_keys() == []
+    assert epidata.pub_covidcast("src", ["sig", "other"], "state", "day", "ca", 20200101)._signal_keys() == [
+        ("src", "sig", "day", "state"),
+        ("src", "other", "day", "state"),
+    ]
+
+
+def test_cache_refetches_the_days_revised_since_the_cached_version(
+    cache: Path, fake_api: FakeAPIFactory, monkeypatch: MonkeyPatch
+) -> None:
+    monkeypatch.setattr("epidatpy.request.SIGNAL_VERSIONS", SignalVersions(max_age=0))
+    signal = {"data_source": "src", "signal": "sig", "time_type": "day", "geo_type": "state"}
+    api = fake_api(meta=[{**signal, "last_update": 1, "max_issue": 20200110, "max_lag": 5}])
+    call = EpiDataContext(use_cache=True).pub_covidcast(
+        "src", "sig", "state", "day", "ca", EpiRange(20200101, 20200110)
+    )
+    call.df()
+
+    # the new issues can only revise the days up to their maximum lag before the cached ones
+    api.meta[0] = {**signal, "last_update": 2, "max_issue": 20200112, "max_lag": 3}
+    assert call.df()["time_value"].is_monotonic_increasing
+    assert call.df().shape[0] == 10
+    assert api.param("time_values") == ["20200101-20200110", "20200107-20200110"]
+
+    # without a maximum lag the whole series is fetched again
+    api.meta[0] = {**signal, "last_update": 3, "max_issue": 20200113}
+    assert call.df().shape[0] == 10
+    assert api.param("time_values")[-1] == "20200101-20200110"
+
+
+def test_response_cache_memory_tier(cache: Path, monkeypatch: MonkeyPatch) -> None:
+    responses = ResponseCache(max_memory_bytes=2000)
+    disk = responses._open()
+    disk.stats(enable=True)
+
+    def disk_reads() -> int:
+        hits, misses = disk.stats()
+        return int(hits + misses)
+
+    small = CachedResponse(1, "success", {"value": [1.0] * 10})
+    responses.set("small", small)
+    assert responses.get("small") == small and disk_reads() == 0
+    assert 0 < responses.memory_bytes < 2000
+    # every lookup gets its own copy of the value
+    hit = responses.get("small")
+    assert hit is not small
+    hit.columns["value"].append(2.0)
+    assert responses.get("small") == small
+
+    # values too large for memory, or evicted from it, are read back from the disk
+    large = CachedResponse(1, "success", {"value": list(range(1000))})
+    responses.set("large", large)
+    assert responses.get("large") == large and disk_reads() == 1
+    for i in range(20):
+        responses.set(f"other {i}", CachedResponse(1, "success", {"value": [i] * 10}))
+    assert responses.memory_bytes <= 2000
+    assert responses.get("small") == small and disk_reads() == 2
+    assert responses.get("missing") is None and disk_reads() == 3
+
+    now = [1000.0]
+    monkeypatch.setattr("epidatpy._cache.wall_time", lambda: now[0])
+    responses.set("expiring", small, expire=10)
+    assert responses.get("expiring") == small and disk_reads() == 3
+    now[0] += 11
+    # expired in memory, it is read back from the disk, whose clock is not patched
+    assert responses.get("expiring") == small and disk_reads() == 4
+    responses.close()
+    assert responses.memory_bytes == 0
+
+
+def test_context_holds_one_cache_handle(cache: Path, fake_api: FakeAPIFactory, monkeypatch: MonkeyPatch) -> None:
+    opened: List[Any] = []
+
+    def open_cache() -> Cache:
+        opened.append(1)
+        return Cache(str(cache))
+
+    monkeypatch.setattr("epidatpy._cache.open_cache", open_cache)
+    fake_api()
+    with EpiDataContext(use_cache=True) as epidata:
+        call = epidata.pub_covidcast("src", "sig", "state", "day", "ca", EpiRange(20200101, 20200105))
+        call.df()
+        call.df(["value"])
+        epidata.with_base_url("https://example.com/").pub_covidcast("src", "sig", "state", "day", "ca", 20200101).df()
+        assert call._response_cache is epidata._response_cache
+        assert epidata._response_cache.memory_bytes > 0
+    assert len(opened) == 1
+    assert epidata._response_cache.memory_bytes == 0
@@ -0,0 +1,152 @@
+from typing import Dict, Optional
+from urllib.parse import urlencode
+
+from epiweeks import Week
+
+from epidatpy._chunking import (
+    bisect_params,
+    estimate_rows_per_value,
+    merge_responses,
+    plan_chunks,
+    plan_list_shards,
+    plan_time_chunks,
+    split_epirange,
+    time_units,
+    to_time_ranges,
+)
+from epidatpy._covidcast import define_covidcast_fields
+from epidatpy._model import (
+    EpidataFieldInfo,
+    EpidataFieldType,
+    EpiDataResponse,
+    EpiRange,
+    EpiRangeParam,
+    format_list,
+)
+
+COVIDCAST_PARAMS: Dict[str, Optional[EpiRangeParam]] = {
+    "data_source": "jhu-csse",
+    "signals": "confirmed_incidence_num",
+    "geo_type": "county",
+    "time_type": "day",
+    "geo_values": "*",
+    "time_values": EpiRange(20200101, 20201231),
+    "as_of": None,
+}
+
+
+def test_time_units() -> None:
+    assert time_units(EpiRange(20200101, 20200131)) == 31
+    assert time_units(EpiRange(202001, 202010)) == 10
+    assert time_units(EpiRange(202050, 202103)) == 7
+
+
+def test_to_time_ranges() -> None:
+    assert to_time_ranges("*") is None
+    assert [str(r) for r in to_time_ranges([20200101, "20200103-20200105"]) or []] == [
+        "20200101-20200101",
+        "20200103-20200105",
+    ]
+    assert [str(r) for r in to_time_ranges({"from": 202001, "to": 202003}) or []] == ["202001-202003"]
+
+
+def test_split_epirange() -> None:
+    pieces = split_epirange(EpiRange(20200101, 20200110), 4)
+    assert [str(p) for p in pieces] == ["20200101-20200104", "20200105-20200108", "20200109-20200110"]
+    pieces = split_epirange(EpiRange(202051, 202102), 2)
+    assert [(p.start, p.end) for p in pieces] == [
+        (Week(2020, 51), Week(2020, 52)),
+        (Week(2020, 53), Week(2021, 1)),
+        (Week(2021, 2), Week(2021, 2)),
+    ]
+
+
+def test_estimate_rows_per_value() -> None:
+    assert estimate_rows_per_value(COVIDCAST_PARAMS, "time_values") == 3300
+    params: Dict[str, Optional[EpiRangeParam]] = {**COVIDCAST_PARAMS, "geo_values": ["ca", "fl"], "signals": "a,b,c"}
+    assert estimate_rows_per_value(params, "time_values") == 6
+    params = {**COVIDCAST_PARAMS, "geo_values": "ca", "issues": EpiRange(20210101, 20210110)}
+    assert estimate_rows_per_value(params, "time_values") == 10
+
+
+def test_plan_time_chunks() -> None:
+    chunks = plan_time_chunks(COVIDCAST_PARAMS, define_covidcast_fields(), max_rows=100_000)
+    # 3300 rows per day -> 30 days per chunk
+    assert len(chunks) == 13
+    assert str(chunks[0]["time_values"]) == "20200101-20200130"
+    assert str(chunks[-1]["time_values"]) == "20201226-20201231"
+    assert all(c["geo_values"] == "*" for c in chunks)
+
+    # single days are packed together
+    params: Dict[str, Optional[EpiRangeParam]] = {
+        **COVIDCAST_PARAMS,
+        "geo_values": "ca",
+        "time_values": [20200101, 20200105, 20200107],
+    }
+    chunks = plan_time_chunks(params, define_covidcast_fields(), max_rows=2)
+    assert [str(c["time_values"]) for c in chunks] == ["[20200101-20200101, 20200105-20200105]", "20200107-20200107"]
+
+    # no time field or a wildcard: nothing to split
+    assert len(plan_time_chunks({"epiweeks": EpiRange(202001, 202010)}, [EpidataFieldInfo("value")], 1)) == 1
+    assert len(plan_time_chunks({**COVIDCAST_PARAMS, "time_values": "*"}, define_covidcast_fields(), 1)) == 1
+    meta = [EpidataFieldInfo("epiweek", EpidataFieldType.epiweek)]
+    assert len(plan_time_chunks({"regions": "nat", "epiweeks": EpiRange(202001, 202010)}, meta, 1)) == 10
+
+
+def test_plan_list_shards() -> None:
+    url = "https://api.delphi.cmu.edu/epidata/covid_hosp_facility/"
+    hospital_pks = [f"{i:06d}" for i in range(1000)]
+    params: Dict[str, Optional[EpiRangeParam]] = {"hospital_pks": hospital_pks, "collection_weeks": 20200101}
+    shards = plan_list_shards(params, "covid_hosp_facility/", url, max_rows=400, max_url_length=2000)
+    assert [pk for shard in shards for pk in shard["hospital_pks"]] == hospital_pks  # type: ignore[union-attr]
+    assert all(len(shard["hospital_pks"]) <= 400 for shard in shards)  # type: ignore[arg-type]
+    assert max(len(f"{url}?{urlencode({k: format_list(v) for k, v in s.items() if v})}") for s in shards) <= 2000
+    # row budget: collection weeks are given as a 70 day range
+    params["collection_weeks"] = EpiRange(20200101, 20200310)
+    shards = plan_list_shards(params, "covid_hosp_facility/", url, max_rows=350, max_url_length=100_000)
+    assert len(shards) == 200
+
+    # wildcards, single values and endpoints without a list parameter are left alone
+    assert plan_list_shards({"geo_values": "*"}, "covidcast", url) == [{"geo_values": "*"}]
+    assert plan_list_shards({"regions": "nat"}, "fluview/", url) == [{"regions": "nat"}]
+    assert plan_list_shards({"state": "ca,fl"}, "covid_hosp_facility_lookup/", url) == [{"state": "ca,fl"}]
+
+
+def test_plan_chunks() -> None:
+    params = {**COVIDCAST_PARAMS, "geo_values": ["ca", "fl", "ny"], "time_values": EpiRange(20200101, 20200104)}
+    url = "https://api.delphi.cmu.edu/epidata/covidcast/"
+    chunks = plan_chunks(params, define_covidcast_fields(), ["list", "time"], "covidcast/", url, max_rows=2)
+    assert [(c["geo_values"], str(c["time_values"])) for c in chunks] == [
+        (["ca"], "20200101-20200102"),
+        (["ca"], "20200103-20200104"),
+        (["fl"], "20200101-20200102"),
+        (["fl"], "20200103-20200104"),
+        (["ny"], "20200101-20200102"),
+        (["ny"], "20200103-20200104"),
+    ]
+
+
+def test_bisect_params() -> None:
+    meta = define_covidcast_fields()
+    params = {**COVIDCAST_PARAMS, "geo_values": ["ca", "fl", "ny"], "time_values": EpiRange(20200101, 20200105)}
+    halves = bisect_params(params, meta, "covidcast/")
+    assert halves is not None
+    assert [str(h["time_values"]) for h in halves] == ["20200101-20200103", "20200104-20200105"]
+
+    params["time_values"] = 20200101
+    halves = bisect_params(params, meta, "covidcast/")
+    assert halves is not None
+    assert [h["geo_values"] for h in halves] == [["ca"], ["fl", "ny"]]
+
+    params["geo_values"] = "ca"
+    assert bisect_params(params, meta, "covidcast/") is None
+
+
+def test_merge_responses() -> None:
+    ok: EpiDataResponse = {"result": 1, "message": "success", "epidata": [{"a": 1}]}
+    empty: EpiDataResponse = {"result": -2, "message": "no results", "epidata": []}
+    truncated: EpiDataResponse = {"result": 2, "message": "too many results, data truncated", "epidata": [{"a": 2}]}
+    assert merge_responses([ok, empty, ok])["epidata"] == [{"a": 1}, {"a": 1}]
+    assert merge_responses([empty, empty])["result"] == -2
+    merged = merge_responses([ok, truncated])
+    assert merged["result"] == 2 and len(merged["epidata"]) == 2
@@ -0,0 +1,155 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict
+from unittest.mock import Mock
+
+import numpy as np
+from pandas import NA, Series, isna
+from pytest import MonkeyPatch
+
+from epidatpy._columnar import ColumnValues, build_arrays, build_column, build_frame, compact_frame
+from epidatpy._model import EpidataFieldInfo, EpidataFieldType
+
+META = [
+    EpidataFieldInfo("geo_type", EpidataFieldType.categorical, categories=["state", "county"]),
+    EpidataFieldInfo("geo_value", EpidataFieldType.text),
+    EpidataFieldInfo("time_value", EpidataFieldType.date_or_epiweek),
+    EpidataFieldInfo("epiweek", EpidataFieldType.epiweek),
+    EpidataFieldInfo("lag", EpidataFieldType.int),
+    EpidataFieldInfo("value", EpidataFieldType.float),
+    EpidataFieldInfo("flag", EpidataFieldType.bool),
+]
+COLUMNS: Dict[str, ColumnValues] = {
+    "geo_type": ["state", "nation"],
+    "geo_value": ["ca", None],
+    "time_value": [20200101, 20200102],
+    "epiweek": [202001, None],
+    "lag": [1, None],
+    "value": [None, 0.5],
+    "flag": [1, None],
+}
+
+
+def test_build_frame_dtypes() -> None:
+    df = build_frame(META, COLUMNS)
+    assert [str(t) for t in df.dtypes] == ["category", "string", "datetime64[ns]", "string", "Int64", "Float64", "bool"]
+    assert list(df["geo_type"].cat.categories) == ["state", "county"] and df["geo_type"].cat.ordered
+    assert isna(df["geo_type"][1]) and df["geo_value"][1] is NA
+    assert list(df["time_value"]) == [datetime(2020, 1, 1), datetime(2020, 1, 2)]
+    assert list(df["epiweek"].fillna("")) == ["202001", ""]
+    assert df["lag"][0] == 1 and df["lag"][1] is NA
+    assert df["value"][0] is NA and df["value"][1] == 0.5
+    assert list(df["flag"]) == [True, False]
+
+
+def test_build_int_columns_of_non_integral_values() -> None:
+    lag = EpidataFieldInfo("lag", EpidataFieldType.int)
+    assert str(build_column(lag, [1.0, None, 3]).dtype) == "Int64"
+    # values are not truncated, the column holds floats instead
+    column = build_column(lag, [1, None, 3.7])
+    assert str(column.dtype) == "Float64" and list(Series(column).fillna(-1)) == [1.0, -1.0, 3.7]
+    assert build_arrays([lag], {"lag": [1, 3.7]})["lag"].tolist() == [1.0, 3.7]
+
+
+def test_build_frame_fields_and_missing_columns() -> None:
+    df = build_frame(META, {"lag": [1, 2]}, fields=["geo_value", "lag"])
+    assert list(df.columns) == ["geo_value", "lag"]
+    assert df["geo_value"].isna().all() and str(df["geo_value"].dtype) == "string"
+    assert build_frame(META, {}).empty
+    assert build_frame([], {"a": [1, 2]})["a"].dtype == "int64"
+
+
+def test_build_time_columns() -> None:
+    day = EpidataFieldInfo("issue", EpidataFieldType.date)
+    either = EpidataFieldInfo("time_value", EpidataFieldType.date_or_epiweek)
+    assert str(build_column(day, ["2020-01-01", None]).dtype) == "datetime64[ns]"
+    assert str(build_column(day, [20200101], disable_date_parsing=True).dtype) == "string"
+    # epiweeks are kept as strings unless asked for
+    assert list(build_column(either, [202001, 202002])) == ["202001", "202002"]
+    assert list(Series(build_column(either, [202001], parse_epiweeks=True))) == [datetime(2019, 12, 29)]
+    week = EpidataFieldInfo("epiweek", EpidataFieldType.epiweek)
+    assert str(build_column(week, [202001]).dtype) == "string"
+    assert str(build_column(week, [202001, None], parse_epiweeks=True).dtype) == "datetime64[ns]"
+    # values of mixed formats are kept as strings
+    assert list(build_column(day, [20200101, 202001])) == ["20200101", "202001"]
+
+
+def test_compact_frame() -> None:
+    columns: Dict[str, ColumnValues] = {
+        "geo_value": ["ca", "ca", "fl", None],
+        "signal": ["b", "b", "c", "b"],
+        "lag": [0, 1, None, 300],
+        "value": [0.5, None, 1.0, 2.0],
+    }
+    meta = [
+        EpidataFieldInfo("geo_value", EpidataFieldType.text),
+        EpidataFieldInfo("signal", EpidataFieldType.text),
+        EpidataFieldInfo("lag", EpidataFieldType.int),
+        EpidataFieldInfo("value", EpidataFieldType.float),
+    ]
+    df = build_frame(meta, columns)
+    compact = compact_frame(df, {"signal": ["a", "b"]})
+    assert [str(t) for t in compact.dtypes] == ["category", "category", "Int16", "Float64"]
+    # known categories come first, followed by the other values
+    assert list(compact["signal"].cat.categories) == ["a", "b", "c"]
+    assert list(compact["geo_value"].cat.categories) == ["ca", "fl"] and isna(compact["geo_value"][3])
+    assert compact["lag"].equals(df["lag"].astype("Int16"))
+    # the savings outweigh the categories once the values repeat
+    assert compact_frame(build_frame(meta, {k: list(v) * 100 for k, v in columns.items()})).attrs["memory_saved"] > 0
+    assert str(compact_frame(df, float32=True)["value"].dtype) == "Float32"
+    # text with many distinct values is left alone
+    assert str(compact_frame(build_frame(meta, {"geo_value": ["a", "b"]}))["geo_value"].dtype) == "string"
+
+
+def test_build_frame_null_columns() -> None:
+    assert build_frame(META, COLUMNS, null_columns="drop").columns.equals(build_frame(META, COLUMNS).columns)
+    columns: Dict[str, ColumnValues] = {"lag": [1, 2], "value": [None, None]}
+    assert list(build_frame(META, columns, fields=["lag", "value", "flag"], null_columns="drop").columns) == ["lag"]
+    df = build_frame(META, columns, fields=["lag", "value"], null_columns="sparse")
+    assert str(df["value"].dtype) == "Sparse[float64, nan]" and df["value"].isna().all()
+    assert df["value"].array.sp_values.size == 0
+    # the columns of empty frames are kept
+    assert list(build_frame(META, {}, fields=["lag"], null_columns="drop").columns) == ["lag"]
+
+
+def test_build_arrays() -> None:
+    arrays = build_arrays(META, COLUMNS)
+    assert [str(a.dtype) for a in arrays.values()] == [
+        "object",
+        "object",
+        "datetime64[D]",
+        "datetime64[D]",
+        "int64",
+        "float64",
+        "bool",
+    ]
+    assert arrays["geo_type"].tolist() == ["state", "nation"]
+    assert arrays["epiweek"][0] == np.datetime64("2019-12-29") and np.isnat(arrays["epiweek"][1])
+    assert arrays["lag"].tolist() == [1, None] and isinstance(arrays["lag"], np.ma.MaskedArray)
+    assert np.isnan(arrays["value"][0])
+    assert build_arrays(META, COLUMNS, disable_date_parsing=True)["time_value"].tolist() == [20200101, 20200102]
+    assert build_arrays(META, COLUMNS, disable_type_parsing=True)["lag"].tolist() == [1, None]
+    assert list(build_arrays(META, {}, fields=["lag"])) == ["lag"]
+
+
+def test_build_frame_on_process_pool(monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr("epidatpy._columnar.PARALLEL_MIN_ROWS", 2)
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        assert build_frame(META, COLUMNS, executor=executor).equals(build_frame(META, COLUMNS))
+        sparse = build_frame(META, COLUMNS, fields=["lag", "stderr"], null_columns="sparse", executor=executor)
+        assert list(sparse.columns) == ["lag"]
+    # only the numeric and parsed time columns are shipped to the workers
+    submitted = []
+
+    def submit(fn: Callable[..., Any], info: EpidataFieldInfo, *args: Any) -> Future:
+        submitted.append(info.name)
+        future: Future = Future()
+        future.set_result(fn(info, *args))
+        return future
+
+    executor = Mock(submit=submit)
+    assert build_frame(META, COLUMNS, executor=executor).equals(build_frame(META, COLUMNS))
+    assert submitted == ["time_value", "lag", "value"]
+    submitted.clear()
+    build_frame(META, COLUMNS, disable_date_parsing=True, parse_epiweeks=True, executor=executor)
+    assert submitted == ["lag", "value"]
@@ -0,0 +1,47 @@
+import subprocess
+import sys
+from typing import List
+
+import pytest
+
+import epidatpy
+
+HEAVY_MODULES = ["pandas", "numpy", "diskcache", "appdirs", "pyarrow", "polars", "aiohttp"]
+
+
+def loaded_modules(statement: str) -> List[str]:
+    """the heavy modules loaded by running the statement in a fresh interpreter"""
+    script = f"import sys\n{statement}\nprint(*(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+    return output.split()
+
+
+def test_import_is_lazy() -> None:
+    assert loaded_modules("import epidatpy") == []
+    assert loaded_modules("import epidatpy; epidatpy.__version__") == []
+    assert (
+        "requests"
+        not in subprocess.run(
+            [sys.executable, "-c", "import sys, epidatpy; print(*sys.modules)"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.split()
+    )
+
+
+def test_calls_do_not_load_pandas() -> None:
+    statement = (
+        "from epidatpy import EpiDataContext\n"
+        "EpiDataContext(use_cache=False).pub_covidcast('src', 'sig', 'state', 'day', 'ca', 20200101)"
+    )
+    assert loaded_modules(statement) == []
+    assert "pandas" in loaded_modules("from epidatpy import available_endpoints; available_endpoints()")
+
+
+def test_lazy_exports() -> None:
+    assert set(epidatpy.__all__) <= set(dir(epidatpy))
+    for name in epidatpy.__all__:
+        assert getattr(epidatpy, name) is not None
+    with pytest.raises(AttributeError):
+        epidatpy.missing  # pylint: disable=pointless-statement
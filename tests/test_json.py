@@ -0,0 +1,44 @@
+import json
+from typing import Any, Iterator, List
+
+import pytest
+
+from epidatpy import EpiDataContext, EpiRange, set_json_decoder
+from epidatpy._json import json_loads
+
+from .conftest import FakeAPIFactory, fluview_api
+
+PAYLOAD = {"result": 1, "message": "success", "epidata": [{"a": 1, "b": 1.5, "c": "é", "d": None}]}
+
+
+@pytest.fixture(autouse=True)
+def reset_decoder() -> Iterator[None]:
+    yield
+    set_json_decoder("auto")
+
+
+@pytest.mark.parametrize("decoder", ["auto", "json", "orjson"])
+def test_json_loads(decoder: Any) -> None:
+    if decoder == "orjson":
+        pytest.importorskip("orjson")
+    set_json_decoder(decoder)
+    assert json_loads(json.dumps(PAYLOAD).encode()) == PAYLOAD
+    assert json_loads(json.dumps(PAYLOAD, ensure_ascii=False).encode()) == PAYLOAD
+
+
+def test_custom_json_decoder(fake_api: FakeAPIFactory) -> None:
+    decoded: List[bytes] = []
+
+    def loads(data: bytes) -> Any:
+        decoded.append(data)
+        return json.loads(data)
+
+    set_json_decoder(loads)
+    fake_api(fluview_api)
+    call = EpiDataContext(use_cache=False).pub_fluview(regions="nat", epiweeks=EpiRange(201501, 201502))
+    assert call.classic()["result"] == 1
+    assert len(call.df()) == 1
+    assert len(decoded) == 2 and all(isinstance(data, bytes) for data in decoded)
+
+    with pytest.raises(ValueError):
+        set_json_decoder("yaml")  # type: ignore[arg-type]
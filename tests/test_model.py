@@ -1,6 +1,15 @@
 import datetime
+from typing import Any, Dict, List
 
-from epidatpy._model import EpiRange, format_item, format_list
+from epidatpy._model import (
+    AEpiDataCall,
+    EpidataFieldInfo,
+    EpidataFieldType,
+    EpiRange,
+    compile_converters,
+    format_item,
+    format_list,
+)
 
 
 def test_epirange() -> None:
@@ -30,3 +39,70 @@ def test_format_list() -> None:
     assert format_list(["a", "b"]) == "a,b"
     assert format_list(("a", "b")) == "a,b"
     assert format_list(["a", 1]) == "a,1"
+
+
+def test_parse_rows() -> None:
+    call = AEpiDataCall(
+        "https://example.com/",
+        "endpoint",
+        {},
+        [
+            EpidataFieldInfo("issue", EpidataFieldType.date),
+            EpidataFieldInfo("epiweek", EpidataFieldType.epiweek),
+            EpidataFieldInfo("time_value", EpidataFieldType.date_or_epiweek),
+            EpidataFieldInfo("flag", EpidataFieldType.bool),
+            EpidataFieldInfo("value", EpidataFieldType.float),
+        ],
+    )
+    rows: List[Dict[str, Any]] = [
+        {"issue": 20200101, "epiweek": 202001, "time_value": "2020-01-05", "flag": 1, "value": 1.5},
+        {"issue": None, "epiweek": 202053, "time_value": 20200106, "flag": 0},
+        {"epiweek": None, "time_value": 202002, "flag": None, "value": None},
+    ]
+    assert call._parse_rows([dict(row) for row in rows]) == [
+        {
+            "issue": datetime.date(2020, 1, 1),
+            "epiweek": datetime.date(2019, 12, 29),
+            "time_value": datetime.date(2020, 1, 5),
+            "flag": True,
+            "value": 1.5,
+        },
+        {
+            "issue": None,
+            "epiweek": datetime.date(2020, 12, 27),
+            "time_value": datetime.date(2020, 1, 6),
+            "flag": False,
+        },
+        {"epiweek": None, "time_value": datetime.date(2020, 1, 5), "flag": None, "value": None},
+    ]
+    # only the types are parsed, missing fields stay missing
+    assert call._parse_rows([dict(row) for row in rows], disable_date_parsing=True) == [
+        {**rows[0], "flag": True},
+        {**rows[1], "flag": False},
+        rows[2],
+    ]
+
+
+def test_compile_converters() -> None:
+    meta = [
+        EpidataFieldInfo("time_value", EpidataFieldType.date_or_epiweek),
+        EpidataFieldInfo("flag", EpidataFieldType.bool),
+        EpidataFieldInfo("value", EpidataFieldType.float),
+    ]
+    converters = compile_converters(meta)
+    assert set(converters) == {"time_value", "flag"}
+    assert set(compile_converters(meta, disable_date_parsing=True)) == {"flag"}
+    assert converters["flag"]([1, 0, None]) == [True, False, None]
+    values = [20200101, 20200102, 20200101, None]
+    assert converters["time_value"](values) == [
+        datetime.date(2020, 1, 1),
+        datetime.date(2020, 1, 2),
+        datetime.date(2020, 1, 1),
+        None,
+    ]
+
+    call = AEpiDataCall("https://example.com/", "endpoint", {}, meta)
+    call._parse_rows([{"flag": 1}])
+    compiled = call._converters[False]
+    call._parse_rows([{"flag": 0}])
+    assert call._converters[False] is compiled
@@ -0,0 +1,57 @@
+from datetime import date
+
+import pytest
+
+from epidatpy import EpiDataContext, EpiRange
+from epidatpy._model import EpidataFieldInfo, EpidataFieldType
+
+from .conftest import FakeAPIFactory
+from .test_columnar import COLUMNS, META
+
+pl = pytest.importorskip("polars")
+
+from epidatpy._polars import build_polars_frame, build_polars_series
+
+
+def test_build_polars_frame_types() -> None:
+    df = build_polars_frame(META, COLUMNS)
+    assert df.columns == ["geo_type", "geo_value", "time_value", "epiweek", "lag", "value", "flag"]
+    assert df.schema["geo_type"] == pl.Enum(["state", "county"])
+    assert df["geo_type"].to_list() == ["state", None]
+    assert df.schema["geo_value"] == pl.String
+    assert df["time_value"].to_list() == [date(2020, 1, 1), date(2020, 1, 2)]
+    assert df.schema["epiweek"] == pl.Int32
+    assert df["epiweek"].to_list() == [202001, None]
+    assert df.schema["lag"] == pl.Int64 and df["lag"].to_list() == [1, None]
+    assert df["value"].to_list() == [None, 0.5]
+    assert df["flag"].to_list() == [True, None]
+
+
+def test_build_polars_time_series() -> None:
+    week = EpidataFieldInfo("epiweek", EpidataFieldType.epiweek)
+    assert build_polars_series(week, [202001], parse_epiweeks=True).to_list() == [date(2019, 12, 29)]
+    assert build_polars_series(week, [202001], disable_date_parsing=True).to_list() == ["202001"]
+    # values of mixed formats are kept as strings
+    either = EpidataFieldInfo("time_value", EpidataFieldType.date_or_epiweek)
+    assert build_polars_series(either, [20200101, 202001]).to_list() == ["20200101", "202001"]
+    lag = EpidataFieldInfo("lag", EpidataFieldType.int)
+    assert build_polars_series(lag, [1, 3.7]).to_list() == [1.0, 3.7]
+    assert build_polars_frame(META, {"lag": [1, 2]}, fields=["geo_value", "lag"]).columns == ["geo_value", "lag"]
+    assert build_polars_frame([], {"a": [1, 2]}).schema["a"] == pl.Int64
+
+
+def test_call_polars(fake_api: FakeAPIFactory) -> None:
+    fake_api()
+    call = EpiDataContext(use_cache=False).pub_covidcast(
+        "src", "sig", "state", "day", ["ca", "fl"], EpiRange(20200101, 20200110)
+    )
+    df = call.polars()
+    assert df.height == 20
+    assert df.schema["time_value"] == pl.Date
+    assert df["geo_value"].to_list() == call.df()["geo_value"].tolist()
+    assert call.polars(stream=True).equals(df)
+    chunked = call.polars(chunk_by="time", max_rows=6, stream=True)
+    assert chunked.sort("time_value", "geo_value").equals(df.sort("time_value", "geo_value"))
+    lazy = call.polars(["geo_value", "value"], lazy=True)
+    assert isinstance(lazy, pl.LazyFrame)
+    assert lazy.collect().columns == ["geo_value", "value"]
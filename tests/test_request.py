@@ -0,0 +1,326 @@
+from typing import Any, List, Mapping, Union
+from urllib.parse import urlencode
+
+import pytest
+from pandas import concat
+from pytest import MonkeyPatch
+from requests import ConnectionError as RequestsConnectionError
+from requests import HTTPError, Response, Session
+from requests.adapters import HTTPAdapter
+
+from epidatpy import EpiDataContext, EpiRange, RateLimiter, RetryPolicy
+from epidatpy._constants import BASE_URL
+from epidatpy._covidcast import define_signal_fields
+from epidatpy._model import InvalidArgumentException
+from epidatpy.request import EpiDataCall, FetchResult, PooledSession, _iter_jsonl_columns, _request_with_retry
+
+from .conftest import FakeAPIFactory, covidcast_api, fluview_api, make_jsonl_response, make_response
+
+
+class ScriptedSession(Session):
+    """session answering requests with the given responses (or raising the given errors) in turn"""
+
+    def __init__(self, *outcomes: Union[Response, Exception]) -> None:
+        super().__init__()
+        self.outcomes = list(outcomes)
+        self.methods: List[str] = []
+
+    def request(self, method: Any, *args: Any, **kwargs: Any) -> Response:
+        self.methods.append(method)
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def test_context_owns_pooled_session() -> None:
+    with EpiDataContext(pool_connections=2, pool_maxsize=4) as epidata:
+        session = epidata._session
+        assert isinstance(session, PooledSession)
+        adapter = session.get_adapter("https://api.delphi.cmu.edu/epidata/")
+        assert isinstance(adapter, HTTPAdapter)
+        assert adapter.poolmanager.connection_pool_kw["maxsize"] == 4
+
+        call = epidata.pub_covidcast_meta()
+        assert call._session is session
+        derived = epidata.with_base_url("https://example.com/")
+        assert derived._session is session
+        assert derived.pub_covidcast_meta().with_base_url("https://example.org/")._session is session
+        assert derived.pub_covidcast_meta().meta == call.meta
+
+
+def test_pooled_session_drops_idle_connections(monkeypatch: MonkeyPatch) -> None:
+    closed: List[HTTPAdapter] = []
+    monkeypatch.setattr(HTTPAdapter, "close", lambda self: closed.append(self))
+    monkeypatch.setattr("epidatpy.request.Session.request", lambda self, *args, **kwargs: None)
+
+    session = PooledSession(idle_timeout=10)
+    now: List[float] = [100.0]
+    monkeypatch.setattr("epidatpy.request.monotonic", lambda: now[0])
+    session._last_used = now[0]
+    session.request("GET", "https://example.com/")
+    assert not closed
+    now[0] += 11
+    session.request("GET", "https://example.com/")
+    assert closed
+
+
+def test_close_only_closes_owned_session(monkeypatch: MonkeyPatch) -> None:
+    closed: List[Any] = []
+    monkeypatch.setattr(PooledSession, "close", lambda self: closed.append(self))
+    shared = PooledSession()
+    EpiDataContext(session=shared).close()
+    assert not closed
+    epidata = EpiDataContext()
+    epidata.with_base_url("https://example.com/").close()
+    assert not closed
+    epidata.close()
+    assert closed == [epidata._session]
+
+
+def test_fetch_many(fake_api: FakeAPIFactory) -> None:
+    fake_api(fluview_api)
+    epidata = EpiDataContext(use_cache=False)
+    calls = [epidata.pub_fluview(regions=r, epiweeks=EpiRange(201501, 201502)) for r in ["nat", "hhs1,hhs2", "error"]]
+    calls[1] = calls[1].with_session(Session())
+
+    results = epidata.fetch_many(calls, max_workers=2)
+    assert [r.index for r in results] == [0, 1, 2]
+    assert [len(r.result) for r in results[:2]] == [1, 2]  # type: ignore[arg-type]
+    assert results[0].ok and not results[2].ok
+    assert isinstance(results[2].error, ConnectionError)
+
+    completed: List[FetchResult] = list(epidata.fetch_many(calls[:2], as_completed=True))
+    assert sorted(r.index for r in completed) == [0, 1]
+
+    df = epidata.fetch_many(calls[:2], concat=True)
+    assert list(df["region"]) == ["nat", "hhs1", "hhs2"]
+    assert str(df["num_ili"].dtype) == "Int64"
+    with pytest.raises(ConnectionError):
+        epidata.fetch_many(calls, concat=True)
+    with pytest.raises(InvalidArgumentException):
+        epidata.fetch_many([calls[0], epidata.pub_covidcast_meta()], concat=True)
+
+
+def test_df_chunk_by_time(fake_api: FakeAPIFactory) -> None:
+    api = fake_api()
+    call = EpiDataContext(use_cache=False).pub_covidcast(
+        "src", "sig", "state", "day", ["ca", "fl"], EpiRange(20200101, 20200120)
+    )
+    df = call.df(chunk_by="time", max_rows=10, max_workers=3)
+    assert sorted(map(str, api.param("time_values"))) == [
+        "20200101-20200105",
+        "20200106-20200110",
+        "20200111-20200115",
+        "20200116-20200120",
+    ]
+    assert len(df) == 40
+    assert df["time_value"].is_monotonic_increasing
+    assert str(df["time_value"].dtype) == "datetime64[ns]"
+    assert df.equals(call.df())
+
+
+def test_df_chunk_by_list(fake_api: FakeAPIFactory) -> None:
+    api = fake_api()
+    counties = [f"{i:05d}" for i in range(1000, 4000)]
+    call = EpiDataContext(use_cache=False).pub_covidcast("src", "sig", "county", "day", counties, 20200101)
+    df = call.df(chunk_by="list", max_url_length=2000)
+    assert len(call.request_url()) > 2000
+    assert len(api.requests) > 1
+    assert all(len(urlencode({"geo_values": geo_values})) < 2000 for geo_values in api.param("geo_values"))
+    assert list(df["geo_value"]) == counties
+
+
+def test_truncated_results_are_bisected(fake_api: FakeAPIFactory) -> None:
+    def truncating_api(url: str, params: Mapping[str, str]) -> Response:
+        payload = covidcast_api(url, params).json()
+        if len(payload["epidata"]) > 5:
+            payload = {"result": 2, "message": "too many results, data truncated", "epidata": payload["epidata"][:5]}
+        return make_response(payload)
+
+    api = fake_api(truncating_api)
+    call = EpiDataContext(use_cache=False).pub_covidcast(
+        "src", "sig", "state", "day", ["ca", "fl", "ny"], EpiRange(20200101, 20200110)
+    )
+    classic = call.classic()
+    assert classic["result"] == 1
+    assert len(classic["epidata"]) == 30
+    assert len(api.requests) > 1
+    assert len(call.df()) == 30
+
+    fake_api(lambda url, params: make_response({"result": 2, "message": "truncated", "epidata": []}))
+    call = EpiDataContext(use_cache=False).pub_covidcast("src", "sig", "state", "day", "*", 20200101)
+    with pytest.warns(UserWarning, match="truncated"):
+        classic = call.classic()
+    assert classic["result"] == 2
+
+
+def test_request_retries_retryable_errors(monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setenv("DELPHI_EPIDATA_KEY", "test")
+    ok = make_response({"result": 1, "message": "success", "epidata": []})
+    no_wait = RetryPolicy(backoff_initial=0, jitter=0)
+    session = ScriptedSession(
+        make_response({}, 429, {"Retry-After": "0"}), RequestsConnectionError("reset"), make_response({}, 503), ok
+    )
+    assert _request_with_retry("https://example.com/", {}, session, retry_policy=no_wait) is ok
+    assert session.methods == ["GET"] * 4
+
+    # client errors are not retried, and the last retryable error is raised once retries run out
+    bad_request = make_response({}, 400)
+    assert (
+        _request_with_retry("https://example.com/", {}, ScriptedSession(bad_request), retry_policy=no_wait)
+        is bad_request
+    )
+    session = ScriptedSession(*[make_response({}, 429, {"Retry-After": "0"})] * 3)
+    with pytest.raises(HTTPError):
+        _request_with_retry("https://example.com/", {}, session, retry_policy=RetryPolicy(max_retries=2))
+    assert not session.outcomes
+
+    session = ScriptedSession(make_response({}, 414), ok)
+    assert _request_with_retry("https://example.com/", {}, session) is ok
+    assert session.methods == ["GET", "POST"]
+
+
+def test_context_rate_limit(fake_api: FakeAPIFactory) -> None:
+    api = fake_api(fluview_api)
+    epidata = EpiDataContext(use_cache=False, rate_limit=5, burst=2)
+    limiter = epidata._rate_limiter
+    assert isinstance(limiter, RateLimiter) and limiter.rate == 5 and limiter.burst == 2
+    assert epidata.with_base_url("https://example.com/")._rate_limiter is limiter
+    assert EpiDataContext(rate_limit=limiter)._rate_limiter is limiter
+
+    unlimited = EpiDataContext(use_cache=False).pub_fluview(regions="nat", epiweeks=201501)
+    unlimited.df()
+    epidata.fetch_many([unlimited])
+    assert [request.kwargs.get("rate_limiter") for request in api.requests] == [None, limiter]
+
+
+def test_df_stream(fake_api: FakeAPIFactory) -> None:
+    api = fake_api()
+    call = EpiDataContext(use_cache=False).pub_covidcast(
+        "src", "sig", "state", "day", ["ca", "fl"], EpiRange(20200101, 20200110)
+    )
+    df = call.df(stream=True)
+    assert api.param("format") == ["jsonl"]
+    assert len(df) == 20
+    assert df.equals(call.df())
+    assert call.df(stream=True, chunk_by="time", max_rows=6).equals(df)
+    assert call.df(["geo_value", "value"], stream=True).columns.tolist() == ["geo_value", "value"]
+    assert all(request.stream == (request.params.get("format") == "jsonl") for request in api.requests)
+
+    fake_api(lambda url, params: make_jsonl_response([], 400))
+    with pytest.raises(HTTPError):
+        call.df(stream=True)
+
+
+def test_df_compact(fake_api: FakeAPIFactory) -> None:
+    fake_api()
+    call = EpiDataContext(use_cache=False).pub_covidcast(
+        "src", "sig", "state", "day", ["ca", "fl"], EpiRange(20200101, 20200110)
+    )
+    df = call.df()
+    compact = call.df(compact="float32")
+    assert str(compact["source"].dtype) == "category" and list(compact["source"].cat.categories) == ["src"]
+    assert str(compact["lag"].dtype) == "Int8" and str(compact["value"].dtype) == "Float32"
+    assert compact.attrs["memory_saved"] > 0
+    assert compact.astype(df.dtypes.to_dict()).equals(df)
+    with pytest.raises(InvalidArgumentException):
+        call.df(compact=True, dtype_backend="pyarrow")
+
+
+def test_df_parse_workers(fake_api: FakeAPIFactory, monkeypatch: MonkeyPatch) -> None:
+    fake_api()
+    monkeypatch.setattr("epidatpy._columnar.PARALLEL_MIN_ROWS", 1)
+    call = EpiDataContext(use_cache=False).pub_covidcast(
+        "src", "sig", "state", "day", ["ca", "fl"], EpiRange(20200101, 20200110)
+    )
+    df = call.df()
+    with EpiDataContext(use_cache=False, parse_workers=2) as epidata:
+        pool = epidata._parse_pool
+        assert pool is not None and pool._pool is None
+        call = epidata.pub_covidcast("src", "sig", "state", "day", ["ca", "fl"], EpiRange(20200101, 20200110))
+        assert call.df().equals(df)
+        # the processes are started once and reused by the later calls, of derived contexts too
+        processes = pool._pool
+        assert processes is not None
+        assert epidata.fetch_many([call, call], concat=True).equals(concat([df, df], ignore_index=True))
+        assert (
+            epidata.with_base_url(BASE_URL)
+            .pub_covidcast("src", "sig", "state", "day", ["ca", "fl"], EpiRange(20200101, 20200110))
+            .df()
+            .equals(df)
+        )
+        assert pool._pool is processes
+    assert pool._pool is None
+    assert EpiDataContext(use_cache=False)._parse_pool is None
+
+
+def test_classic_columns(fake_api: FakeAPIFactory) -> None:
+    fake_api()
+    call = EpiDataContext(use_cache=False).pub_covidcast(
+        "src", "sig", "state", "day", ["ca", "fl"], EpiRange(20200101, 20200110)
+    )
+    classic = call.classic(layout="columns")
+    assert classic["result"] == 1
+    epidata = classic["epidata"]
+    assert len(epidata["geo_value"]) == 20 and epidata["geo_value"][:2].tolist() == ["ca", "fl"]
+    assert epidata["time_value"].dtype == "datetime64[D]" and epidata["value"].dtype == "float64"
+    assert epidata["lag"].tolist() == [0] * 20
+    assert list(call.classic(["geo_value", "value"], layout="columns")["epidata"]) == ["geo_value", "value"]
+
+    fake_api(lambda url, params: make_response({}, 500))
+    error = call.classic(layout="columns")
+    assert error["result"] == 0 and len(error["epidata"]["value"]) == 0
+
+
+def test_df_null_columns(fake_api: FakeAPIFactory) -> None:
+    api = fake_api()
+    requested = api.param
+    meta = [{"source": "src", "signals": [{"source": "src", "signal": "sig", "has_stderr": True}]}]
+    params = {
+        "data_source": "src",
+        "signals": "sig",
+        "geo_type": "state",
+        "geo_values": "ca",
+        "time_values": "20200101",
+    }
+    call = EpiDataCall(BASE_URL, None, "covidcast", params, define_signal_fields(meta, params), use_cache=False)
+    assert [info.name for info in call.meta if info.always_null] == ["sample_size"]
+
+    df = call.df(null_columns="drop")
+    assert requested("fields") == ["-sample_size"]
+    assert "sample_size" not in df.columns and "stderr" not in df.columns and "value" in df.columns
+    sparse = call.df(["value", "stderr", "sample_size"], null_columns="sparse", stream=True)
+    assert requested("fields")[1] == "value,stderr,sample_size,-sample_size"
+    assert [str(t) for t in sparse.dtypes] == ["Float64", "Sparse[float64, nan]", "Sparse[float64, nan]"]
+    call.df()
+    assert requested("fields")[2] is None
+    # unknown signals may have any statistic
+    assert not any(info.always_null for info in define_signal_fields(meta, {**params, "signals": "*"}))
+
+
+def test_iter_jsonl_columns() -> None:
+    lines = [b'{"a": 1, "b": "x"}', b"", b'{"a": 2}', b'{"a": 3, "c": 1.5}']
+    assert list(_iter_jsonl_columns(lines)) == [{"a": [1, 2, 3], "b": ["x", None, None], "c": [None, None, 1.5]}]
+    assert list(_iter_jsonl_columns(lines, batch_rows=2)) == [
+        {"a": [1, 2], "b": ["x", None]},
+        {"a": [3], "b": [None], "c": [1.5]},
+    ]
+    assert not list(_iter_jsonl_columns([]))
+
+
+def test_iter_batches(fake_api: FakeAPIFactory) -> None:
+    fake_api()
+    call = EpiDataContext(use_cache=False).pub_covidcast(
+        "src", "sig", "state", "day", ["ca", "fl"], EpiRange(20200101, 20200110)
+    )
+    df = call.df()
+    batches = list(call.iter_batches(rows=6))
+    assert [len(batch) for batch in batches] == [6, 6, 6, 2]
+    assert all(batch.dtypes.equals(df.dtypes) for batch in batches)
+    assert concat(batches, ignore_index=True).equals(df)
+
+    batches = list(call.iter_batches(rows=3, chunk_by="time", max_rows=8, max_workers=2))
+    assert max(len(batch) for batch in batches) == 3
+    combined = concat(batches).sort_values(["time_value", "geo_value"], ignore_index=True)
+    assert combined.equals(df.sort_values(["time_value", "geo_value"], ignore_index=True))
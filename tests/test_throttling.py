@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import List
+
+import pytest
+from pytest import MonkeyPatch
+
+from epidatpy._throttling import RateLimiter, RetryPolicy, as_rate_limiter, parse_retry_after
+
+
+def test_rate_limiter_bursts_then_spaces_out_requests(monkeypatch: MonkeyPatch) -> None:
+    now: List[float] = [0.0]
+    monkeypatch.setattr("epidatpy._throttling.monotonic", lambda: now[0])
+    limiter = RateLimiter(rate=2, burst=3)
+    assert [limiter.reserve() for _ in range(5)] == [0, 0, 0, 0.5, 1.0]
+    now[0] = 1.0
+    # the queued requests consumed the refilled tokens
+    assert limiter.reserve() == 0.5
+    now[0] = 10.0
+    assert [limiter.reserve() for _ in range(4)] == [0, 0, 0, 0.5]
+
+
+def test_as_rate_limiter() -> None:
+    assert as_rate_limiter(None) is None
+    limiter = RateLimiter(1)
+    assert as_rate_limiter(limiter) is limiter
+    created = as_rate_limiter(10, 5)
+    assert created is not None and created.rate == 10 and created.burst == 5
+    with pytest.raises(ValueError):
+        RateLimiter(0)
+
+
+def test_parse_retry_after() -> None:
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("") is None
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after("soon") is None
+    in_a_minute = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=60), usegmt=True)
+    assert 55 < (parse_retry_after(in_a_minute) or 0) <= 60
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+
+
+def test_retry_policy_backoff() -> None:
+    policy = RetryPolicy(backoff_initial=1, backoff_max=5, jitter=0.5)
+    for attempt, base in [(1, 1), (2, 2), (3, 4)]:
+        assert base <= policy.backoff(attempt) <= base + 0.5
+    assert policy.backoff(4) == 5
+    assert policy.backoff(1, "3") == 3
+    assert policy.backoff(1, "3600") == 5
@@ -0,0 +1,49 @@
+from datetime import date
+
+import numpy as np
+import pytest
+from epiweeks import Week
+
+from epidatpy._time import (
+    dates_to_datetime64,
+    detect_time_format,
+    epiweeks_to_datetime64,
+    parse_time_column,
+)
+
+
+def test_detect_time_format() -> None:
+    assert detect_time_format([None, 20200101]) == "date"
+    assert detect_time_format(["2020-01-01"]) == "date"
+    assert detect_time_format([202001]) == "epiweek"
+    assert detect_time_format([None]) is None
+    assert detect_time_format([1]) is None
+
+
+def test_dates_to_datetime64() -> None:
+    parsed = dates_to_datetime64([20200229, "2021-12-31", None])
+    assert parsed.tolist() == [date(2020, 2, 29), date(2021, 12, 31), None]
+    for invalid in (20210229, 20201301, 20200100):
+        with pytest.raises(ValueError):
+            dates_to_datetime64([invalid])
+
+
+def test_epiweeks_to_datetime64() -> None:
+    weeks = [Week(year, 1) + i for year in (2014, 2015, 2020) for i in range(0, 60, 3)]
+    values = [int(week.cdcformat()) for week in weeks]
+    assert epiweeks_to_datetime64(values).tolist() == [week.startdate() for week in weeks]
+    assert epiweeks_to_datetime64(["201453", None]).tolist() == [Week(2014, 53).startdate(), None]
+    for invalid in (201553, 201500, 201554):
+        with pytest.raises(ValueError):
+            epiweeks_to_datetime64([invalid])
+
+
+def test_parse_time_column() -> None:
+    assert parse_time_column([202001, 202002]).tolist() == [date(2019, 12, 29), date(2020, 1, 5)]
+    assert parse_time_column([20200101]).tolist() == [date(2020, 1, 1)]
+    assert np.isnat(parse_time_column([None, None])).all()
+    with pytest.raises(ValueError):
+        # mixed formats
+        parse_time_column([20200101, 202001])
+    with pytest.raises(ValueError):
+        parse_time_column([20200101], "epiweek")